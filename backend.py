@@ -8,20 +8,497 @@ except Exception:  # pragma: no cover - optional dependency for tests
     requests = _RequestsStub()
 import concurrent.futures
 from datetime import datetime
+import hashlib
+import heapq
+import json
+import math
+import os
+import threading
 import time
 
+from http_archive import archive_key
+from profiling import profiler
+from snapshot import MetricsSnapshot
+from statement_store import StatementStore
+from symbol_directory import RETRY_SECONDS as SYMBOL_DIRECTORY_RETRY_SECONDS, SymbolDirectory
+from match_counts import MatchCounter
+from quantiles import SectorQuantiles
 
-_income_cache: dict[str, list] = {}
-_cash_cache: dict[str, list] = {}
-_bs_cache: dict[str, list] = {}
 
+# Seconds a "no data" result is trusted before the symbol is retried
+NEGATIVE_TTL = 6 * 60 * 60
+# Backoff after a transient error: base * 2 ** (attempts - 1), capped
+ERROR_BACKOFF_BASE = 2.0
+ERROR_BACKOFF_MAX = 300.0
+# Seconds a fetched statement or profile is used before it is revalidated
+STATEMENT_TTL = 12 * 60 * 60
+PROFILE_TTL = 24 * 60 * 60
 
-def _fetch_json(url: str) -> list | dict:
-    response = requests.get(url, timeout=10)
+
+class CacheEntry:
+    """Cached fetch result that records whether the data can be trusted.
+
+    ``status`` is ``VALID`` for usable data, ``EMPTY`` when the provider has
+    nothing for the symbol (kept for ``NEGATIVE_TTL``) and ``ERROR`` after a
+    transient failure (retried once the backoff in ``expires`` elapses).
+    """
+
+    VALID = "valid"
+    EMPTY = "empty"
+    ERROR = "error"
+
+    __slots__ = ("status", "value", "expires", "attempts")
+
+    def __init__(self, status: str, value, expires: float | None = None, attempts: int = 0):
+        self.status = status
+        self.value = value
+        self.expires = expires
+        self.attempts = attempts
+
+    def fresh(self, now: float | None = None) -> bool:
+        if self.expires is None:
+            return True
+        return (time.monotonic() if now is None else now) < self.expires
+
+    @classmethod
+    def empty(cls, value=None) -> "CacheEntry":
+        return cls(cls.EMPTY, value, time.monotonic() + NEGATIVE_TTL)
+
+    @classmethod
+    def error(cls, previous: "CacheEntry | None" = None) -> "CacheEntry":
+        """Return the entry after a failed fetch, retried after an exponential backoff.
+
+        A previously valid value keeps being served (stale-if-error) with the
+        failed attempts counted on it.
+        """
+        failing = previous is not None and (previous.status == cls.ERROR or previous.attempts)
+        attempts = previous.attempts + 1 if failing else 1
+        delay = min(ERROR_BACKOFF_BASE * 2 ** (attempts - 1), ERROR_BACKOFF_MAX)
+        if previous is not None and previous.status == cls.VALID:
+            return cls(cls.VALID, previous.value, time.monotonic() + delay, attempts)
+        return cls(cls.ERROR, None, time.monotonic() + delay, attempts)
+
+
+# Statement caches hold ``project_statement`` columns rather than raw payloads
+_income_cache: dict[str, CacheEntry] = {}
+_cash_cache: dict[str, CacheEntry] = {}
+_bs_cache: dict[str, CacheEntry] = {}
+
+# Parameter keys evaluated locally against ``compute_mvp_metrics`` output
+# rather than being forwarded to the screener endpoint.
+MVP_KEYS = {
+    "rev_ttm_min",
+    "yoy_rev_growth_pct_min",
+    "yoy_growth_quarter_count_min",
+    "max_qoq_rev_declines_last4",
+    "gross_margin_pct_min",
+    "delta_gm_pp_yoy_min",
+    "opex_pct_slope_last4_max",
+    "ocf_ttm_min",
+    "delta_ocf_ttm_yoy_min",
+    "rd_pct_max",
+    "delta_rd_pct_pp_yoy_max",
+    "rd_growth_lte_rev_growth",
+    "deferred_rev_yoy_increase",
+    "ccc_slope_last4_max",
+    "rule40_op_ttm_min",
+    "capex_pct_max",
+}
+
+# Metrics with sector-relative percentile filters.  ``<metric>_pctl_min: 80``
+# keeps the top 20% of the symbol's sector, ``<metric>_pctl_max: 20`` the
+# bottom 20%; cutoffs come from ``StockDataService.quantiles``.
+PERCENTILE_METRICS = (
+    "rev_ttm",
+    "gross_margin_pct_latest",
+    "opex_pct_slope_last4",
+    "ocf_ttm",
+    "rd_pct_latest",
+    "ccc_slope_last4",
+    "rule40_op_ttm",
+    "capex_pct",
+)
+# Filter key -> (metric, is_upper_tail)
+PERCENTILE_FILTERS = {
+    **{f"{metric}_pctl_min": (metric, False) for metric in PERCENTILE_METRICS},
+    **{f"{metric}_pctl_max": (metric, True) for metric in PERCENTILE_METRICS},
+}
+MVP_KEYS |= set(PERCENTILE_FILTERS)
+
+# Screener bounds that can be re-applied to earlier results locally, mapped
+# to ``(result field, is_lower_bound)``.  The dividend bound is always
+# enforced by ``_apply_dividend_filter`` so it has no field here.
+SCREENER_BOUNDS = {
+    "priceMoreThan": ("price", True),
+    "priceLowerThan": ("price", False),
+    "marketCapMoreThan": ("marketCap", True),
+    "marketCapLowerThan": ("marketCap", False),
+    "volumeMoreThan": ("volume", True),
+    "volumeLowerThan": ("volume", False),
+    "dividendMoreThan": (None, True),
+}
+SCREENER_DEFAULT_LIMIT = 20
+# Screener rows fetched as the pool for ``search_ranked``
+RANK_CANDIDATE_LIMIT = 500
+# Provable value ranges of metrics, used to bound scores of rows whose
+# metrics are not cached yet.  Metrics missing here are unbounded.
+METRIC_RANGES = {
+    "capex_pct": (0.0, math.inf),
+    "max_qoq_rev_declines_last4": (0.0, 3.0),
+    "yoy_growth_quarter_count": (0.0, 4.0),
+    "rd_growth_lte_rev_growth_boolean": (0.0, 1.0),
+    "deferred_rev_yoy_increase": (0.0, 1.0),
+}
+# How long screener results may be narrowed locally before refetching
+REFINE_TTL = 120.0
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    """Thread-safe counters describing where backend time is spent.
+
+    Tracks per-endpoint latency histograms and bytes transferred, cache
+    hits/misses per cache, retry counts, rate-limiter sleep time and
+    ``compute_mvp_metrics`` durations.  Use :meth:`snapshot` for an
+    in-process view or :meth:`to_json` / :meth:`to_prometheus` to dump it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.endpoints: dict[str, dict] = {}
+            self.caches: dict[str, dict] = {}
+            self.retries: dict[str, int] = {}
+            self.shared: dict[str, int] = {}
+            self.not_modified: dict[str, int] = {}
+            self.rate_limit_wait = 0.0
+            self.timings: dict[str, dict] = {}
+
+    @staticmethod
+    def _new_histogram() -> dict:
+        return {"count": 0, "sum": 0.0, "buckets": [0] * (len(LATENCY_BUCKETS) + 1)}
+
+    @staticmethod
+    def _observe(hist: dict, seconds: float):
+        hist["count"] += 1
+        hist["sum"] += seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                hist["buckets"][i] += 1
+                return
+        hist["buckets"][-1] += 1
+
+    def record_request(self, endpoint: str, seconds: float, nbytes: int = 0, error: bool = False):
+        with self._lock:
+            entry = self.endpoints.setdefault(
+                endpoint, {"latency": self._new_histogram(), "bytes": 0, "errors": 0}
+            )
+            self._observe(entry["latency"], seconds)
+            entry["bytes"] += nbytes
+            if error:
+                entry["errors"] += 1
+
+    def record_cache(self, cache: str, hit: bool):
+        with self._lock:
+            entry = self.caches.setdefault(cache, {"hits": 0, "misses": 0})
+            entry["hits" if hit else "misses"] += 1
+
+    def record_retry(self, endpoint: str):
+        with self._lock:
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def record_shared(self, endpoint: str):
+        """Count a caller that reused another caller's in-flight request."""
+        with self._lock:
+            self.shared[endpoint] = self.shared.get(endpoint, 0) + 1
+
+    def record_not_modified(self, endpoint: str):
+        """Count a refresh answered by a 304 or an unchanged payload hash."""
+        with self._lock:
+            self.not_modified[endpoint] = self.not_modified.get(endpoint, 0) + 1
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.rate_limit_wait += seconds
+
+    def record_timing(self, name: str, seconds: float):
+        with self._lock:
+            hist = self.timings.setdefault(name, self._new_histogram())
+            self._observe(hist, seconds)
+
+    def hit_ratio(self, cache: str) -> float | None:
+        with self._lock:
+            entry = self.caches.get(cache)
+            if not entry:
+                return None
+            hits, total = entry["hits"], entry["hits"] + entry["misses"]
+        return hits / total if total else None
+
+    def snapshot(self) -> dict:
+        """Return a deep copy of all counters suitable for serialisation."""
+        with self._lock:
+            data = json.loads(json.dumps({
+                "endpoints": self.endpoints,
+                "caches": self.caches,
+                "retries": self.retries,
+                "shared": self.shared,
+                "not_modified": self.not_modified,
+                "rate_limit_wait_seconds": self.rate_limit_wait,
+                "timings": self.timings,
+            }))
+        for name, entry in data["caches"].items():
+            total = entry["hits"] + entry["misses"]
+            entry["hit_ratio"] = entry["hits"] / total if total else None
+        data["buckets"] = list(LATENCY_BUCKETS)
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self) -> str:
+        """Return the counters in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = []
+
+        def histogram(metric, label, hist):
+            cumulative = 0
+            for bound, count in zip(list(LATENCY_BUCKETS) + ["+Inf"], hist["buckets"]):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum{{{label}}} {hist['sum']}")
+            lines.append(f"{metric}_count{{{label}}} {hist['count']}")
+
+        lines.append("# TYPE upcom_request_latency_seconds histogram")
+        for endpoint, entry in sorted(snap["endpoints"].items()):
+            histogram("upcom_request_latency_seconds", f'endpoint="{endpoint}"', entry["latency"])
+        lines.append("# TYPE upcom_request_bytes_total counter")
+        for endpoint, entry in sorted(snap["endpoints"].items()):
+            lines.append(f'upcom_request_bytes_total{{endpoint="{endpoint}"}} {entry["bytes"]}')
+        lines.append("# TYPE upcom_request_errors_total counter")
+        for endpoint, entry in sorted(snap["endpoints"].items()):
+            lines.append(f'upcom_request_errors_total{{endpoint="{endpoint}"}} {entry["errors"]}')
+        lines.append("# TYPE upcom_request_retries_total counter")
+        for endpoint, count in sorted(snap["retries"].items()):
+            lines.append(f'upcom_request_retries_total{{endpoint="{endpoint}"}} {count}')
+        lines.append("# TYPE upcom_request_shared_total counter")
+        for endpoint, count in sorted(snap["shared"].items()):
+            lines.append(f'upcom_request_shared_total{{endpoint="{endpoint}"}} {count}')
+        lines.append("# TYPE upcom_request_not_modified_total counter")
+        for endpoint, count in sorted(snap["not_modified"].items()):
+            lines.append(f'upcom_request_not_modified_total{{endpoint="{endpoint}"}} {count}')
+        lines.append("# TYPE upcom_cache_requests_total counter")
+        for cache, entry in sorted(snap["caches"].items()):
+            lines.append(f'upcom_cache_requests_total{{cache="{cache}",result="hit"}} {entry["hits"]}')
+            lines.append(f'upcom_cache_requests_total{{cache="{cache}",result="miss"}} {entry["misses"]}')
+        lines.append("# TYPE upcom_rate_limit_wait_seconds_total counter")
+        lines.append(f"upcom_rate_limit_wait_seconds_total {snap['rate_limit_wait_seconds']}")
+        lines.append("# TYPE upcom_duration_seconds histogram")
+        for name, hist in sorted(snap["timings"].items()):
+            histogram("upcom_duration_seconds", f'name="{name}"', hist)
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str, fmt: str = "json"):
+        """Write the current counters to ``path`` as ``json`` or ``prometheus``."""
+        text = self.to_prometheus() if fmt == "prometheus" else self.to_json()
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(text)
+
+
+stats = RequestStats()
+
+
+def _endpoint_name(url: str) -> str:
+    """Return a short endpoint label such as ``income-statement`` for ``url``."""
+    path = url.split("?", 1)[0]
+    if "/api/v3/" in path:
+        return path.split("/api/v3/", 1)[1].split("/", 1)[0]
+    return path.rstrip("/").rsplit("/", 1)[-1] or path
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block on the same future and receive its result (or
+    exception).  Nothing is cached once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+
+    def do(self, key, fn) -> tuple:
+        """Return ``(result, shared)`` where ``shared`` is True for followers."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        future.set_result(result)
+        return result, False
+
+
+_flights = SingleFlight()
+# Object with a ``get(url, **kwargs)`` method used instead of ``requests``,
+# e.g. an ``http_archive.ArchiveTransport``
+_transport = None
+
+
+def set_transport(transport):
+    """Route every HTTP request through ``transport`` (``None`` restores ``requests``).
+
+    The previous transport is closed, so recordings are saved.
+    """
+    global _transport
+    if _transport is not None and hasattr(_transport, "close"):
+        _transport.close()
+    _transport = transport
+    return _transport
+
+
+def _get(url: str, **kwargs):
+    """Issue a GET once per URL across concurrent callers."""
+    response, shared = _flights.do(url, lambda: _timed_get(url, **kwargs))
+    if shared:
+        stats.record_shared(_endpoint_name(url))
+    return response
+
+
+def _timed_get(url: str, **kwargs):
+    """Issue the GET through the configured transport while recording latency and payload size."""
+    endpoint = _endpoint_name(url)
+    start = time.perf_counter()
     try:
-        return response.json()
+        transport = _transport if _transport is not None else requests
+        response = transport.get(url, **kwargs)
     except Exception:
-        return []
+        stats.record_request(endpoint, time.perf_counter() - start, error=True)
+        raise
+    content = getattr(response, "content", b"")
+    nbytes = len(content) if isinstance(content, (bytes, str)) else 0
+    stats.record_request(endpoint, time.perf_counter() - start, nbytes)
+    return response
+
+
+def _rate_limit_sleep(seconds: float):
+    time.sleep(seconds)
+    stats.record_wait(seconds)
+
+
+class Validators:
+    """``ETag`` / ``Last-Modified`` and a content hash for one URL's last payload."""
+
+    __slots__ = ("etag", "last_modified", "digest")
+
+    def __init__(self, etag: str | None, last_modified: str | None, digest: str | None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+
+    def headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+# Validators per URL (without the API key) of the last valid payload
+_validators: dict[str, Validators] = {}
+
+
+def _header(response, name: str) -> str | None:
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get(name)
+    if value is None:
+        # Recorded or faked responses may use plain, case-sensitive dicts
+        lowered = name.lower()
+        value = next((v for k, v in headers.items() if k.lower() == lowered), None)
+    return value
+
+
+def _fetch_entry(url: str, previous: CacheEntry | None = None, transform=None,
+                 ttl: float | None = None) -> CacheEntry:
+    """Fetch ``url`` and classify the payload as valid, empty or a transient error.
+
+    ``transform`` is applied to valid payloads before they are cached and
+    valid entries expire after ``ttl`` seconds.  When ``previous`` holds a
+    valid payload the request is conditional: a ``304`` (or, without
+    validators, an identical body hash) renews ``previous`` without parsing.
+    Fetches following a failed one are counted as retries.
+    """
+    key = archive_key(url)
+    revalidate = previous is not None and previous.status == CacheEntry.VALID
+    known = _validators.get(key) if revalidate else None
+    expires = time.monotonic() + ttl if ttl is not None else None
+    if previous is not None and (previous.status == CacheEntry.ERROR or previous.attempts):
+        stats.record_retry(_endpoint_name(url))
+    try:
+        headers = known.headers() if known is not None else {}
+        response = _get(url, timeout=10, headers=headers) if headers else _get(url, timeout=10)
+        status = getattr(response, "status_code", 200)
+        if status == 304 and known is not None:
+            stats.record_not_modified(_endpoint_name(url))
+            return CacheEntry(CacheEntry.VALID, previous.value, expires)
+        if status >= 400:
+            raise ValueError(f"HTTP {response.status_code}")
+        content = getattr(response, "content", None)
+        digest = hashlib.sha1(content).hexdigest() if isinstance(content, bytes) else None
+        if known is not None and digest is not None and digest == known.digest:
+            stats.record_not_modified(_endpoint_name(url))
+            return CacheEntry(CacheEntry.VALID, previous.value, expires)
+        data = response.json()
+    except Exception:
+        return CacheEntry.error(previous)
+    if isinstance(data, dict) and "Error Message" in data:
+        # FMP reports rate-limit exhaustion and bad keys this way; both pass
+        return CacheEntry.error(previous)
+    if not data:
+        _validators.pop(key, None)
+        return CacheEntry.empty([])
+    _validators[key] = Validators(_header(response, "ETag"), _header(response, "Last-Modified"), digest)
+    return CacheEntry(CacheEntry.VALID, transform(data) if transform else data, expires)
+
+
+def statement_status(symbol: str, statements) -> tuple[str, float | None]:
+    """Return the combined cache status of ``statements`` for ``symbol``.
+
+    ``ERROR`` wins over everything else; ``EMPTY`` is returned only when every
+    statement is empty.  The second element is the earliest expiry among the
+    entries that determined the status (for ``VALID``, among the entries that
+    expire at all, so derived metrics can expire with their statements).
+    """
+    entries = [STATEMENTS[name][1].get(symbol) for name in statements]
+    entries = [e for e in entries if e is not None]
+    errors = [e for e in entries if e.status == CacheEntry.ERROR]
+    if errors:
+        return CacheEntry.ERROR, min(e.expires for e in errors)
+    if entries and all(e.status == CacheEntry.EMPTY for e in entries):
+        return CacheEntry.EMPTY, min(e.expires for e in entries)
+    return CacheEntry.VALID, min((e.expires for e in entries if e.expires is not None), default=None)
+
+
+def to_map(data) -> dict:
+    """Index a statement payload by its quarter ``date``."""
+    return {item.get("date"): item for item in data if isinstance(item, dict) and item.get("date")}
 
 
 def _linear_slope(values: list[float | None]) -> float | None:
@@ -40,194 +517,525 @@ def _linear_slope(values: list[float | None]) -> float | None:
     return (n * sum_xy - sum_x * sum_y) / denom
 
 
-def compute_mvp_metrics(symbol: str, api_key: str) -> dict | None:
+# Quarterly statements used by the MVP metrics: endpoint path and cache
+STATEMENTS = {
+    "income": ("income-statement", _income_cache),
+    "cash": ("cash-flow-statement", _cash_cache),
+    "balance": ("balance-sheet-statement", _bs_cache),
+}
+
+# Raw quarterly series: source statement and the field names to try in order
+SERIES_FIELDS = {
+    "revenue": ("income", ("revenue",)),
+    "cost": ("income", ("costOfRevenue",)),
+    "op_income": ("income", ("operatingIncome",)),
+    "rd": ("income", ("researchAndDevelopmentExpenses",)),
+    "sga": ("income", ("sellingGeneralAndAdministrativeExpenses",)),
+    "ocf": ("cash", ("netCashProvidedByOperatingActivities",)),
+    "capex": ("cash", ("capitalExpenditure",)),
+    "deferred_rev": ("balance", ("deferredRevenue",)),
+    "ar": ("balance", ("netReceivables", "accountsReceivable")),
+    "inventory": ("balance", ("inventory",)),
+    "ap": ("balance", ("accountPayables", "accountsPayable", "accountsPayables")),
+}
+
+# Raw series each metric returned by ``compute_mvp_metrics`` depends on
+METRIC_DEPENDENCIES = {
+    "rev_ttm": ("revenue",),
+    "yoy_rev_growth_pct_array": ("revenue",),
+    "yoy_growth_quarter_count": ("revenue",),
+    "max_qoq_rev_declines_last4": ("revenue",),
+    "gross_margin_pct_latest": ("revenue", "cost"),
+    "delta_gm_pp_yoy_latest": ("revenue", "cost"),
+    "opex_pct_slope_last4": ("revenue", "rd", "sga"),
+    "ocf_ttm": ("ocf",),
+    "delta_ocf_ttm_yoy": ("ocf",),
+    "rd_pct_latest": ("revenue", "rd"),
+    "delta_rd_pct_pp_yoy_latest": ("revenue", "rd"),
+    "rd_growth_lte_rev_growth_boolean": ("revenue", "rd"),
+    "deferred_rev_yoy_increase": ("deferred_rev",),
+    "ccc_slope_last4": ("revenue", "cost", "ar", "inventory", "ap"),
+    "rule40_op_ttm": ("revenue", "op_income"),
+    "capex_pct": ("revenue", "capex"),
+}
+
+# Metrics read by ``StockDataService._passes_mvp_filters`` for each MVP key
+FILTER_METRICS = {
+    "rev_ttm_min": ("rev_ttm",),
+    "yoy_rev_growth_pct_min": ("yoy_rev_growth_pct_array",),
+    "yoy_growth_quarter_count_min": ("yoy_rev_growth_pct_array",),
+    "max_qoq_rev_declines_last4": ("max_qoq_rev_declines_last4",),
+    "gross_margin_pct_min": ("gross_margin_pct_latest",),
+    "delta_gm_pp_yoy_min": ("delta_gm_pp_yoy_latest",),
+    "opex_pct_slope_last4_max": ("opex_pct_slope_last4",),
+    "ocf_ttm_min": ("ocf_ttm",),
+    "delta_ocf_ttm_yoy_min": ("delta_ocf_ttm_yoy",),
+    "rd_pct_max": ("rd_pct_latest",),
+    "delta_rd_pct_pp_yoy_max": ("delta_rd_pct_pp_yoy_latest",),
+    "rd_growth_lte_rev_growth": ("rd_growth_lte_rev_growth_boolean",),
+    "deferred_rev_yoy_increase": ("deferred_rev_yoy_increase",),
+    "ccc_slope_last4_max": ("ccc_slope_last4",),
+    "rule40_op_ttm_min": ("rule40_op_ttm",),
+    "capex_pct_max": ("capex_pct",),
+    **{key: (metric,) for key, (metric, _upper) in PERCENTILE_FILTERS.items()},
+}
+
+
+def metrics_for_filters(mvp_params: dict) -> set[str]:
+    """Return the metric names needed to evaluate ``mvp_params``."""
+    needed = set()
+    for key in mvp_params:
+        needed.update(FILTER_METRICS.get(key, ()))
+    return needed
+
+
+def statements_for_metrics(metrics) -> set[str]:
+    """Return the statements that must be fetched to compute ``metrics``."""
+    return {
+        SERIES_FIELDS[series][0]
+        for metric in metrics
+        for series in METRIC_DEPENDENCIES.get(metric, ())
+    }
+
+
+_NO_COLUMNS = {"dates": ()}
+
+
+def _first_float(item: dict, keys) -> float | None:
+    for key in keys:
+        if item.get(key) is not None:
+            try:
+                return float(item[key])
+            except Exception:
+                continue
+    return None
+
+
+def project_statement(statement: str, data) -> dict:
+    """Reduce a raw statement payload to the float columns the metrics use.
+
+    Returns ``{"dates": (...), <series>: (...), ...}`` with quarters sorted
+    newest first and one tuple per ``SERIES_FIELDS`` entry sourced from
+    ``statement``; unparseable values become ``None``.
+    """
+    by_date = to_map(data if isinstance(data, list) else [])
+    dates = tuple(sorted(by_date, reverse=True))
+    columns = {"dates": dates}
+    for series, (source, keys) in SERIES_FIELDS.items():
+        if source == statement:
+            columns[series] = tuple(_first_float(by_date[d], keys) for d in dates)
+    return columns
+
+
+_statement_store: StatementStore | None = None
+
+
+def set_statement_store(path: str | None) -> StatementStore | None:
+    """Persist fetched statements to the SQLite file at ``path`` (``None`` disables)."""
+    global _statement_store
+    if _statement_store is not None:
+        _statement_store.close()
+    _statement_store = StatementStore(path) if path else None
+    return _statement_store
+
+
+def _load_statement(name: str, symbol: str, api_key: str) -> CacheEntry:
+    """Return the cached statement entry, fetching it once across threads."""
+    endpoint, cache = STATEMENTS[name]
+    entry = cache.get(symbol)
+    if entry is not None and entry.fresh():
+        stats.record_cache(name, True)
+        return entry
+
+    def fetch():
+        # Re-check: another caller may have finished the fetch meanwhile
+        current = cache.get(symbol)
+        if current is not None and current.fresh():
+            stats.record_cache(name, True)
+            return current
+        stats.record_cache(name, False)
+        if current is None and _statement_store is not None:
+            stored = _statement_store.get_entry(symbol, name)
+            stats.record_cache("store", stored is not None)
+            if stored is not None:
+                # Rows keep their age, so old ones are revalidated right away
+                columns, fetched_at = stored
+                age = max(time.time() - fetched_at, 0.0)
+                current = CacheEntry(CacheEntry.VALID, columns, time.monotonic() + STATEMENT_TTL - age)
+                cache[symbol] = current
+                if current.fresh():
+                    return current
+        url = f"https://financialmodelingprep.com/api/v3/{endpoint}/{symbol}?period=quarter&apikey={api_key}"
+        previous = current
+        current = _fetch_entry(url, current, lambda data: project_statement(name, data), STATEMENT_TTL)
+        cache[symbol] = current
+        if _statement_store is not None and current.status == CacheEntry.VALID:
+            if previous is None or current.value is not previous.value:
+                _statement_store.put(symbol, name, current.value)
+            elif not current.attempts:
+                # Revalidated unchanged: only the row's age is renewed
+                _statement_store.touch(symbol, name)
+        _rate_limit_sleep(0.1)
+        return current
+
+    entry, shared = _flights.do((endpoint, symbol), fetch)
+    if shared:
+        stats.record_cache(name, True)
+        stats.record_shared(endpoint)
+    return entry
+
+
+def compute_mvp_metrics(symbol: str, api_key: str, metrics=None) -> dict | None:
+    """Return MVP metrics for ``symbol``.
+
+    ``metrics`` optionally restricts the result to the given metric names, in
+    which case only the statements those metrics depend on are fetched.
+    """
+    start = time.perf_counter()
     try:
-        if symbol not in _income_cache:
-            url = f"https://financialmodelingprep.com/api/v3/income-statement/{symbol}?period=quarter&apikey={api_key}"
-            _income_cache[symbol] = _fetch_json(url)
-            time.sleep(0.1)
-        if symbol not in _cash_cache:
-            url = f"https://financialmodelingprep.com/api/v3/cash-flow-statement/{symbol}?period=quarter&apikey={api_key}"
-            _cash_cache[symbol] = _fetch_json(url)
-            time.sleep(0.1)
-        if symbol not in _bs_cache:
-            url = f"https://financialmodelingprep.com/api/v3/balance-sheet-statement/{symbol}?period=quarter&apikey={api_key}"
-            _bs_cache[symbol] = _fetch_json(url)
-            time.sleep(0.1)
-        income = _income_cache.get(symbol, [])
-        cash = _cash_cache.get(symbol, [])
-        bs = _bs_cache.get(symbol, [])
-
-        def to_map(data):
-            return {item.get("date"): item for item in data if isinstance(item, dict) and item.get("date")}
-
-        inc_map = to_map(income)
-        cash_map = to_map(cash)
-        bs_map = to_map(bs)
-        dates = sorted(set(inc_map) | set(cash_map) | set(bs_map), reverse=True)
-
-        def g(d, m, *keys):
-            for k in keys:
-                if m.get(d, {}).get(k) is not None:
-                    try:
-                        return float(m[d][k])
-                    except Exception:
-                        continue
-            return None
+        with profiler.capture(f"compute_mvp_metrics-{symbol}"):
+            return _compute_mvp_metrics(symbol, api_key, metrics)
+    finally:
+        stats.record_timing("compute_mvp_metrics", time.perf_counter() - start)
+
+
+def _compute_mvp_metrics(symbol: str, api_key: str, metrics=None) -> dict | None:
+    try:
+        wanted = set(METRIC_DEPENDENCIES) if metrics is None else set(metrics)
+        columns = {
+            name: _load_statement(name, symbol, api_key).value or _NO_COLUMNS
+            for name in statements_for_metrics(wanted)
+        }
+        return metrics_from_columns(columns, wanted)
+    except Exception:
+        return None
+
+
+def _quarterly_series(columns: dict, wanted: set[str]) -> dict:
+    """Align statement columns by date and derive the per-quarter ratio series.
+
+    Every derived value at index ``i`` depends only on quarters ``i`` and
+    older, so slicing from ``i`` gives the series as it stood at ``dates[i]``.
+    """
+    needed_series = {s for m in wanted for s in METRIC_DEPENDENCIES.get(m, ())}
+    columns = {name: columns.get(name) or _NO_COLUMNS for name in statements_for_metrics(wanted)}
+
+    dates = tuple(sorted(set().union(*(c["dates"] for c in columns.values())), reverse=True))
+
+    def series(name):
+        if name not in needed_series:
+            return [None] * len(dates)
+        column = columns[SERIES_FIELDS[name][0]]
+        values = column.get(name, ())
+        if column["dates"] == dates:
+            return list(values)
+        by_date = dict(zip(column["dates"], values))
+        return [by_date.get(d) for d in dates]
+
+    q = {"dates": dates}
+    for name in SERIES_FIELDS:
+        q[name] = series(name)
+    revenue = q["revenue"]
+    cost = q["cost"]
+    rd = q["rd"]
+    sga = q["sga"]
+
+    gross_margin_pct = []
+    opex_pct = []
+    qoq_rev_growth_pct = []
+    yoy_rev_growth_pct = []
+    rd_pct = []
+    delta_gm_pp_yoy = []
+    delta_rd_pct_pp_yoy = []
 
-        revenue = [g(d, inc_map, "revenue") for d in dates]
-        cost = [g(d, inc_map, "costOfRevenue") for d in dates]
-        op_income = [g(d, inc_map, "operatingIncome") for d in dates]
-        rd = [g(d, inc_map, "researchAndDevelopmentExpenses") for d in dates]
-        sga = [g(d, inc_map, "sellingGeneralAndAdministrativeExpenses") for d in dates]
-        ocf = [g(d, cash_map, "netCashProvidedByOperatingActivities") for d in dates]
-        capex = [g(d, cash_map, "capitalExpenditure") for d in dates]
-        deferred_rev = [g(d, bs_map, "deferredRevenue") for d in dates]
-        ar = [g(d, bs_map, "netReceivables", "accountsReceivable") for d in dates]
-        inventory = [g(d, bs_map, "inventory") for d in dates]
-        ap = [g(d, bs_map, "accountPayables", "accountsPayable", "accountsPayables") for d in dates]
-
-        gross_margin_pct = []
-        opex_pct = []
-        qoq_rev_growth_pct = []
-        yoy_rev_growth_pct = []
-        rd_pct = []
-        delta_gm_pp_yoy = []
-        delta_rd_pct_pp_yoy = []
-
-        for i, rev in enumerate(revenue):
-            if rev and rev > 0:
-                c = cost[i] if i < len(cost) else None
-                gm = (rev - c) / rev * 100 if c is not None else None
-                gross_margin_pct.append(gm)
-                r = rd[i] if i < len(rd) else None
-                s = sga[i] if i < len(sga) else None
-                if r is not None and s is not None:
-                    opex_pct.append((r + s) / rev * 100)
-                else:
-                    opex_pct.append(None)
-                rd_pct.append(r / rev * 100 if r is not None else None)
+    for i, rev in enumerate(revenue):
+        if rev and rev > 0:
+            c = cost[i] if i < len(cost) else None
+            gm = (rev - c) / rev * 100 if c is not None else None
+            gross_margin_pct.append(gm)
+            r = rd[i] if i < len(rd) else None
+            s = sga[i] if i < len(sga) else None
+            if r is not None and s is not None:
+                opex_pct.append((r + s) / rev * 100)
             else:
-                gross_margin_pct.append(None)
                 opex_pct.append(None)
-                rd_pct.append(None)
+            rd_pct.append(r / rev * 100 if r is not None else None)
+        else:
+            gm = None
+            gross_margin_pct.append(None)
+            opex_pct.append(None)
+            rd_pct.append(None)
 
-            # QoQ growth
-            if i + 1 < len(revenue) and revenue[i + 1] and revenue[i + 1] > 0 and rev is not None:
-                qoq = (rev - revenue[i + 1]) / revenue[i + 1] * 100
-                qoq_rev_growth_pct.append(qoq)
-            else:
-                qoq_rev_growth_pct.append(None)
-
-            if i + 4 < len(revenue) and revenue[i + 4] and revenue[i + 4] > 0 and rev is not None:
-                yoy = (rev - revenue[i + 4]) / revenue[i + 4] * 100
-                yoy_rev_growth_pct.append(yoy)
-                gm_prev = gross_margin_pct[i + 4] if i + 4 < len(gross_margin_pct) else None
-                rd_prev = rd_pct[i + 4] if i + 4 < len(rd_pct) else None
-                if gm is not None and gm_prev is not None:
-                    delta_gm_pp_yoy.append(gm - gm_prev)
-                else:
-                    delta_gm_pp_yoy.append(None)
-                if rd_pct[i] is not None and rd_prev is not None:
-                    delta_rd_pct_pp_yoy.append(rd_pct[i] - rd_prev)
-                else:
-                    delta_rd_pct_pp_yoy.append(None)
+        # QoQ growth
+        if i + 1 < len(revenue) and revenue[i + 1] and revenue[i + 1] > 0 and rev is not None:
+            qoq = (rev - revenue[i + 1]) / revenue[i + 1] * 100
+            qoq_rev_growth_pct.append(qoq)
+        else:
+            qoq_rev_growth_pct.append(None)
+
+        if i + 4 < len(revenue) and revenue[i + 4] and revenue[i + 4] > 0 and rev is not None:
+            yoy = (rev - revenue[i + 4]) / revenue[i + 4] * 100
+            yoy_rev_growth_pct.append(yoy)
+            gm_prev = gross_margin_pct[i + 4] if i + 4 < len(gross_margin_pct) else None
+            rd_prev = rd_pct[i + 4] if i + 4 < len(rd_pct) else None
+            if gm is not None and gm_prev is not None:
+                delta_gm_pp_yoy.append(gm - gm_prev)
             else:
-                yoy_rev_growth_pct.append(None)
                 delta_gm_pp_yoy.append(None)
+            if rd_pct[i] is not None and rd_prev is not None:
+                delta_rd_pct_pp_yoy.append(rd_pct[i] - rd_prev)
+            else:
                 delta_rd_pct_pp_yoy.append(None)
+        else:
+            yoy_rev_growth_pct.append(None)
+            delta_gm_pp_yoy.append(None)
+            delta_rd_pct_pp_yoy.append(None)
 
-        rev_ttm = sum(x for x in revenue[:4] if x is not None)
-        op_income_ttm = sum(x for x in op_income[:4] if x is not None)
-        ocf_ttm = sum(x for x in ocf[:4] if x is not None)
-        capex_ttm = sum(x for x in capex[:4] if x is not None)
-
-        op_margin_ttm = (op_income_ttm / rev_ttm * 100) if rev_ttm else None
-        prev_rev = sum(x for x in revenue[4:8] if x is not None)
-        rev_growth_ttm_pct = ((rev_ttm - prev_rev) / prev_rev * 100) if prev_rev else None
-        prev_ocf = sum(x for x in ocf[4:8] if x is not None)
-        delta_ocf_ttm_yoy = ocf_ttm - prev_ocf if prev_ocf or prev_ocf == 0 else None
-        rd_growth_yoy_pct = ((rd[0] - rd[4]) / rd[4] * 100) if len(rd) > 4 and rd[4] not in [None, 0] and rd[0] is not None else None
-
-        opex_slope = _linear_slope(opex_pct[:4])
-
-        declines = 0
-        for i in range(3):
-            if i + 1 < len(revenue) and revenue[i] is not None and revenue[i + 1] is not None:
-                if revenue[i] < revenue[i + 1]:
-                    declines += 1
-
-        yoy_growth_quarter_count = sum(1 for v in yoy_rev_growth_pct[:4] if v is not None and v >= 0)
-
-        rd_growth_lte_rev_growth_boolean = None
-        if rd_growth_yoy_pct is not None and rev_growth_ttm_pct is not None:
-            rd_growth_lte_rev_growth_boolean = rd_growth_yoy_pct <= rev_growth_ttm_pct
-
-        deferred_rev_yoy_increase = None
-        if len(deferred_rev) > 4 and deferred_rev[0] is not None and deferred_rev[4] is not None:
-            deferred_rev_yoy_increase = deferred_rev[0] > deferred_rev[4]
-
-        days = 90
-        dso = []
-        dio = []
-        dpo = []
-        ccc = []
-        for i, rev in enumerate(revenue):
-            ar_v = ar[i] if i < len(ar) else None
-            inv_v = inventory[i] if i < len(inventory) else None
-            ap_v = ap[i] if i < len(ap) else None
-            cost_v = cost[i] if i < len(cost) else None
-            dso.append((ar_v / rev) * days if rev not in [None, 0] and ar_v is not None else None)
-            dio.append((inv_v / cost_v) * days if cost_v not in [None, 0] and inv_v is not None else None)
-            dpo.append((ap_v / cost_v) * days if cost_v not in [None, 0] and ap_v is not None else None)
-            if dso[-1] is not None and dio[-1] is not None and dpo[-1] is not None:
-                ccc.append(dso[-1] + dio[-1] - dpo[-1])
-            else:
-                ccc.append(None)
-
-        ccc_slope_last4 = _linear_slope(ccc[:4])
-
-        rule40_op_ttm = None
-        if rev_growth_ttm_pct is not None and op_margin_ttm is not None:
-            rule40_op_ttm = rev_growth_ttm_pct + op_margin_ttm
-
-        capex_pct = (abs(capex_ttm) / rev_ttm * 100) if rev_ttm else None
-
-        metrics = {
-            "rev_ttm": rev_ttm if rev_ttm else None,
-            "yoy_rev_growth_pct_array": yoy_rev_growth_pct,
-            "yoy_growth_quarter_count": yoy_growth_quarter_count,
-            "max_qoq_rev_declines_last4": declines,
-            "gross_margin_pct_latest": gross_margin_pct[0] if gross_margin_pct else None,
-            "delta_gm_pp_yoy_latest": delta_gm_pp_yoy[0] if delta_gm_pp_yoy else None,
-            "opex_pct_slope_last4": opex_slope,
-            "ocf_ttm": ocf_ttm if ocf_ttm or ocf_ttm == 0 else None,
-            "delta_ocf_ttm_yoy": delta_ocf_ttm_yoy,
-            "rd_pct_latest": rd_pct[0] if rd_pct else None,
-            "delta_rd_pct_pp_yoy_latest": delta_rd_pct_pp_yoy[0] if delta_rd_pct_pp_yoy else None,
-            "rd_growth_lte_rev_growth_boolean": rd_growth_lte_rev_growth_boolean,
-            "deferred_rev_yoy_increase": deferred_rev_yoy_increase,
-            "ccc_slope_last4": ccc_slope_last4,
-            "rule40_op_ttm": rule40_op_ttm,
-            "capex_pct": capex_pct,
-        }
-        return metrics
-    except Exception:
-        return None
+    days = 90
+    ccc = []
+    for i, rev in enumerate(revenue):
+        ar_v = q["ar"][i] if i < len(q["ar"]) else None
+        inv_v = q["inventory"][i] if i < len(q["inventory"]) else None
+        ap_v = q["ap"][i] if i < len(q["ap"]) else None
+        cost_v = cost[i] if i < len(cost) else None
+        dso = (ar_v / rev) * days if rev not in [None, 0] and ar_v is not None else None
+        dio = (inv_v / cost_v) * days if cost_v not in [None, 0] and inv_v is not None else None
+        dpo = (ap_v / cost_v) * days if cost_v not in [None, 0] and ap_v is not None else None
+        if dso is not None and dio is not None and dpo is not None:
+            ccc.append(dso + dio - dpo)
+        else:
+            ccc.append(None)
+
+    q.update(
+        gross_margin_pct=gross_margin_pct,
+        opex_pct=opex_pct,
+        qoq_rev_growth_pct=qoq_rev_growth_pct,
+        yoy_rev_growth_pct=yoy_rev_growth_pct,
+        rd_pct=rd_pct,
+        delta_gm_pp_yoy=delta_gm_pp_yoy,
+        delta_rd_pct_pp_yoy=delta_rd_pct_pp_yoy,
+        ccc=ccc,
+    )
+    return q
+
+
+def _metrics_at(q: dict, i: int, wanted: set[str], yoy_length: int | None = None) -> dict:
+    """Return the metrics as of quarter ``i`` of ``_quarterly_series`` output ``q``.
+
+    ``yoy_length`` truncates ``yoy_rev_growth_pct_array``; by default it runs
+    from quarter ``i`` to the oldest quarter.
+    """
+    revenue = q["revenue"]
+    op_income = q["op_income"]
+    rd = q["rd"]
+    ocf = q["ocf"]
+    capex = q["capex"]
+    deferred_rev = q["deferred_rev"]
+    yoy_rev_growth_pct = q["yoy_rev_growth_pct"]
+
+    def at(values, k):
+        return values[k] if k < len(values) else None
+
+    rev_ttm = sum(x for x in revenue[i:i + 4] if x is not None)
+    op_income_ttm = sum(x for x in op_income[i:i + 4] if x is not None)
+    ocf_ttm = sum(x for x in ocf[i:i + 4] if x is not None)
+    capex_ttm = sum(x for x in capex[i:i + 4] if x is not None)
+
+    op_margin_ttm = (op_income_ttm / rev_ttm * 100) if rev_ttm else None
+    prev_rev = sum(x for x in revenue[i + 4:i + 8] if x is not None)
+    rev_growth_ttm_pct = ((rev_ttm - prev_rev) / prev_rev * 100) if prev_rev else None
+    prev_ocf = sum(x for x in ocf[i + 4:i + 8] if x is not None)
+    delta_ocf_ttm_yoy = ocf_ttm - prev_ocf if prev_ocf or prev_ocf == 0 else None
+    rd_growth_yoy_pct = ((rd[i] - rd[i + 4]) / rd[i + 4] * 100) if len(rd) > i + 4 and rd[i + 4] not in [None, 0] and rd[i] is not None else None
+
+    opex_slope = _linear_slope(q["opex_pct"][i:i + 4])
+
+    declines = 0
+    for k in range(i, i + 3):
+        if k + 1 < len(revenue) and revenue[k] is not None and revenue[k + 1] is not None:
+            if revenue[k] < revenue[k + 1]:
+                declines += 1
+
+    yoy_growth_quarter_count = sum(1 for v in yoy_rev_growth_pct[i:i + 4] if v is not None and v >= 0)
+
+    rd_growth_lte_rev_growth_boolean = None
+    if rd_growth_yoy_pct is not None and rev_growth_ttm_pct is not None:
+        rd_growth_lte_rev_growth_boolean = rd_growth_yoy_pct <= rev_growth_ttm_pct
+
+    deferred_rev_yoy_increase = None
+    if len(deferred_rev) > i + 4 and deferred_rev[i] is not None and deferred_rev[i + 4] is not None:
+        deferred_rev_yoy_increase = deferred_rev[i] > deferred_rev[i + 4]
+
+    ccc_slope_last4 = _linear_slope(q["ccc"][i:i + 4])
+
+    rule40_op_ttm = None
+    if rev_growth_ttm_pct is not None and op_margin_ttm is not None:
+        rule40_op_ttm = rev_growth_ttm_pct + op_margin_ttm
+
+    capex_pct = (abs(capex_ttm) / rev_ttm * 100) if rev_ttm else None
+
+    yoy_end = None if yoy_length is None else i + yoy_length
+    result = {
+        "rev_ttm": rev_ttm if rev_ttm else None,
+        "yoy_rev_growth_pct_array": yoy_rev_growth_pct[i:yoy_end],
+        "yoy_growth_quarter_count": yoy_growth_quarter_count,
+        "max_qoq_rev_declines_last4": declines,
+        "gross_margin_pct_latest": at(q["gross_margin_pct"], i),
+        "delta_gm_pp_yoy_latest": at(q["delta_gm_pp_yoy"], i),
+        "opex_pct_slope_last4": opex_slope,
+        "ocf_ttm": ocf_ttm if ocf_ttm or ocf_ttm == 0 else None,
+        "delta_ocf_ttm_yoy": delta_ocf_ttm_yoy,
+        "rd_pct_latest": at(q["rd_pct"], i),
+        "delta_rd_pct_pp_yoy_latest": at(q["delta_rd_pct_pp_yoy"], i),
+        "rd_growth_lte_rev_growth_boolean": rd_growth_lte_rev_growth_boolean,
+        "deferred_rev_yoy_increase": deferred_rev_yoy_increase,
+        "ccc_slope_last4": ccc_slope_last4,
+        "rule40_op_ttm": rule40_op_ttm,
+        "capex_pct": capex_pct,
+    }
+    return {k: v for k, v in result.items() if k in wanted}
+
+
+def metrics_from_columns(columns: dict, metrics=None) -> dict:
+    """Compute MVP metrics from ``project_statement`` columns without any I/O.
+
+    ``columns`` maps statement names to their projected columns; statements
+    not needed by ``metrics`` may be omitted.
+    """
+    wanted = set(METRIC_DEPENDENCIES) if metrics is None else set(metrics)
+    result = {}
+    for group in _alignment_groups(columns, wanted):
+        result.update(_metrics_at(_quarterly_series(columns, group), 0, group))
+    return result
+
+
+def metric_history_from_columns(columns: dict, metrics=None,
+                                yoy_length: int = 4) -> tuple[tuple, list[dict]]:
+    """Return ``(dates, history)`` with the metrics as of every reported quarter.
+
+    ``history[i]`` equals ``metrics_from_columns`` evaluated on only the
+    statements dated on or before ``dates[i]`` (newest first), so no later
+    data leaks into a past quarter.  Quarters are keyed by period end; the
+    filing lag is not modelled.  ``yoy_rev_growth_pct_array`` keeps its
+    first ``yoy_length`` quarters, which is all the MVP filters read.
+    """
+    wanted = set(METRIC_DEPENDENCIES) if metrics is None else set(metrics)
+    columns = {name: columns.get(name) or _NO_COLUMNS for name in statements_for_metrics(wanted)}
+    dates = tuple(sorted(set().union(*(c["dates"] for c in columns.values())), reverse=True))
+    history = [{} for _ in dates]
+    for group in _alignment_groups(columns, wanted):
+        q = _quarterly_series(columns, group)
+        j = 0
+        for i, date in enumerate(dates):
+            # Latest quarter of this group's own statements on or before ``date``
+            while j < len(q["dates"]) and q["dates"][j] > date:
+                j += 1
+            history[i].update(_metrics_at(q, j, group, yoy_length))
+    return dates, history
+
+
+def _alignment_groups(columns: dict, wanted: set[str]) -> list[set[str]]:
+    """Split ``wanted`` by the quarter dates of each metric's own statements.
+
+    Every metric is aligned on the dates of the statements it reads, so its
+    value does not depend on which other statements were fetched alongside
+    it.  Metrics whose statements share the same dates are computed together.
+    """
+    groups: dict[frozenset, set[str]] = {}
+    for metric in wanted:
+        names = statements_for_metrics({metric})
+        dates = frozenset().union(*((columns.get(n) or _NO_COLUMNS)["dates"] for n in names))
+        groups.setdefault(dates, set()).add(metric)
+    return list(groups.values())
+
+
+def _weighted_score(metrics: dict, weights: dict[str, float]) -> float | None:
+    """Return ``sum(weight * metric)``, or ``None`` if any weighted metric is missing."""
+    score = 0.0
+    for metric, weight in weights.items():
+        value = metrics.get(metric)
+        if value is None:
+            return None
+        score += weight * float(value)
+    return score
+
+
+def _compute_shard(store_path: str, symbols: list[str]) -> dict[str, dict]:
+    """Worker entry point: compute metrics for ``symbols`` from the store.
+
+    A symbol whose statements cannot be computed is skipped so it does not
+    abort the rest of its shard.
+    """
+    store = StatementStore(store_path, readonly=True)
+    try:
+        results = {}
+        for symbol in symbols:
+            columns = {name: store.get(symbol, name) for name in STATEMENTS}
+            if not any(columns.values()):
+                continue
+            try:
+                results[symbol] = metrics_from_columns(columns)
+            except Exception:
+                continue
+        return results
+    finally:
+        store.close()
+
+
+def compute_metrics_bulk(symbols, store_path: str, workers: int | None = None,
+                         shard_size: int = 250) -> dict[str, dict]:
+    """Compute metrics for many symbols across a process pool.
+
+    Symbols are split into shards of ``shard_size``; each worker opens the
+    statement store at ``store_path`` read-only so only symbol names and
+    metric dicts cross process boundaries.  Symbols with nothing stored, or
+    whose metrics fail to compute, are omitted from the result.
+    """
+    symbols = list(symbols)
+    shards = [symbols[i:i + shard_size] for i in range(0, len(symbols), shard_size)]
+    results: dict[str, dict] = {}
+    if not shards:
+        return results
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_compute_shard, store_path, shard) for shard in shards]
+        for future in concurrent.futures.as_completed(futures):
+            results.update(future.result())
+    return results
 
 
 class StockDataService:
     """Backend service handling data retrieval from the API."""
 
-    def __init__(self, api_key: str, base_url: str, quote_url: str):
+    def __init__(self, api_key: str, base_url: str, quote_url: str,
+                 snapshot_path: str | None = None, symbol_directory_path: str | None = None):
         self.api_key = api_key
         self.base_url = base_url
         self.quote_url = quote_url
+        # Local typeahead index, loaded on the first Stock Search
+        self.symbol_directory_path = symbol_directory_path
+        self._symbol_directory = None
+        self._symbol_directory_retry_at = 0.0
+        # Precomputed metrics answer MVP filters without network calls
+        self.snapshot = None
+        if snapshot_path and os.path.exists(snapshot_path):
+            self.snapshot = MetricsSnapshot(snapshot_path)
         self._income_cache: dict[str, list] = {}
-        self._metrics_cache: dict[str, dict] = {}
+        self._profile_cache: dict[str, CacheEntry] = {}
+        self._metrics_cache: dict[str, CacheEntry] = {}
+        self._match_counter: MatchCounter | None = None
+        self._match_counter_size = -1
+        self._match_counter_lock = threading.Lock()
+        self._snapshot_metrics: dict[str, dict] | None = None
+        # (screener params, raw screener results, fetched at) of the last fetch
+        self._last_candidates: tuple[dict, list, float] | None = None
+        # Streaming per-sector distributions for percentile filters, fed as
+        # metrics enter the cache
+        self.quantiles = SectorQuantiles(PERCENTILE_METRICS)
+        self._sectors: dict[str, str] = {}
+        self.stats = stats
 
     def _build_query(self, params: dict, exclude: set[str] | None = None,
-                     default_limit: int | None = 20) -> str:
+                     default_limit: int | None = SCREENER_DEFAULT_LIMIT) -> str:
         """Convert params to a query string."""
         exclude = exclude or set()
         parts = []
@@ -242,51 +1050,102 @@ class StockDataService:
             query += f"&limit={default_limit}"
         return query
 
-    def search(self, params: dict) -> list:
-        """Return a list of search results based on provided parameters."""
+    def _split_params(self, params: dict) -> tuple[dict, dict]:
+        """Return ``(screener_params, mvp_params)`` for a search request."""
         params = dict(params)
         params.setdefault("isActivelyTrading", True)
+        mvp_params = {k: params.pop(k) for k in list(params.keys()) if k in MVP_KEYS}
+        return params, mvp_params
 
-        mvp_keys = {
-            "rev_ttm_min",
-            "yoy_rev_growth_pct_min",
-            "yoy_growth_quarter_count_min",
-            "max_qoq_rev_declines_last4",
-            "gross_margin_pct_min",
-            "delta_gm_pp_yoy_min",
-            "opex_pct_slope_last4_max",
-            "ocf_ttm_min",
-            "delta_ocf_ttm_yoy_min",
-            "rd_pct_max",
-            "delta_rd_pct_pp_yoy_max",
-            "rd_growth_lte_rev_growth",
-            "deferred_rev_yoy_increase",
-            "ccc_slope_last4_max",
-            "rule40_op_ttm_min",
-            "capex_pct_max",
-        }
-
-        mvp_params = {k: params.pop(k) for k in list(params.keys()) if k in mvp_keys}
-
+    def _fetch_candidates(self, params: dict) -> list:
+        """Query the screener (or symbol search) and apply local dividend filtering."""
         if "stockSearch" in params:
             symbol_fragment = params["stockSearch"]
             if not symbol_fragment:
                 return []
+            directory = self.get_symbol_directory()
+            if directory is not None:
+                return self._apply_dividend_filter(directory.search(str(symbol_fragment), limit=10), params)
             url = (
                 "https://financialmodelingprep.com/api/v3/search?"
                 f"query={symbol_fragment}&limit=10&exchange=NASDAQ&apikey={self.api_key}"
                 f"&isActivelyTrading=true"
             )
         else:
+            refined = self._refine_candidates(params)
+            if refined is not None:
+                return self._apply_dividend_filter(refined, params)
             query = self._build_query(params)
             url = f"{self.base_url}{query}&apikey={self.api_key}"
 
-        response = requests.get(url)
+        response = _get(url)
         data = response.json()
         if isinstance(data, list):
             for item in data:
                 if "name" not in item and "company" in item:
                     item["name"] = item["company"]
+                if item.get("symbol") and item.get("sector"):
+                    self._sectors[item["symbol"]] = item["sector"]
+            if "stockSearch" not in params:
+                self._last_candidates = (dict(params), data, time.monotonic())
+        return self._apply_dividend_filter(data, params)
+
+    def _refine_candidates(self, params: dict) -> list | None:
+        """Narrow the last screener results locally when ``params`` only tighten them.
+
+        Returns ``None`` when a network fetch is required: the previous
+        results are missing, stale or were cut off by ``limit``, or ``params``
+        loosen or change a filter that cannot be re-applied locally.
+        """
+        last = self._last_candidates
+        if last is None:
+            return None
+        old, data, fetched_at = last
+        if time.monotonic() - fetched_at > REFINE_TTL:
+            return None
+        try:
+            old_limit = int(old.get("limit", SCREENER_DEFAULT_LIMIT))
+            new_limit = int(params.get("limit", SCREENER_DEFAULT_LIMIT))
+        except (TypeError, ValueError):
+            return None
+        # A full page may have hidden matches the tighter query would surface
+        if len(data) >= old_limit and params != old:
+            return None
+
+        bounds = []
+        for key in set(old) | set(params):
+            if key == "limit":
+                continue
+            if key not in params:
+                return None
+            if key not in SCREENER_BOUNDS:
+                if old.get(key) != params[key]:
+                    return None
+                continue
+            try:
+                new_val = float(params[key])
+                old_val = float(old[key]) if key in old else None
+            except (TypeError, ValueError):
+                return None
+            field, lower = SCREENER_BOUNDS[key]
+            if old_val is not None and (new_val < old_val if lower else new_val > old_val):
+                return None
+            if field is not None and new_val != old_val:
+                bounds.append((field, lower, new_val))
+
+        refined = []
+        for item in data:
+            for field, lower, bound in bounds:
+                value = item.get(field)
+                if value is None:
+                    return None
+                if value < bound if lower else value > bound:
+                    break
+            else:
+                refined.append(item)
+        return refined[:new_limit]
+
+    def _apply_dividend_filter(self, data: list, params: dict) -> list:
         if "dividendMoreThan" in params:
             try:
                 threshold = float(params["dividendMoreThan"])
@@ -302,28 +1161,371 @@ class StockDataService:
                 if div >= threshold:
                     filtered.append(item)
             data = filtered
+        return data
+
+    def get_symbol_directory(self) -> SymbolDirectory | None:
+        """Return the local symbol directory, loading or refreshing it daily.
+
+        Returns ``None`` when no directory path is configured or the list
+        cannot be obtained, in which case the remote search endpoint is used.
+        """
+        if not self.symbol_directory_path:
+            return None
+        directory = self._symbol_directory
+        if (directory is None or directory.is_stale()) and time.monotonic() >= self._symbol_directory_retry_at:
+            if self._symbol_directory_retry_at:
+                stats.record_retry("available-traded")
+            try:
+                directory = SymbolDirectory.load(self.symbol_directory_path, self._fetch_symbol_list)
+                self._symbol_directory_retry_at = 0.0
+            except Exception:
+                # Keep any stale directory and stop hitting the list endpoint
+                # on every keystroke until the retry interval passes
+                self._symbol_directory_retry_at = time.monotonic() + SYMBOL_DIRECTORY_RETRY_SECONDS
+            self._symbol_directory = directory
+        return directory
+
+    def _fetch_symbol_list(self) -> list:
+        url = f"https://financialmodelingprep.com/api/v3/available-traded/list?apikey={self.api_key}"
+        data = _get(url, timeout=30).json()
+        return [
+            {
+                "symbol": item.get("symbol"),
+                "name": item.get("name"),
+                "exchangeShortName": item.get("exchangeShortName"),
+            }
+            for item in data
+            if isinstance(item, dict) and item.get("symbol")
+        ]
+
+    def bulk_refresh_metrics(self, symbols=None, workers: int | None = None) -> int:
+        """Recompute metrics from the statement store and merge them into the cache.
+
+        ``symbols`` defaults to every symbol in the store.  Returns the number
+        of symbols refreshed.
+        """
+        if _statement_store is None:
+            raise ValueError("bulk refresh requires set_statement_store() to be configured")
+        if symbols is None:
+            symbols = _statement_store.symbols()
+        results = compute_metrics_bulk(symbols, _statement_store.path, workers=workers)
+        for symbol, metrics in results.items():
+            self._metrics_cache[symbol] = CacheEntry(CacheEntry.VALID, metrics)
+            self.quantiles.observe(symbol, self._sectors.get(symbol), metrics)
+        return len(results)
+
+    def _get_metrics(self, symbol: str, needed: set[str] | None = None) -> dict | None:
+        """Return cached metrics for ``symbol``, computing any of ``needed`` that are missing.
+
+        Symbols without fundamentals are negative-cached for ``NEGATIVE_TTL``
+        and transient fetch errors are retried only after their backoff.
+        """
+        if needed is None:
+            needed = set(METRIC_DEPENDENCIES)
+        now = time.monotonic()
+        entry = self._metrics_cache.get(symbol)
+        if entry is not None and entry.fresh(now):
+            if entry.status != CacheEntry.VALID or needed <= set(entry.value):
+                stats.record_cache("metrics", True)
+                return entry.value
+        stats.record_cache("metrics", False)
+
+        if entry is None and self.snapshot is not None:
+            snapped = self.snapshot.get(symbol)
+            stats.record_cache("snapshot", snapped is not None)
+            if snapped is not None:
+                self._metrics_cache[symbol] = CacheEntry(CacheEntry.VALID, snapped)
+                self.quantiles.observe(symbol, self._sectors.get(symbol), snapped)
+                return snapped
+
+        stale = None
+        if entry is not None and entry.status == CacheEntry.VALID and not entry.fresh(now):
+            # The statements behind these metrics expired: recompute all of them
+            stale = entry.value
+            needed = needed | set(stale)
+        base = entry.value if entry is not None and entry.status == CacheEntry.VALID and stale is None else None
+        missing = needed - set(base or ())
+        computed = compute_mvp_metrics(symbol, self.api_key, metrics=missing)
+        status, expires = statement_status(symbol, statements_for_metrics(missing))
+        if status == CacheEntry.ERROR:
+            if stale is not None:
+                self._metrics_cache[symbol] = CacheEntry(CacheEntry.VALID, stale, expires)
+                return stale
+            if base is None:
+                attempts = entry.attempts + 1 if entry is not None and entry.status == CacheEntry.ERROR else 1
+                self._metrics_cache[symbol] = CacheEntry(CacheEntry.ERROR, None, expires, attempts)
+            return None
+        if base is not None:
+            if entry.expires is not None:
+                expires = entry.expires if expires is None else min(expires, entry.expires)
+            entry = CacheEntry(CacheEntry.VALID, {**base, **(computed or {})}, expires)
+        elif computed is None or status == CacheEntry.EMPTY:
+            entry = CacheEntry.empty(computed)
+        else:
+            entry = CacheEntry(CacheEntry.VALID, computed, expires)
+        self._metrics_cache[symbol] = entry
+        if entry.status == CacheEntry.VALID:
+            self.quantiles.observe(symbol, self._sectors.get(symbol), entry.value)
+        return entry.value
+
+    def _observe_candidates(self, data: list, mvp_params: dict, needed: set[str], should_stop=None):
+        """Load metrics for every candidate before percentile filters are evaluated.
+
+        Percentile cutoffs depend on the whole candidate set, so the first
+        row must not be judged against a distribution missing the others.
+        Each row is observed under its own sector, since metrics cached
+        before the sector was known never reached that sector's sketch.
+        """
+        if not any(key in PERCENTILE_FILTERS for key in mvp_params):
+            return
+        for item in data:
+            if should_stop is not None and should_stop():
+                return
+            if item.get("symbol"):
+                metrics = self._get_metrics(item["symbol"], needed)
+                if metrics:
+                    self.quantiles.observe(item["symbol"], item.get("sector"), metrics)
+
+    def _filter_by_metrics(self, data: list, mvp_params: dict) -> list:
+        needed = metrics_for_filters(mvp_params)
+        self._observe_candidates(data, mvp_params, needed)
+        filtered = []
+        for item in data:
+            symbol = item.get("symbol")
+            if not symbol:
+                continue
+            metrics = self._get_metrics(symbol, needed)
+            if not metrics:
+                continue
+            if self._passes_mvp_filters(metrics, mvp_params, item.get("sector")):
+                filtered.append(item)
+        return filtered
+
+    def search(self, params: dict) -> list:
+        """Return a list of search results based on provided parameters."""
+        params, mvp_params = self._split_params(params)
+        data = self._fetch_candidates(params)
         if mvp_params:
-            filtered = []
-            for item in data:
-                symbol = item.get("symbol")
-                if not symbol:
-                    continue
-                metrics = self._metrics_cache.get(symbol)
-                if metrics is None:
-                    metrics = compute_mvp_metrics(symbol, self.api_key)
-                    self._metrics_cache[symbol] = metrics
-                if not metrics:
-                    continue
-                if self._passes_mvp_filters(metrics, mvp_params):
-                    filtered.append(item)
-            data = filtered
+            data = self._filter_by_metrics(data, mvp_params)
         return data
 
+    def match_counter(self) -> MatchCounter:
+        """Return match-count estimates over every symbol with known metrics.
+
+        Cheap enough for every slider move: the last built counter is
+        returned as is and only built here when none exists yet.  Metrics
+        cached since are picked up by :meth:`refresh_match_counter`.
+        """
+        counter = self._match_counter
+        return counter if counter is not None else self.refresh_match_counter()
+
+    def refresh_match_counter(self) -> MatchCounter:
+        """Rebuild the match counter if the metrics cache has changed size.
+
+        The universe is the snapshot plus the in-memory metrics cache.  Safe
+        to call from a worker thread: readers keep the previous counter until
+        the new one is swapped in.
+        """
+        with self._match_counter_lock:
+            size = len(self._metrics_cache)
+            if self._match_counter is None or size != self._match_counter_size:
+                if self._snapshot_metrics is None:
+                    snapshot = self.snapshot
+                    self._snapshot_metrics = (
+                        {symbol: snapshot.get(symbol) for symbol in snapshot.symbols}
+                        if snapshot is not None else {}
+                    )
+                universe = dict(self._snapshot_metrics)
+                for symbol, entry in list(self._metrics_cache.items()):
+                    if entry.status == CacheEntry.VALID and entry.value:
+                        universe[symbol] = entry.value
+                self._match_counter = MatchCounter(universe)
+                self._match_counter_size = size
+            return self._match_counter
+
+    def search_local(self, params: dict) -> list | None:
+        """Answer ``params`` from data already in memory, or return ``None``.
+
+        Used for instant previews while a slider is dragged: screener rows
+        come from :meth:`_refine_candidates` and MVP filters only consult
+        metrics that are already cached (even if past their TTL) or in the
+        snapshot.  Nothing here touches the network.
+        """
+        params, mvp_params = self._split_params(params)
+        if "stockSearch" in params:
+            return None
+        data = self._refine_candidates(params)
+        if data is None:
+            return None
+        data = self._apply_dividend_filter(data, params)
+        if not mvp_params:
+            return data
+        needed = metrics_for_filters(mvp_params)
+        filtered = []
+        for item in data:
+            symbol = item.get("symbol")
+            if not symbol:
+                continue
+            known, metrics = self._known_metrics(symbol, needed, allow_stale=True)
+            if not known:
+                return None
+            if metrics and self._passes_mvp_filters(metrics, mvp_params, item.get("sector")):
+                filtered.append(item)
+        return filtered
+
+    def _known_metrics(self, symbol: str, needed: set[str], allow_stale: bool = False) -> tuple[bool, dict | None]:
+        """Return ``(known, metrics)`` using only the cache and the snapshot.
+
+        ``known`` is false when ``_get_metrics`` would have to fetch.  Stale
+        cache entries are accepted only with ``allow_stale``.
+        """
+        entry = self._metrics_cache.get(symbol)
+        if entry is not None and (allow_stale or entry.fresh(time.monotonic())):
+            if entry.status != CacheEntry.VALID or needed <= set(entry.value):
+                return True, entry.value
+        if entry is None and self.snapshot is not None and symbol in self.snapshot:
+            return True, self.snapshot.get(symbol)
+        return False, None
+
+    def _score_bound(self, symbol: str, weights: dict[str, float], needed: set[str]) -> float:
+        """Return the exact score if known without fetching, else an upper bound."""
+        known, metrics = self._known_metrics(symbol, needed)
+        if known:
+            score = _weighted_score(metrics, weights) if metrics else None
+            return -math.inf if score is None else score
+        bound = 0.0
+        for metric, weight in weights.items():
+            if not weight:
+                # 0 * inf would turn the bound into nan
+                continue
+            low, high = METRIC_RANGES.get(metric, (-math.inf, math.inf))
+            bound += weight * (high if weight > 0 else low)
+        return bound
+
+    def search_ranked(self, params: dict, weights: dict[str, float],
+                      candidate_limit: int = RANK_CANDIDATE_LIMIT) -> list:
+        """Return the ``limit`` best candidates by weighted metric score, best first.
+
+        Up to ``candidate_limit`` screener rows are scored as
+        ``sum(weight * metric)``; MVP filters in ``params`` still apply and
+        rows missing a weighted metric are skipped.  Rows are visited in order
+        of their score bound (exact for cached metrics, from
+        ``METRIC_RANGES`` otherwise), so fetching stops as soon as no
+        remaining row can beat the current K-th best; percentile filters
+        need every candidate's metrics first, so they load all of them.  Each
+        returned item gains a ``score`` key.
+        """
+        params = dict(params)
+        k = int(params.pop("limit", SCREENER_DEFAULT_LIMIT))
+        if k <= 0:
+            return []
+        params["limit"] = candidate_limit
+        screener_params, mvp_params = self._split_params(params)
+        data = self._fetch_candidates(screener_params)
+        needed = metrics_for_filters(mvp_params) | set(weights)
+        self._observe_candidates(data, mvp_params, needed)
+
+        bounded = []
+        for i, item in enumerate(data):
+            symbol = item.get("symbol")
+            if symbol:
+                bounded.append((self._score_bound(symbol, weights, needed), i, item))
+        bounded.sort(key=lambda entry: -entry[0])
+
+        top: list[tuple[float, int, dict]] = []
+        for bound, i, item in bounded:
+            if len(top) >= k and (bound, -i) < top[0][:2]:
+                break
+            metrics = self._get_metrics(item["symbol"], needed)
+            if not metrics or (mvp_params and not self._passes_mvp_filters(metrics, mvp_params, item.get("sector"))):
+                continue
+            score = _weighted_score(metrics, weights)
+            if score is None:
+                continue
+            # Ties keep screener order: the earlier row has the larger -i
+            entry = (score, -i, {**item, "score": score})
+            if len(top) < k:
+                heapq.heappush(top, entry)
+            elif entry[:2] > top[0][:2]:
+                heapq.heapreplace(top, entry)
+        return [item for _score, _i, item in sorted(top, key=lambda e: e[:2], reverse=True)]
+
+    def iter_search(self, params: dict, on_candidates=None, should_stop=None):
+        """Yield search results one at a time as soon as each passes all filters.
+
+        ``on_candidates`` is called with the screener results before any
+        fundamentals are fetched, e.g. to prefetch quotes for every candidate.
+        ``should_stop`` is checked before each symbol's fundamentals are
+        fetched; once it returns true the stream ends, even if no further
+        result would have been yielded.
+        """
+        params, mvp_params = self._split_params(params)
+        data = self._fetch_candidates(params)
+        if on_candidates is not None:
+            on_candidates(data)
+        if not mvp_params:
+            yield from data
+            return
+        needed = metrics_for_filters(mvp_params)
+        self._observe_candidates(data, mvp_params, needed, should_stop)
+        for item in data:
+            if should_stop is not None and should_stop():
+                return
+            symbol = item.get("symbol")
+            if not symbol:
+                continue
+            metrics = self._get_metrics(symbol, needed)
+            if metrics and self._passes_mvp_filters(metrics, mvp_params, item.get("sector")):
+                yield item
+
+    def search_many(self, algorithms: dict[str, dict], max_workers: int = 4) -> dict[str, list]:
+        """Evaluate several saved algorithms while sharing fetched data.
+
+        Algorithms with identical screener parameters share a single screener
+        request, and fundamentals are computed once for the union of all
+        candidate symbols before each algorithm's MVP filters are applied.
+        Returns a mapping of algorithm name to its list of results.
+        """
+        split = {name: self._split_params(params) for name, params in algorithms.items()}
+        query_keys = {
+            name: tuple(sorted(screener_params.items(), key=repr))
+            for name, (screener_params, _) in split.items()
+        }
+
+        # One screener request per distinct set of screener parameters
+        candidates: dict[tuple, list] = {}
+        for name, (screener_params, _) in split.items():
+            if query_keys[name] not in candidates:
+                candidates[query_keys[name]] = self._fetch_candidates(screener_params)
+
+        # Union of symbols needing fundamentals, each fetched exactly once
+        # with every metric any algorithm requires for that symbol
+        needed: dict[str, set[str]] = {}
+        for name, (_, mvp_params) in split.items():
+            if not mvp_params:
+                continue
+            wanted = metrics_for_filters(mvp_params)
+            for item in candidates[query_keys[name]]:
+                symbol = item.get("symbol")
+                if symbol:
+                    needed.setdefault(symbol, set()).update(wanted)
+        if needed:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+                list(pool.map(self._get_metrics, needed, needed.values()))
+
+        results: dict[str, list] = {}
+        for name, (_, mvp_params) in split.items():
+            data = candidates[query_keys[name]]
+            if mvp_params:
+                data = self._filter_by_metrics(data, mvp_params)
+            results[name] = list(data)
+        return results
+
     def get_quotes(self, symbols: list[str]) -> list:
         if not symbols:
             return []
         url = f"{self.quote_url}{','.join(symbols)}?apikey={self.api_key}"
-        response = requests.get(url)
+        response = _get(url)
         return response.json()
 
     def get_historical_prices(self, symbol: str) -> list:
@@ -332,7 +1534,7 @@ class StockDataService:
                 "https://financialmodelingprep.com/api/v3/historical-chart/5min/"
                 f"{symbol}?apikey={self.api_key}"
             )
-            response = requests.get(url)
+            response = _get(url)
             data = response.json()
             return [
                 (datetime.strptime(item["date"], "%Y-%m-%d %H:%M:%S"), item["close"])
@@ -342,20 +1544,22 @@ class StockDataService:
             return []
 
     def get_profile(self, symbol: str) -> dict:
-        """Return company profile data for the given symbol."""
-        try:
-            url = (
-                f"https://financialmodelingprep.com/api/v3/profile/{symbol}?apikey={self.api_key}"
+        """Return company profile data for the given symbol.
+
+        Profiles are cached for ``PROFILE_TTL`` and then revalidated with a
+        conditional request.
+        """
+        entry = self._profile_cache.get(symbol)
+        if entry is None or not entry.fresh():
+            url = f"https://financialmodelingprep.com/api/v3/profile/{symbol}?apikey={self.api_key}"
+            entry = _fetch_entry(
+                url, entry, lambda data: (data[0] if data else {}) if isinstance(data, list) else data,
+                PROFILE_TTL,
             )
-            response = requests.get(url)
-            data = response.json()
-            if isinstance(data, list):
-                return data[0] if data else {}
-            return data
-        except Exception:
-            return {}
+            self._profile_cache[symbol] = entry
+        return entry.value if entry.status == CacheEntry.VALID else {}
 
-    def _passes_mvp_filters(self, m: dict, p: dict) -> bool:
+    def _passes_mvp_filters(self, m: dict, p: dict, sector: str | None = None) -> bool:
         if "rev_ttm_min" in p:
             if m.get("rev_ttm") is None or m["rev_ttm"] < p["rev_ttm_min"]:
                 return False
@@ -420,4 +1624,12 @@ class StockDataService:
             val = m.get("capex_pct")
             if val is None or val > p["capex_pct_max"]:
                 return False
+        for key, (metric, upper) in PERCENTILE_FILTERS.items():
+            if key not in p:
+                continue
+            val = m.get(metric)
+            cutoff = self.quantiles.cutoff(metric, sector, p[key], upper)
+            # NaN cutoffs (nothing observed yet) fail both comparisons
+            if val is None or not (val <= cutoff if upper else val >= cutoff):
+                return False
         return True
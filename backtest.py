@@ -0,0 +1,202 @@
+"""Point-in-time metric history and backtests of saved algorithms.
+
+:class:`MetricHistory` holds every MVP metric as a symbols × quarters matrix
+built with ``backend.metric_history_from_columns``, so each cell only uses
+statements that existed at that quarter.  :func:`run_backtest` evaluates an
+algorithm's MVP filters one quarter column at a time and reports which
+symbols passed.
+
+Company fiscal quarters end on different days, so each period end is mapped
+to the calendar quarter containing it (``"2024Q3"``).
+
+Run against a statement store filled by normal use or ``bulk_refresh_metrics``::
+
+    python backtest.py statements.db --params '{"gross_margin_pct_min": 40}'
+"""
+
+from backend import (
+    METRIC_DEPENDENCIES,
+    MVP_KEYS,
+    PERCENTILE_FILTERS,
+    STATEMENTS,
+    metric_history_from_columns,
+)
+from statement_store import StatementStore
+
+
+def calendar_quarter(date: str) -> str:
+    """Return the calendar quarter label, e.g. ``"2024Q3"``, for an ISO date."""
+    year, month = date[:4], int(date[5:7])
+    return f"{year}Q{(month - 1) // 3 + 1}"
+
+
+class MetricHistory:
+    """Metrics for many symbols across calendar quarters.
+
+    ``values[metric][row][col]`` is the metric for ``symbols[row]`` as of
+    ``quarters[col]`` (oldest first), or ``None`` when unknown.
+    """
+
+    def __init__(self, symbols: list[str], quarters: list[str], values: dict[str, list[list]]):
+        self.symbols = symbols
+        self.quarters = quarters
+        self.values = values
+        self._quarter_index = {q: i for i, q in enumerate(quarters)}
+
+    @classmethod
+    def from_columns(cls, columns_by_symbol: dict[str, dict], metrics=None) -> "MetricHistory":
+        """Build the matrix from ``project_statement`` columns per symbol.
+
+        Symbols whose statements cannot be evaluated are left out, matching
+        ``compute_mvp_metrics`` returning ``None`` for them.
+        """
+        metrics = list(METRIC_DEPENDENCIES) if metrics is None else list(metrics)
+        per_symbol = {}
+        for symbol, columns in columns_by_symbol.items():
+            try:
+                dates, history = metric_history_from_columns(columns, metrics)
+            except Exception:
+                continue
+            by_quarter = {}
+            # Newest first, so a later filing in the same quarter wins
+            for date, row in zip(dates, history):
+                by_quarter.setdefault(calendar_quarter(date), row)
+            per_symbol[symbol] = by_quarter
+
+        symbols = sorted(per_symbol)
+        quarters = sorted({q for by_quarter in per_symbol.values() for q in by_quarter})
+        values = {}
+        for metric in metrics:
+            matrix = []
+            for symbol in symbols:
+                by_quarter = per_symbol[symbol]
+                matrix.append([
+                    by_quarter[q].get(metric) if q in by_quarter else None
+                    for q in quarters
+                ])
+            values[metric] = matrix
+        return cls(symbols, quarters, values)
+
+    @classmethod
+    def from_store(cls, store: StatementStore, symbols=None, metrics=None) -> "MetricHistory":
+        """Build the matrix from statements saved in a :class:`StatementStore`."""
+        if symbols is None:
+            symbols = store.symbols()
+        columns_by_symbol = {}
+        for symbol in symbols:
+            columns = {name: store.get(symbol, name) for name in STATEMENTS}
+            if any(columns.values()):
+                columns_by_symbol[symbol] = columns
+        return cls.from_columns(columns_by_symbol, metrics)
+
+    def column(self, metric: str, quarter: str) -> list:
+        """Return ``metric`` for every symbol as of ``quarter``."""
+        col = self._quarter_index[quarter]
+        return [row[col] for row in self.values[metric]]
+
+
+def _lower(values, threshold):
+    return [v is not None and v >= threshold for v in values]
+
+
+def _upper(values, threshold):
+    return [v is not None and v <= threshold for v in values]
+
+
+# Filter key -> (metric, comparison), mirroring ``_passes_mvp_filters``
+_SIMPLE_FILTERS = {
+    "rev_ttm_min": ("rev_ttm", _lower),
+    "max_qoq_rev_declines_last4": ("max_qoq_rev_declines_last4", _upper),
+    "gross_margin_pct_min": ("gross_margin_pct_latest", _lower),
+    "delta_gm_pp_yoy_min": ("delta_gm_pp_yoy_latest", _lower),
+    "opex_pct_slope_last4_max": ("opex_pct_slope_last4", _upper),
+    "ocf_ttm_min": ("ocf_ttm", _lower),
+    "delta_ocf_ttm_yoy_min": ("delta_ocf_ttm_yoy", _lower),
+    "rd_pct_max": ("rd_pct_latest", _upper),
+    "delta_rd_pct_pp_yoy_max": ("delta_rd_pct_pp_yoy_latest", _upper),
+    "ccc_slope_last4_max": ("ccc_slope_last4", _upper),
+    "rule40_op_ttm_min": ("rule40_op_ttm", _lower),
+    "capex_pct_max": ("capex_pct", _upper),
+}
+_BOOLEAN_FILTERS = {
+    "rd_growth_lte_rev_growth": "rd_growth_lte_rev_growth_boolean",
+    "deferred_rev_yoy_increase": "deferred_rev_yoy_increase",
+}
+
+
+def _quarter_mask(history: MetricHistory, quarter: str, params: dict) -> list[bool]:
+    mask = [True] * len(history.symbols)
+    for key, value in params.items():
+        if key in _SIMPLE_FILTERS:
+            metric, compare = _SIMPLE_FILTERS[key]
+            passed = compare(history.column(metric, quarter), value)
+        elif key in _BOOLEAN_FILTERS:
+            if not value:
+                continue
+            passed = [bool(v) for v in history.column(_BOOLEAN_FILTERS[key], quarter)]
+        elif key == "yoy_rev_growth_pct_min" or (
+            key == "yoy_growth_quarter_count_min" and "yoy_rev_growth_pct_min" not in params
+        ):
+            threshold = params.get("yoy_rev_growth_pct_min", 0)
+            min_count = params.get("yoy_growth_quarter_count_min", 1)
+            passed = [
+                sum(1 for x in (arr or [])[:4] if x is not None and x >= threshold) >= min_count
+                for arr in history.column("yoy_rev_growth_pct_array", quarter)
+            ]
+        else:
+            continue
+        mask = [a and b for a, b in zip(mask, passed)]
+    return mask
+
+
+class BacktestResult:
+    """Symbols passing an algorithm at each quarter of a backtest."""
+
+    def __init__(self, passed: dict[str, list[str]], ignored: list[str]):
+        self.passed = passed
+        # Screener and percentile filters have no history and are skipped
+        self.ignored = ignored
+
+    def counts(self) -> dict[str, int]:
+        return {quarter: len(symbols) for quarter, symbols in self.passed.items()}
+
+
+def run_backtest(params: dict, history: MetricHistory, start: str | None = None,
+                 end: str | None = None) -> BacktestResult:
+    """Evaluate a saved algorithm's MVP filters at every quarter of ``history``.
+
+    ``start`` and ``end`` are inclusive quarter labels such as ``"2015Q1"``.
+    """
+    # Percentile filters need sector distributions the history does not keep
+    mvp_params = {k: v for k, v in params.items() if k in MVP_KEYS and k not in PERCENTILE_FILTERS}
+    ignored = sorted(k for k in params if k not in mvp_params)
+    passed = {}
+    for quarter in history.quarters:
+        if (start and quarter < start) or (end and quarter > end):
+            continue
+        mask = _quarter_mask(history, quarter, mvp_params)
+        passed[quarter] = [s for s, ok in zip(history.symbols, mask) if ok]
+    return BacktestResult(passed, ignored)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Backtest MVP filters over stored statements.")
+    parser.add_argument("store", help="statement store written by the screener")
+    parser.add_argument("--params", required=True, help="JSON object of saved algorithm params")
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    args = parser.parse_args()
+
+    store = StatementStore(args.store, readonly=True)
+    try:
+        result = run_backtest(json.loads(args.params), MetricHistory.from_store(store),
+                              args.start, args.end)
+    finally:
+        store.close()
+    for quarter, symbols in result.passed.items():
+        print(f"{quarter}: {len(symbols):5d}  {' '.join(symbols[:10])}")
+    if result.ignored:
+        print(f"Ignored screener filters: {', '.join(result.ignored)}")
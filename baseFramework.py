@@ -9,8 +9,26 @@ from constants import (
     get_label_from_param_key as util_get_label_from_param_key,
     get_preview_description as util_get_preview_description,
 )
-from backend import StockDataService
+from backend import MVP_KEYS, StockDataService, set_transport
+from http_archive import ArchiveTransport
+from match_counts import ESTIMATED_FILTERS
+from live_quotes import DEFAULT_INTERVAL_MS, POLL_MS, QuoteRefresher
+from profiling import profiler
+from collections import deque
 from datetime import datetime
+import os
+import queue
+import threading
+import time
+
+# Bounds of the adaptive debounce applied to filter-driven searches
+MIN_SEARCH_DEBOUNCE_MS = 10
+MAX_SEARCH_DEBOUNCE_MS = 300
+# Hidden result tiles kept for reuse across searches
+MAX_POOLED_TILES = 100
+TILE_BINDTAG = "StockTile"
+# Drag ghost moves are batched to roughly one per 60 Hz display frame
+DRAG_FRAME_MS = 16
 
 def format_number(value: float) -> str:
     """Return a human-readable string with comma separators."""
@@ -73,32 +91,40 @@ def calculate_intraday_change(price, previous_close) -> tuple[float, float]:
     return change, percent
 
 
+def _count_widgets(widget) -> int:
+    """Return the number of descendants of ``widget``."""
+    total = 0
+    for child in widget.winfo_children():
+        total += 1 + _count_widgets(child)
+    return total
+
+
 class ToolTip:
-    """Lightweight tooltip that follows the cursor."""
-
-    # Track the currently displayed tooltip so only one is visible at a time
-    _active_tip = None
-
-    def __init__(self, widget, text: str):
-        self.widget = widget
-        self.text = text
-        self.tipwindow = None
-        widget.bind("<Enter>", self.show)
-        widget.bind("<Leave>", self.hide)
-        widget.bind("<Motion>", self.move)
-
-    def show(self, event=None):
-        if ToolTip._active_tip and ToolTip._active_tip is not self:
-            ToolTip._active_tip.hide()
-        if self.tipwindow or not self.text:
+    """Single pooled tooltip window shared by every widget with a tooltip.
+
+    Widgets are registered with :func:`add_tooltip`.  One application-wide
+    ``<Motion>``/``<Leave>`` binding looks up the registered ancestor of the
+    widget under the cursor, so children need no bindings of their own and
+    hovering only re-texts and moves the pre-created window.
+    """
+
+    _texts: dict = {}
+    _window = None
+    _label = None
+    _owner = None
+
+    @classmethod
+    def install(cls, root):
+        """Create the hidden tooltip window and the delegated bindings."""
+        if cls._window is not None:
             return
-        ToolTip._active_tip = self
-        self.tipwindow = tw = tk.Toplevel(self.widget)
+        tw = tk.Toplevel(root)
+        tw.withdraw()
         tw.overrideredirect(True)
         tw.attributes("-topmost", True)
-        label = tk.Label(
+        cls._label = tk.Label(
             tw,
-            text=self.text,
+            text="",
             background="#f6fbff",
             relief="solid",
             borderwidth=1,
@@ -106,58 +132,75 @@ class ToolTip:
             justify="left",
             wraplength=250,
         )
-        label.pack(ipadx=2)
-        self.move(event)
+        cls._label.pack(ipadx=2)
+        cls._window = tw
+        root.bind_all("<Motion>", cls._on_motion, add="+")
+        root.bind_all("<Leave>", cls._on_leave, add="+")
 
-    def move(self, event):
-        if not self.tipwindow:
+    @classmethod
+    def register(cls, widget, text: str):
+        if not text:
             return
-        x = (event.x_root if event else self.widget.winfo_pointerx()) + 12
-        y = (event.y_root if event else self.widget.winfo_pointery()) + 12
-        self.tipwindow.geometry(f"+{x}+{y}")
+        if cls._window is None:
+            cls.install(widget.winfo_toplevel())
+        cls._texts[widget] = text
 
-    def hide(self, event=None, force: bool = False):
-        if not self.tipwindow:
-            return
-        if not force:
-            # Only hide if the cursor is truly outside the widget hierarchy
-            x, y = self.widget.winfo_pointerx(), self.widget.winfo_pointery()
-            target = self.widget.winfo_containing(x, y)
-            if target and self._is_descendant(target):
-                return
+        def forget(event):
+            if event.widget is widget:
+                cls._texts.pop(widget, None)
+                if cls._owner is widget:
+                    cls.hide_active()
 
-        self.tipwindow.destroy()
-        self.tipwindow = None
-        if ToolTip._active_tip is self:
-            ToolTip._active_tip = None
+        widget.bind("<Destroy>", forget, add="+")
 
     @classmethod
-    def hide_active(cls, event=None):
-        """Hide the currently displayed tooltip, if any."""
-        if cls._active_tip:
-            cls._active_tip.hide(force=True)
-
+    def _owner_of(cls, widget):
+        """Return the registered widget containing ``widget``, if any."""
+        while widget is not None:
+            if widget in cls._texts:
+                return widget
+            widget = getattr(widget, "master", None)
+        return None
 
-    def _is_descendant(self, target):
-        while target:
-            if target is self.widget:
-                return True
-            target = target.master
-        return False
+    @classmethod
+    def _on_motion(cls, event):
+        owner = cls._owner_of(event.widget)
+        if owner is None:
+            cls.hide_active()
+            return
+        if owner is not cls._owner:
+            cls._label.config(text=cls._texts[owner])
+            if cls._owner is None:
+                cls._window.deiconify()
+                cls._window.lift()
+            cls._owner = owner
+        cls._window.geometry(f"+{event.x_root + 12}+{event.y_root + 12}")
 
+    @classmethod
+    def _on_leave(cls, event):
+        if cls._owner is None:
+            return
+        try:
+            # Only hide if the cursor is truly outside the widget hierarchy
+            x, y = cls._owner.winfo_pointerx(), cls._owner.winfo_pointery()
+            target = cls._owner.winfo_containing(x, y)
+        except tk.TclError:
+            target = None
+        if cls._owner_of(target) is None:
+            cls.hide_active()
 
-def add_tooltip(widget, text: str):
-    """Attach a single tooltip to *widget* and all of its children."""
-    tooltip = ToolTip(widget, text)
+    @classmethod
+    def hide_active(cls, event=None):
+        """Hide the tooltip, if shown."""
+        if cls._owner is None:
+            return
+        cls._owner = None
+        cls._window.withdraw()
 
-    def bind_children(w):
-        for child in w.winfo_children():
-            child.bind("<Enter>", tooltip.show, add="+")
-            child.bind("<Leave>", tooltip.hide, add="+")
-            child.bind("<Motion>", tooltip.move, add="+")
-            bind_children(child)
 
-    bind_children(widget)
+def add_tooltip(widget, text: str):
+    """Show ``text`` while the cursor is over *widget* or any of its children."""
+    ToolTip.register(widget, text)
 
 class DraggableBlock(tk.Frame):
     def __init__(self, master, preview_block, app, drop_target):
@@ -166,6 +209,9 @@ class DraggableBlock(tk.Frame):
         self.app = app
         self.drop_target = drop_target
         self._drag_window = None
+        self._ghost_key = None
+        self._drag_event = None
+        self._drag_after_id = None
         self.drag_data = {'x': 0, 'y': 0}
         self.bind_all_children(preview_block)
 
@@ -182,23 +228,50 @@ class DraggableBlock(tk.Frame):
     def start_drag(self, event):
         self.drag_data['x'] = event.x
         self.drag_data['y'] = event.y
+        self._drag_event = event
 
-        self._drag_window = tk.Toplevel(self)
-        self._drag_window.overrideredirect(True)
-        self._drag_window.attributes("-topmost", True)
+        ghost = self._ghost()
+        self._move_ghost()
+        ghost.deiconify()
+        ghost.lift()
 
-        # Clone appearance
-        clone = self.clone_preview_block()
-        clone.pack()
+    def _ghost(self):
+        """Return the drag ghost window, building it only on first use.
 
-        self._drag_window.update_idletasks()
-        self._drag_window.geometry(f"{clone.winfo_reqwidth()}x{clone.winfo_reqheight()}+0+0")
-        self._update_drag_window(event)
+        The ghost is withdrawn rather than destroyed after each drag.  Saved
+        algorithm previews are rebuilt if their summary text changed.
+        """
+        summary_label = getattr(self.preview_block, "_summary_label", None)
+        key = summary_label.cget("text") if summary_label is not None else None
+        if self._drag_window is not None and key != self._ghost_key:
+            self._drag_window.destroy()
+            self._drag_window = None
+        if self._drag_window is None:
+            self._drag_window = tk.Toplevel(self)
+            self._drag_window.withdraw()
+            self._drag_window.overrideredirect(True)
+            self._drag_window.attributes("-topmost", True)
+
+            # Clone appearance
+            clone = self.clone_preview_block()
+            clone.pack()
+
+            self._drag_window.update_idletasks()
+            self._drag_window.geometry(f"{clone.winfo_reqwidth()}x{clone.winfo_reqheight()}+0+0")
+            self._ghost_key = key
+        return self._drag_window
 
     def do_drag(self, event):
-        self._update_drag_window(event)
+        # Coalesce motion events into one move per display frame
+        self._drag_event = event
+        if self._drag_after_id is None:
+            self._drag_after_id = self.after(DRAG_FRAME_MS, self._move_ghost)
 
     def stop_drag(self, event):
+        if self._drag_after_id is not None:
+            self.after_cancel(self._drag_after_id)
+            self._drag_after_id = None
+
         abs_x = self.preview_block.winfo_rootx() - self.drag_data['x'] + event.x
         abs_y = self.preview_block.winfo_rooty() - self.drag_data['y'] + event.y
 
@@ -209,6 +282,10 @@ class DraggableBlock(tk.Frame):
 
         dropped_in_zone = drop_x0 <= abs_x <= drop_x1 and drop_y0 <= abs_y <= drop_y1
 
+        # Hide the ghost before adding the block so it never lingers on top
+        if self._drag_window:
+            self._drag_window.withdraw()
+
         if dropped_in_zone:
             label = self.preview_block._param_label
             if label in self.app.saved_algorithms:
@@ -216,11 +293,11 @@ class DraggableBlock(tk.Frame):
             else:
                 self.app.add_filter_block(label)
 
-        # Destroy immediately after drawing (or skipping drop)
-        if self._drag_window:
-            self._drag_window.destroy()
-
-    def _update_drag_window(self, event):
+    def _move_ghost(self):
+        self._drag_after_id = None
+        event = self._drag_event
+        if self._drag_window is None or event is None:
+            return
         x = self.preview_block.winfo_rootx() - self.drag_data['x'] + event.x
         y = self.preview_block.winfo_rooty() - self.drag_data['y'] + event.y
         self._drag_window.geometry(f"+{x}+{y}")
@@ -297,17 +374,19 @@ class DraggableBlock(tk.Frame):
 
 class StockScreenerApp:
     def __init__(self, root):
+        startup_start = time.perf_counter()
         self.root = root
         self.root.title("Block-Based Stock Screener")
         self.root.geometry("1300x750")
 
         self.api_key = 'YOUR_API_HERE'
         self.base_url = 'https://financialmodelingprep.com/api/v3/stock-screener?'
-        self.quote_url = 'https://financialmodelingprep.com/api/v3/quote/'
+        self.quote_url = os.environ.get("UPCOM_QUOTE_URL", 'https://financialmodelingprep.com/api/v3/quote/')
         self.params = {}
 
         self.snap_order = []
-        self.result_tiles = {}  # Needed for render_stock_tile and cleanup
+        self.result_tiles = {}  # Shown StockTile per symbol
+        self._tile_pool = []  # Hidden tiles ready for reuse
         self.saved_algorithms = {}
         # Additional metadata for each saved algorithm.  Each entry stores a
         # list describing the filter blocks (key, label and value) so the
@@ -318,12 +397,74 @@ class StockScreenerApp:
         self.algorithm_previews = {}
         # Name of the algorithm currently loaded in the editor, if any
         self.current_algorithm = None
-        self.backend = StockDataService(self.api_key, self.base_url, self.quote_url)
+        self.backend = StockDataService(
+            self.api_key, self.base_url, self.quote_url,
+            snapshot_path=os.environ.get("UPCOM_METRICS_SNAPSHOT", "metrics.snapshot"),
+            symbol_directory_path=os.environ.get("UPCOM_SYMBOL_DIRECTORY", "symbols.json"),
+        )
+        ToolTip.install(self.root)
         # Ensure tooltips vanish if the window loses focus or is minimized
         self.root.bind("<FocusOut>", ToolTip.hide_active)
         self.root.bind("<Unmap>", ToolTip.hide_active)
 
+        # Developer performance overlay (toggle with F12)
+        self.perf_timings = {}
+        self.stall_durations = deque(maxlen=50)
+        self.debug_overlay = None
+        self._heartbeat_id = None
+        self.heartbeat_ms = 100
+        self.root.bind("<F12>", self.toggle_debug_overlay)
+
+        # Adaptive search scheduling (see ``delayed_search``)
+        self.search_latencies = deque(maxlen=8)
+        self._search_delay_id = None
+        self._search_pending = False
+        self._preview_id = None
+
+        # Live prices for the tiles on screen
+        self.quote_refresher = QuoteRefresher(
+            self.root,
+            self.backend.get_quotes,
+            self.visible_tile_symbols,
+            self.apply_live_quotes,
+            interval_ms=int(os.environ.get("UPCOM_QUOTE_REFRESH_MS", DEFAULT_INTERVAL_MS)),
+        )
+        self.quote_refresher.start()
+        # Build match-count estimates from the snapshot before the first slider move
+        threading.Thread(target=self.backend.refresh_match_counter, name="match-counts", daemon=True).start()
+
+        self.setup_menu()
         self.setup_layout()
+        # Startup ends once the laid-out window has been painted: the root's
+        # first <Expose> comes after mapping, and the idle callback queued
+        # from it runs once Tk has finished redrawing.
+        self._startup_start = startup_start
+        self.root.bind("<Expose>", self._on_first_expose, add="+")
+
+    def _on_first_expose(self, event):
+        """Record the ``startup`` timing after the first paint of the root window."""
+        if event.widget is not self.root or getattr(self, "_startup_start", None) is None:
+            return
+        start, self._startup_start = self._startup_start, None
+        self.root.after_idle(lambda: self._record_perf("startup", start))
+
+    def setup_menu(self):
+        menubar = tk.Menu(self.root)
+        dev_menu = tk.Menu(menubar, tearoff=False)
+        dev_menu.add_command(label="Performance Overlay", accelerator="F12",
+                             command=self.toggle_debug_overlay)
+        self.profiling_var = tk.BooleanVar(value=profiler.enabled)
+        dev_menu.add_checkbutton(label="Profile Searches", variable=self.profiling_var,
+                                 command=self.toggle_profiling)
+        menubar.add_cascade(label="Developer", menu=dev_menu)
+        self.root.config(menu=menubar)
+
+    def toggle_profiling(self):
+        """Enable or disable cProfile/tracemalloc capture for each search."""
+        if self.profiling_var.get():
+            profiler.enable()
+        else:
+            profiler.disable()
 
     def setup_layout(self):
         # === LEFT PANEL ===
@@ -434,6 +575,9 @@ class StockScreenerApp:
             ("Cash Conversion Cycle Slope (last 4q) ≤", lambda: self.set_parameter("ccc_slope_last4_max", float)),
             ("Rule of 40 (Growth + Op Margin) ≥", lambda: self.set_parameter("rule40_op_ttm_min", float)),
             ("Capex % of Revenue ≤", lambda: self.set_parameter("capex_pct_max", float)),
+            ("Gross Margin Percentile in Sector ≥", lambda: self.set_parameter("gross_margin_pct_latest_pctl_min", float)),
+            ("Rule of 40 Percentile in Sector ≥", lambda: self.set_parameter("rule40_op_ttm_pctl_min", float)),
+            ("Capex % Percentile in Sector ≤", lambda: self.set_parameter("capex_pct_pctl_max", float)),
         ]
 
         categories = {
@@ -460,7 +604,16 @@ class StockScreenerApp:
             font=("Arial", 10, "bold"),
             command=self.update_current_algorithm,
         )
-        update_btn.pack(padx=10, pady=(0, 15), fill="x")
+        update_btn.pack(padx=10, pady=(0, 5), fill="x")
+
+        run_all_btn = tk.Button(
+            self.block_scroll,
+            text="▶ Run All Algorithms",
+            bg="#fff3cd", fg="#856404",
+            font=("Arial", 10, "bold"),
+            command=self.run_all_algorithms,
+        )
+        run_all_btn.pack(padx=10, pady=(0, 15), fill="x")
 
         self.algo_header = tk.Label(
             self.block_scroll,
@@ -475,24 +628,7 @@ class StockScreenerApp:
         self.algo_container = tk.Frame(self.block_scroll, bg="#f0f0f0")
         self.algo_container.pack(fill="x", padx=10)
 
-        mvp_keys = {
-            "rev_ttm_min",
-            "yoy_rev_growth_pct_min",
-            "yoy_growth_quarter_count_min",
-            "max_qoq_rev_declines_last4",
-            "gross_margin_pct_min",
-            "delta_gm_pp_yoy_min",
-            "opex_pct_slope_last4_max",
-            "ocf_ttm_min",
-            "delta_ocf_ttm_yoy_min",
-            "rd_pct_max",
-            "delta_rd_pct_pp_yoy_max",
-            "rd_growth_lte_rev_growth",
-            "deferred_rev_yoy_increase",
-            "ccc_slope_last4_max",
-            "rule40_op_ttm_min",
-            "capex_pct_max",
-        }
+        self._pending_previews = {}
 
         for label, callback in filters:
             param_key = self.get_param_key_from_label(label)
@@ -502,7 +638,7 @@ class StockScreenerApp:
                 categories["Drop Down Filters"].append((label, callback))
             elif param_key in ["marketCapMoreThan", "marketCapLowerThan"]:
                 categories["Write in Filters"].append((label, callback))
-            elif param_key in mvp_keys:
+            elif param_key in MVP_KEYS:
                 categories["MVP Filters"].append((label, callback))
             else:
                 categories["Numeric Filters"].append((label, callback))
@@ -535,16 +671,9 @@ class StockScreenerApp:
             group_frame = tk.Frame(self.block_scroll, bg="#f0f0f0")
             group_frame.pack(fill="x", padx=10)
 
-            for label, callback in group:
-                preview_block = self.create_filter_preview_block(label, group_frame)
-                preview_block.pack(pady=3)
-
-                DraggableBlock(
-                    master=self.left_frame,
-                    preview_block=preview_block,
-                    app=self,
-                    drop_target=self.block_area
-                )
+            # Preview blocks are built lazily: on first expand or in idle-time
+            # chunks once the window is interactive.
+            self._pending_previews[group_frame] = deque(label for label, _ in group)
 
             def toggle_group(btn=toggle_btn, frame=group_frame, header=header_frame):
                 """Show or hide the group's preview blocks.
@@ -558,6 +687,7 @@ class StockScreenerApp:
                     frame.pack_forget()
                     btn.config(text="▼")
                 else:
+                    self._build_preview_group(frame)
                     # Re-pack the frame after its header to preserve layout
                     frame.pack(fill="x", padx=10, after=header)
                     btn.config(text="▲")
@@ -574,6 +704,43 @@ class StockScreenerApp:
         # Give the preview list a bit of breathing room at the bottom
         tk.Frame(self.block_scroll, bg="#f0f0f0", height=5).pack(fill="x", pady=(0, 10))
 
+        self.root.after_idle(self._build_pending_previews)
+
+    def _build_preview(self, label, parent):
+        preview_block = self.create_filter_preview_block(label, parent)
+        preview_block.pack(pady=3)
+
+        DraggableBlock(
+            master=self.left_frame,
+            preview_block=preview_block,
+            app=self,
+            drop_target=self.block_area
+        )
+
+    def _build_preview_group(self, frame):
+        """Build any preview blocks of ``frame`` that are still pending."""
+        pending = self._pending_previews.pop(frame, None)
+        while pending:
+            self._build_preview(pending.popleft(), frame)
+
+    def _build_pending_previews(self, chunk_size=4):
+        """Build a few pending preview blocks and reschedule until done.
+
+        Spreading construction over idle callbacks keeps the window
+        responsive during startup instead of blocking until every block and
+        tooltip exists.
+        """
+        built = 0
+        while self._pending_previews and built < chunk_size:
+            frame, pending = next(iter(self._pending_previews.items()))
+            if pending:
+                self._build_preview(pending.popleft(), frame)
+                built += 1
+            if not pending:
+                del self._pending_previews[frame]
+        if self._pending_previews:
+            self.root.after_idle(self._build_pending_previews)
+
     def _on_results_mousewheel(self, event):
         self.results_canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
 
@@ -795,6 +962,11 @@ class StockScreenerApp:
                 value_label = tk.Label(slider_row, text="", font=("Arial", 9), bg="white")
                 value_label.place(in_=slider, relx=0, y=-8, anchor="s")
 
+                match_label = None
+                if base_key in ESTIMATED_FILTERS:
+                    match_label = tk.Label(title_row, text="", font=("Arial", 9), fg="gray", bg="white")
+                    match_label.pack(side="right", padx=(0, 6))
+
                 def update_value_display(val):
                     try:
                         numeric = float(val)
@@ -809,13 +981,16 @@ class StockScreenerApp:
                 def on_slider_move(val):
                     val_var.set(f"{float(val):,.2f}")
                     update_value_display(val)
+                    if match_label is not None:
+                        self.update_match_estimate(match_label, base_key, val)
+                    self.slider_update(key, val)
 
                 def on_slider_release(event):
                     try:
                         val = float(slider.get())
                         update_value_display(val)
                         self.params[key] = val
-                        self.update_display()
+                        self.delayed_search()
                     except ValueError:
                         self.params.pop(key, None)
 
@@ -824,7 +999,7 @@ class StockScreenerApp:
                         val = float(val_var.get().replace(',', ''))
                         slider.set(val)
                         self.params[key] = val
-                        self.update_display()
+                        self.delayed_search()
                     except ValueError:
                         self.params.pop(key, None)
 
@@ -835,6 +1010,8 @@ class StockScreenerApp:
                 slider.set(default)
                 val_var.set(f"{float(default):,.2f}")
                 update_value_display(default)
+                if match_label is not None:
+                    self.update_match_estimate(match_label, base_key, default)
                 self.params[key] = default
 
         elif base_key == "stockSearch":
@@ -906,7 +1083,7 @@ class StockScreenerApp:
                             self.params[key] = val
                         else:
                             self.params.pop(key, None)
-                        self.update_display()
+                        self.delayed_search()
                     except ValueError:
                         self.params.pop(key, None)
 
@@ -953,6 +1130,11 @@ class StockScreenerApp:
                 value_label = tk.Label(slider_row, text="", font=("Arial", 9), bg="white")
                 value_label.place(in_=slider, relx=0, y=-8, anchor="s")
 
+                match_label = None
+                if base_key in ESTIMATED_FILTERS:
+                    match_label = tk.Label(title_row, text="", font=("Arial", 9), fg="gray", bg="white")
+                    match_label.pack(side="right", padx=(0, 6))
+
                 def update_value_display(val):
                     try:
                         numeric = float(val)
@@ -969,14 +1151,16 @@ class StockScreenerApp:
                 def on_slider_move(val):
                     val_var.set(f"{float(val):,.2f}")
                     update_value_display(val)
+                    if match_label is not None:
+                        self.update_match_estimate(match_label, base_key, val)
+                    self.slider_update(key, val)
 
                 def on_slider_release(event):
                     try:
                         val = float(slider.get())
                         update_value_display(val)
-                        if key not in self.params or self.params[key] != val:
-                            self.params[key] = val
-                            self.update_display()
+                        self.params[key] = val
+                        self.delayed_search()
                     except ValueError:
                         self.params.pop(key, None)
 
@@ -986,7 +1170,7 @@ class StockScreenerApp:
                         slider.set(val)
                         self.params[key] = val
                         update_value_display(val)
-                        self.update_display()
+                        self.delayed_search()
                     except ValueError:
                         self.params.pop(key, None)
 
@@ -1010,15 +1194,31 @@ class StockScreenerApp:
         for i, (item_id, _) in enumerate(self.snap_order):
             self.snap_zone.coords(item_id, 10, 30 + i * 90)
 
-    def slider_update(self, key, val): 
+    def update_match_estimate(self, label, key, value):
+        """Show how many known symbols pass ``key`` at ``value`` on its own."""
+        try:
+            counter = self.backend.match_counter()
+            count = counter.count(key, float(value))
+        except Exception:
+            count = None
+        if not isinstance(count, int) or not counter.size:
+            label.config(text="")
+            return
+        label.config(text=f"≈{count:,} matches")
+
+    def slider_update(self, key, val):
+        """Track a slider while it is dragged and preview the results locally.
+
+        The real search is scheduled by the slider's release handler through
+        ``delayed_search``.
+        """
         try:
             val = float(val)
             if isinstance(self.params.get(key), int):
                 val = int(val)
             self.params[key] = val
 
-            self.update_display()
-            self.delayed_search()
+            self.preview_search()
         except Exception as e:
             print(f"Slider error: {e}")
 
@@ -1327,49 +1527,374 @@ class StockScreenerApp:
             default_value = 100.0 if value_type == float else 100
         self.params[key] = default_value
         self.add_filter_block(key, default_value)
-        self.update_display()
         self.delayed_search()
 
     def update_display(self):
-        self.search_stocks()
-        
-    def delayed_search(self, delay_ms=10):  # intentionally delay search to speed up snapping mechanism for the search blocks
-        if hasattr(self, '_search_delay_id'):
+        """Search the current params right away, unless a search is in flight.
+
+        Goes through :meth:`delayed_search` so discrete edits (typing a
+        symbol, loading an algorithm, clearing the workspace) respect the
+        one-search-at-a-time limit; they queue behind a running stream.
+        """
+        self.delayed_search(delay_ms=0)
+
+    def delayed_search(self, delay_ms=None):
+        """Schedule a search of the current params, coalescing bursts of changes.
+
+        At most one search is in flight: changes made while one runs are
+        searched with the latest params as soon as it finishes.  Unless
+        ``delay_ms`` is given the debounce grows with recent search latency,
+        so slow backends are not flooded while a slider is dragged.
+        """
+        if getattr(self, "_stream_token", None) is not None:
+            self._search_pending = True
+            return
+        if delay_ms is None:
+            delay_ms = self._search_debounce_ms()
+        if getattr(self, "_search_delay_id", None) is not None:
             self.root.after_cancel(self._search_delay_id)
-        self._search_delay_id = self.root.after(delay_ms, self.search_stocks)
+        self._search_delay_id = self.root.after(delay_ms, self._run_scheduled_search)
+
+    def _search_debounce_ms(self) -> int:
+        """Return half the median recent search latency, clamped to sensible bounds."""
+        latencies = sorted(getattr(self, "search_latencies", ()))
+        if not latencies:
+            return MIN_SEARCH_DEBOUNCE_MS
+        median_ms = latencies[len(latencies) // 2] * 1000
+        return int(min(max(median_ms / 2, MIN_SEARCH_DEBOUNCE_MS), MAX_SEARCH_DEBOUNCE_MS))
+
+    def _run_scheduled_search(self):
+        self._search_delay_id = None
+        self._search_pending = False
+        self.search_stocks()
+
+    def _search_finished(self, start):
+        """Record the latency of a finished search and run any queued one.
+
+        Metrics fetched by the search are folded into the match-count
+        estimates on a worker thread, so slider moves only ever bisect.
+        """
+        if not hasattr(self, "search_latencies"):
+            self.search_latencies = deque(maxlen=8)
+        self.search_latencies.append(time.perf_counter() - start)
+        threading.Thread(target=self.backend.refresh_match_counter, name="match-counts", daemon=True).start()
+        if getattr(self, "_search_pending", False):
+            self.delayed_search()
+
+    def preview_search(self):
+        """Queue a local-only preview of the current params for the next idle moment."""
+        if getattr(self, "_preview_id", None) is None:
+            self._preview_id = self.root.after_idle(self._run_preview)
+
+    def _run_preview(self):
+        """Redraw results from in-memory data while a real search is pending.
+
+        Skipped while a search is streaming or when the backend cannot
+        answer the params without a network round trip.
+        """
+        self._preview_id = None
+        if getattr(self, "_stream_token", None) is not None:
+            return
+        start = time.perf_counter()
+        data = self.backend.search_local(dict(self.params))
+        if not isinstance(data, list):
+            return
+        self._clear_results()
+        quotes = getattr(self, "_last_quote_map", {})
+        for item in data:
+            self._render_item(item, quotes)
+        if not data:
+            self._render_empty()
+        self._record_perf("preview", start)
 
     def search_stocks(self):
+        if not profiler.enabled:
+            self.stream_results(self.params)
+            return
+        # Profiled searches run to completion so one capture covers them
         try:
-            data = self.backend.search(self.params)
-            self.render_results(data)
+            with profiler.capture("search"):
+                start = time.perf_counter()
+                data = self.backend.search(self.params)
+                self._record_perf("backend.search", start)
+                self.render_results(data)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to fetch data:\n{e}")
+        self._update_debug_overlay()
+
+    def stream_results(self, params):
+        """Search with ``params`` and append tiles as each result arrives.
+
+        The backend stream is consumed on a worker thread and results are
+        handed to the UI through a queue polled from ``root.after``, so slow
+        fetches never block the event loop and the first tile appears after a
+        single symbol's latency instead of the whole batch.  Starting a new
+        stream abandons any stream still in progress.
+
+        ``backend.search`` in the overlay is the worker's time in the
+        backend (quote prefetch excluded); ``tiles`` and ``render_results``
+        are the UI thread's time building tiles and draining the queue.
+        """
+        self._clear_results()
+        self.root.after(50, lambda: self.results_canvas.yview_moveto(0))
+
+        results = queue.Queue()
+        state = {"start": time.perf_counter(), "count": 0, "quotes": {}, "cancelled": threading.Event(),
+                 "tiles": 0.0, "render": 0.0}
+        quote_seconds = []
+
+        def prefetch_quotes(candidates):
+            symbols = [item.get("symbol", "") for item in candidates if "symbol" in item]
+            start = time.perf_counter()
+            quotes = self._fetch_quote_map(symbols)
+            quote_seconds.append(time.perf_counter() - start)
+            self._record_duration("get_quotes", quote_seconds[-1])
+            results.put(("quotes", quotes))
+
+        def consume():
+            cancelled = state["cancelled"]
+            start = time.perf_counter()
+            stream = self.backend.iter_search(dict(params), on_candidates=prefetch_quotes,
+                                              should_stop=cancelled.is_set)
+            try:
+                for item in stream:
+                    if cancelled.is_set():
+                        return
+                    results.put(("item", item))
+                results.put(("done", time.perf_counter() - start - sum(quote_seconds)))
+            except Exception as e:
+                results.put(("error", e))
+            finally:
+                stream.close()
+
+        self._stream_token = token = object()
+        threading.Thread(target=consume, name="search-stream", daemon=True).start()
+        self.root.after(0, lambda: self._stream_step(token, results, state))
+
+    def _stream_step(self, token, results, state, budget=0.02):
+        """Render queued results for up to ``budget`` seconds, then poll again."""
+        if token is not getattr(self, "_stream_token", None):
+            state["cancelled"].set()
+            return
+        step_start = time.perf_counter()
+        deadline = step_start + budget
+        while time.perf_counter() < deadline:
+            try:
+                kind, value = results.get_nowait()
+            except queue.Empty:
+                state["render"] += time.perf_counter() - step_start
+                self.root.after(POLL_MS, lambda: self._stream_step(token, results, state))
+                return
+            if kind == "quotes":
+                state["quotes"] = self._last_quote_map = value
+            elif kind == "item":
+                if state["count"] == 0:
+                    self._record_perf("first_result", state["start"])
+                state["count"] += 1
+                tile_start = time.perf_counter()
+                self._render_item(value, state["quotes"])
+                state["tiles"] += time.perf_counter() - tile_start
+            elif kind == "done":
+                self._stream_token = None
+                self._record_duration("backend.search", value)
+                if not state["count"]:
+                    self._render_empty()
+                self._record_duration("tiles", state["tiles"])
+                self._record_duration("render_results", state["render"] + time.perf_counter() - step_start)
+                self._update_debug_overlay()
+                self._search_finished(state["start"])
+                return
+            else:
+                self._stream_token = None
+                messagebox.showerror("Error", f"Failed to fetch data:\n{value}")
+                self._search_finished(state["start"])
+                return
+        state["render"] += time.perf_counter() - step_start
+        self.root.after(1, lambda: self._stream_step(token, results, state))
+
+    def _record_perf(self, name, start):
+        """Store the seconds elapsed since ``start`` for the debug overlay."""
+        self._record_duration(name, time.perf_counter() - start)
+
+    def _record_duration(self, name, seconds):
+        """Store a duration in seconds for the debug overlay."""
+        if not hasattr(self, "perf_timings"):
+            self.perf_timings = {}
+        self.perf_timings[name] = seconds
+
+    def toggle_debug_overlay(self, event=None):
+        """Show or hide the developer performance overlay."""
+        if getattr(self, "debug_overlay", None) is not None:
+            self.debug_overlay.destroy()
+            self.debug_overlay = None
+            if self._heartbeat_id:
+                self.root.after_cancel(self._heartbeat_id)
+                self._heartbeat_id = None
+            return
+        self.debug_overlay = tk.Label(
+            self.right_frame,
+            text="",
+            bg="#222222",
+            fg="#9effa0",
+            font=("Courier", 9),
+            justify="left",
+            anchor="nw",
+        )
+        self.debug_overlay.place(relx=1.0, x=-24, y=14, anchor="ne")
+        self.stall_durations.clear()
+        self._last_heartbeat = time.perf_counter()
+        self._heartbeat_id = self.root.after(self.heartbeat_ms, self._heartbeat)
+        self._update_debug_overlay()
+
+    def _heartbeat(self):
+        """Measure how late the event loop ran this callback."""
+        now = time.perf_counter()
+        stall = now - self._last_heartbeat - self.heartbeat_ms / 1000
+        self.stall_durations.append(max(0.0, stall))
+        self._last_heartbeat = now
+        self._update_debug_overlay()
+        self._heartbeat_id = self.root.after(self.heartbeat_ms, self._heartbeat)
+
+    def format_debug_overlay(self) -> str:
+        """Return the text shown in the performance overlay."""
+        lines = []
+        timings = getattr(self, "perf_timings", {})
+        for name in ("backend.search", "first_result", "get_quotes", "tiles", "render_results", "preview", "startup"):
+            value = timings.get(name)
+            shown = f"{value * 1000:8.1f} ms" if value is not None else "       -"
+            lines.append(f"{name:<15}{shown}")
+        frame = getattr(self, "results_frame", None)
+        count = _count_widgets(frame) if frame is not None else 0
+        lines.append(f"{'widgets':<15}{count:8d}")
+        stalls = getattr(self, "stall_durations", ())
+        if stalls:
+            lines.append(f"{'stall max':<15}{max(stalls) * 1000:8.1f} ms")
+            lines.append(f"{'stall last':<15}{stalls[-1] * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    def _update_debug_overlay(self):
+        if getattr(self, "debug_overlay", None) is not None:
+            self.debug_overlay.config(text=self.format_debug_overlay())
+            self.debug_overlay.lift()
+
+    def run_saved_algorithms(self, names=None) -> tuple[dict, dict]:
+        """Evaluate several saved algorithms in one pass.
+
+        Returns ``(results, quote_map)`` where ``results`` maps each algorithm
+        name to its matches and ``quote_map`` holds a single quote lookup for
+        the union of all matched symbols.
+        """
+        if names is None:
+            names = list(self.saved_algorithms)
+        algorithms = {n: self.saved_algorithms[n] for n in names if n in self.saved_algorithms}
+        results = self.backend.search_many(algorithms)
+
+        symbols = []
+        for data in results.values():
+            for item in data:
+                symbol = item.get("symbol")
+                if symbol and symbol not in symbols:
+                    symbols.append(symbol)
+        return results, self._fetch_quote_map(symbols)
+
+    def run_all_algorithms(self):
+        """Run every saved algorithm and show the matches grouped by algorithm.
+
+        The shared fetch runs on a worker thread and the UI polls for its
+        result, so the window stays responsive while fundamentals load.
+        """
+        if not self.saved_algorithms:
+            messagebox.showinfo("Run All Algorithms", "No saved algorithms to run.")
+            return
+        # Abandon any streaming search so its tiles do not mix with these
+        self._stream_token = None
+        results = queue.Queue(maxsize=1)
+        start = time.perf_counter()
+
+        def run():
+            try:
+                results.put(("done", self.run_saved_algorithms()))
+            except Exception as e:
+                results.put(("error", e))
+
+        threading.Thread(target=run, name="run-algorithms", daemon=True).start()
+        self.root.after(POLL_MS, lambda: self._poll_algorithm_results(results, start))
+
+    def _poll_algorithm_results(self, results, start):
+        try:
+            kind, value = results.get_nowait()
+        except queue.Empty:
+            self.root.after(POLL_MS, lambda: self._poll_algorithm_results(results, start))
+            return
+        if kind == "error":
+            messagebox.showerror("Error", f"Failed to fetch data:\n{value}")
+            return
+        self.render_algorithm_results(*value)
+        self._record_perf("run_all_algorithms", start)
+        self._update_debug_overlay()
+
+    def render_algorithm_results(self, results, quote_map):
+        """Show each algorithm's matches under its own header.
+
+        A symbol matched by several algorithms is shown once, under the
+        first of them.
+        """
+        self._clear_results()
+        self.root.after(50, lambda: self.results_canvas.yview_moveto(0))
+        shown = set()
+        for name, data in results.items():
+            tk.Label(
+                self.results_frame,
+                text=f"{name} ({len(data)})",
+                bg="#e2e3e5", font=("Arial", 10, "bold"), anchor="w"
+            ).pack(padx=8, pady=(10, 2), fill="x")
+            for item in data:
+                symbol = item.get("symbol")
+                if symbol and symbol not in shown:
+                    shown.add(symbol)
+                    self._render_item(item, quote_map)
+        if not shown:
+            self._render_empty()
+
+    def _fetch_quote_map(self, symbols) -> dict:
+        quote_data = self.backend.get_quotes(symbols)
+        return {q["symbol"]: q for q in quote_data if "symbol" in q}
 
     def render_results(self, data):
+        render_start = time.perf_counter()
         # Clear old tiles
-        for widget in self.results_frame.winfo_children():
-            widget.destroy()
+        self._clear_results()
 
         self.root.after(50, lambda: self.results_canvas.yview_moveto(0))
 
         if isinstance(data, list) and data:
             symbols = [item.get("symbol", "") for item in data if "symbol" in item]
-            quote_data = self.backend.get_quotes(symbols)
-            quote_map = {q["symbol"]: q for q in quote_data if "symbol" in q}
+            start = time.perf_counter()
+            quote_map = self._fetch_quote_map(symbols)
+            self._record_perf("get_quotes", start)
 
+            start = time.perf_counter()
             for item in data:
-                symbol = item.get('symbol', 'N/A')
-                quote = quote_map.get(symbol, {})
-                # prefer name from item when available
-                if item.get('name'):
-                    quote = {**quote, 'name': item['name']}
-                self.render_stock_tile(symbol, quote)
+                self._render_item(item, quote_map)
+            self._record_perf("tiles", start)
         else:
-            tk.Label(
-                self.results_frame,
-                text="No results found or error in response.",
-                bg="white", fg="gray", font=("Arial", 11, "italic")
-            ).pack(pady=20)
+            self._render_empty()
+        self._record_perf("render_results", render_start)
+
+    def _render_item(self, item, quote_map):
+        symbol = item.get('symbol', 'N/A')
+        quote = quote_map.get(symbol, {})
+        # prefer name from item when available
+        if item.get('name'):
+            quote = {**quote, 'name': item['name']}
+        self.render_stock_tile(symbol, quote)
+
+    def _render_empty(self):
+        tk.Label(
+            self.results_frame,
+            text="No results found or error in response.",
+            bg="white", fg="gray", font=("Arial", 11, "italic")
+        ).pack(pady=20)
 
     def get_historical_prices(self, symbol):
         return self.backend.get_historical_prices(symbol)
@@ -1378,82 +1903,171 @@ class StockScreenerApp:
         return self.backend.get_profile(symbol)
 
     def render_stock_tile(self, symbol, quote_data, parent=None):
+        """Show ``symbol`` in a result tile, reusing a pooled tile when possible."""
         if parent is None:
             parent = self.results_frame
+        previous = self.result_tiles.pop(symbol, None)
+        if previous is not None:
+            self._release_tile(previous)
+        pool = self._tile_pool if parent is self.results_frame else []
+        tile = pool.pop() if pool else StockTile(parent, self)
+        tile.show(symbol, quote_data)
+        tile.frame.pack(padx=8, pady=6, fill="x")
+        self.result_tiles[symbol] = tile
+
+    def _release_tile(self, tile):
+        """Hide ``tile`` and keep it for reuse, up to ``MAX_POOLED_TILES``."""
+        tile.frame.pack_forget()
+        if tile.frame.master is self.results_frame and len(self._tile_pool) < MAX_POOLED_TILES:
+            self._tile_pool.append(tile)
+        else:
+            tile.frame.destroy()
+
+    def _clear_results(self):
+        """Return every shown tile to the pool and drop any other result widgets."""
+        if not hasattr(self, "result_tiles"):
+            self.result_tiles = {}
+        if not hasattr(self, "_tile_pool"):
+            self._tile_pool = []
+        for tile in self.result_tiles.values():
+            self._release_tile(tile)
+        self.result_tiles.clear()
+        for widget in self.results_frame.winfo_children():
+            if not isinstance(getattr(widget, "_tile", None), StockTile):
+                widget.destroy()
+
+    def visible_tile_symbols(self) -> list[str]:
+        """Return the symbols of tiles inside the visible part of the results canvas."""
+        canvas = self.results_canvas
+        top = canvas.canvasy(0)
+        bottom = top + canvas.winfo_height()
+        visible = []
+        for symbol, tile in self.result_tiles.items():
+            y = tile.frame.winfo_y()
+            if y + tile.frame.winfo_height() >= top and y <= bottom:
+                visible.append(symbol)
+        return visible
+
+    def apply_live_quotes(self, quotes: dict):
+        """Update prices on shown tiles in place from a ``symbol -> quote`` map."""
+        for symbol, quote in quotes.items():
+            tile = self.result_tiles.get(symbol)
+            if tile is not None:
+                tile.update_quote(quote)
+        if hasattr(self, "_last_quote_map"):
+            self._last_quote_map.update(quotes)
 
-        name = quote_data.get('name', 'Unknown Company')
-        price = quote_data.get('price', 0)
-        change = quote_data.get('changesPercentage', 0)
-        price_color = "green" if change >= 0 else "red"
+    def remove_stock_tile(self, symbol):
+        tile = self.result_tiles.pop(symbol, None)
+        if tile:
+            self._release_tile(tile)
+            self.results_canvas.yview_moveto(0)  # Scroll to top
 
-        frame = tk.Frame(parent, bd=1, relief="solid", bg="white")
-        frame.pack(padx=8, pady=6, fill="x")
-        self.result_tiles[symbol] = frame
+
+class StockTile:
+    """Widgets of one result tile, rebound to a new symbol each time it is shown.
+
+    Clicks anywhere on a tile except its buttons toggle the details dropdown.
+    They are handled by a single class binding on ``TILE_BINDTAG``, which is
+    added once to each of the tile's widgets when the tile is built.
+    """
+
+    def __init__(self, parent, app):
+        self.app = app
+        self.symbol = None
+        self.quote_data = {}
+        self.dropdown = None
+
+        self.frame = tk.Frame(parent, bd=1, relief="solid", bg="white")
 
         # Remove button
-        remove_btn = tk.Button(frame, text="✖", font=("Arial", 10), fg="#ff6b6b", bg="white", relief="flat",
-            command=lambda: self.remove_stock_tile(symbol))
-        remove_btn.place(relx=1.0, x=-16, y=4, anchor="ne")
-
-        dropdown_frame = [None]  # Lazy-loaded dropdown
-
-        def toggle_dropdown(btn):
-            if dropdown_frame[0] is None:
-                profile = self.get_profile(symbol)
-                dropdown = ResultDropdown(
-                    frame,
-                    symbol=symbol,
-                    quote_data=quote_data,
-                    profile_data=profile,
-                    backend=self.backend,
-                )
-                dropdown.pack(fill="x", padx=10, pady=(5, 10))
-                dropdown_frame[0] = dropdown
-                btn.config(text="▲")
-            else:
-                if dropdown_frame[0].winfo_ismapped():
-                    dropdown_frame[0].pack_forget()
-                    btn.config(text="▼")
-                else:
-                    dropdown_frame[0].pack(fill="x", padx=10, pady=(5, 10))
-                    btn.config(text="▲")
+        self.remove_btn = tk.Button(self.frame, text="✖", font=("Arial", 10), fg="#ff6b6b", bg="white", relief="flat",
+            command=lambda: self.app.remove_stock_tile(self.symbol))
+        self.remove_btn.place(relx=1.0, x=-16, y=4, anchor="ne")
 
         # Ticker + price
-        top_row = tk.Frame(frame, bg="white")
+        top_row = tk.Frame(self.frame, bg="white")
         top_row.pack(fill="x", padx=10, pady=(5, 0))
-        tk.Label(top_row, text=symbol, font=("Arial", 18, "bold"), fg="black", bg="white").pack(side="left")
-        tk.Label(top_row, text=f"{price:.2f}", font=("Arial", 18, "bold"), fg=price_color, bg="white").pack(side="right")
+        self.symbol_label = tk.Label(top_row, text="", font=("Arial", 18, "bold"), fg="black", bg="white")
+        self.symbol_label.pack(side="left")
+        self.price_label = tk.Label(top_row, text="", font=("Arial", 18, "bold"), bg="white")
+        self.price_label.pack(side="right")
 
         # Name + toggle
-        bottom_row = tk.Frame(frame, bg="white")
+        bottom_row = tk.Frame(self.frame, bg="white")
         bottom_row.pack(fill="x", padx=10, pady=(3, 8))
-        tk.Label(bottom_row, text=name, font=("Arial", 9), fg="gray", bg="white",
-                justify="left", anchor="w").pack(side="left", fill="x", expand=True)
-
-        toggle_btn = tk.Button(bottom_row, text="▼", font=("Arial", 10), bg="white", relief="flat")
-        toggle_btn.pack(side="right")
-        toggle_btn.config(command=lambda b=toggle_btn: toggle_dropdown(b))
-
-        # Allow clicking anywhere on the stock tile (including its child widgets)
-        # to toggle the dropdown.  Bind recursively so clicks on labels or other
-        # widgets also trigger the handler, while skipping the remove and toggle
-        # buttons to prevent duplicate toggles.
-        def on_tile_click(event, btn=toggle_btn):
-            if event.widget not in (btn, remove_btn):
-                toggle_dropdown(btn)
-
-        def bind_widget_tree(widget):
-            widget.bind("<Button-1>", on_tile_click, add="+")
-            for child in widget.winfo_children():
-                bind_widget_tree(child)
-
-        bind_widget_tree(frame)
-    
-    def remove_stock_tile(self, symbol):
-        frame = self.result_tiles.pop(symbol, None)
-        if frame:
-            frame.destroy()
-            self.results_canvas.yview_moveto(0)  # Scroll to top
+        self.name_label = tk.Label(bottom_row, text="", font=("Arial", 9), fg="gray", bg="white",
+                justify="left", anchor="w")
+        self.name_label.pack(side="left", fill="x", expand=True)
+
+        self.toggle_btn = tk.Button(bottom_row, text="▼", font=("Arial", 10), bg="white", relief="flat",
+            command=self.toggle_dropdown)
+        self.toggle_btn.pack(side="right")
+
+        for widget in (self.frame, top_row, bottom_row, self.symbol_label, self.price_label, self.name_label):
+            widget._tile = self
+            widget.bindtags((TILE_BINDTAG,) + tuple(widget.bindtags()))
+        self.frame.bind_class(TILE_BINDTAG, "<Button-1>", StockTile.on_click)
+
+    @staticmethod
+    def on_click(event):
+        tile = getattr(event.widget, "_tile", None)
+        if isinstance(tile, StockTile):
+            tile.toggle_dropdown()
+
+    def show(self, symbol, quote_data):
+        if self.dropdown is not None:
+            if symbol != self.symbol:
+                self.dropdown.destroy()
+                self.dropdown = None
+            else:
+                self.dropdown.pack_forget()
+        self.symbol = symbol
+        self.quote_data = quote_data
+
+        name = quote_data.get('name', 'Unknown Company')
+        price = quote_data.get('price', 0)
+        change = quote_data.get('changesPercentage', 0)
+
+        self.symbol_label.config(text=symbol)
+        self.name_label.config(text=name)
+        self.toggle_btn.config(text="▼")
+        self._show_price(price, change)
+
+    def _show_price(self, price, change):
+        price_color = "green" if change >= 0 else "red"
+        self.price_label.config(text=f"{price:.2f}", fg=price_color)
+
+    def update_quote(self, quote):
+        """Refresh the price and colour from a newer quote, keeping the tile as is."""
+        if quote.get("price") is None:
+            return
+        name = self.quote_data.get("name")
+        self.quote_data = {**self.quote_data, **quote}
+        if name is not None:
+            # Screener names are preferred over quote names, as in ``_render_item``
+            self.quote_data["name"] = name
+        self._show_price(self.quote_data["price"], self.quote_data.get("changesPercentage") or 0)
+
+    def toggle_dropdown(self):
+        if self.dropdown is None:
+            profile = self.app.get_profile(self.symbol)
+            self.dropdown = ResultDropdown(
+                self.frame,
+                symbol=self.symbol,
+                quote_data=self.quote_data,
+                profile_data=profile,
+                backend=self.app.backend,
+            )
+            self.dropdown.pack(fill="x", padx=10, pady=(5, 10))
+            self.toggle_btn.config(text="▲")
+        elif self.dropdown.winfo_ismapped():
+            self.dropdown.pack_forget()
+            self.toggle_btn.config(text="▼")
+        else:
+            self.dropdown.pack(fill="x", padx=10, pady=(5, 10))
+            self.toggle_btn.config(text="▲")
+
 
 class ResultDropdown(tk.Frame):
     def __init__(self, parent, symbol, quote_data, profile_data=None, backend=None):
@@ -1539,6 +2153,16 @@ class ResultDropdown(tk.Frame):
             tk.Label(row, text=str(value), anchor="w", bg="#f5f5f5").pack(side="left")
 
 if __name__ == "__main__":
+    # Record to or replay from an HTTP archive (replay alone runs offline)
+    if os.environ.get("UPCOM_HTTP_ARCHIVE"):
+        set_transport(ArchiveTransport(
+            os.environ["UPCOM_HTTP_ARCHIVE"],
+            mode=os.environ.get("UPCOM_HTTP_MODE", "replay"),
+            latency=float(os.environ.get("UPCOM_HTTP_LATENCY_MS", 0)) / 1000,
+        ))
     root = tk.Tk()
     app = StockScreenerApp(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        set_transport(None)
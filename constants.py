@@ -27,6 +27,9 @@ LABEL_TO_KEY = {
     "Cash Conversion Cycle Slope (last 4q) ≤": "ccc_slope_last4_max",
     "Rule of 40 (Growth + Op Margin) ≥": "rule40_op_ttm_min",
     "Capex % of Revenue ≤": "capex_pct_max",
+    "Gross Margin Percentile in Sector ≥": "gross_margin_pct_latest_pctl_min",
+    "Rule of 40 Percentile in Sector ≥": "rule40_op_ttm_pctl_min",
+    "Capex % Percentile in Sector ≤": "capex_pct_pctl_max",
     # Dropdowns + Boolean filters
     "Sector": "sector",
     "Industry": "industry",
@@ -80,6 +83,9 @@ PREVIEW_DESCRIPTIONS = {
     "Cash Conversion Cycle Slope (last 4q) ≤": "Select businesses turning stock into cash without dawdling.",
     "Rule of 40 (Growth + Op Margin) ≥": "Insist on companies that score at least this on the growth-plus-profit scoreboard.",
     "Capex % of Revenue ≤": "Avoid firms dumping too much of their earnings into shiny new toys.",
+    "Gross Margin Percentile in Sector ≥": "Keep companies out-earning at least this share of their sector on margin.",
+    "Rule of 40 Percentile in Sector ≥": "Rank against sector peers and keep only the upper crowd on Rule of 40.",
+    "Capex % Percentile in Sector ≤": "Stay with the thriftiest slice of the sector when it comes to capex.",
     "YoY Growth (%)": "Compare today's revenue to last year's, like a progress report.",
     "Profit Margin (%)": "See what part of each dollar in sales a company actually keeps.",
     "R&D Ratio (%)": "Check how much revenue is reinvested in fresh ideas.",
@@ -200,4 +206,8 @@ FILTER_OPTIONS = {
     "ccc_slope_last4_max": {"from": -100, "to": 100, "resolution": 1, "default": -5},
     "rule40_op_ttm_min": {"from": -100, "to": 200, "resolution": 1, "default": 20},
     "capex_pct_max": {"from": 0, "to": 100, "resolution": 1, "default": 15},
+    # Percentile filters: 0-100 within the company's sector
+    "gross_margin_pct_latest_pctl_min": {"from": 0, "to": 100, "resolution": 1, "default": 80},
+    "rule40_op_ttm_pctl_min": {"from": 0, "to": 100, "resolution": 1, "default": 80},
+    "capex_pct_pctl_max": {"from": 0, "to": 100, "resolution": 1, "default": 20},
 }
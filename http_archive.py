@@ -0,0 +1,163 @@
+"""Record and replay HTTP responses for offline runs and repeatable tests.
+
+:class:`ArchiveTransport` sits where ``requests.get`` is called (see
+``backend.set_transport``).  In ``record`` mode every response is fetched
+from the network and kept; in ``replay`` mode responses come only from the
+archive, so nothing touches the network; ``auto`` replays what it has and
+records the rest.  Replayed responses can be delayed by a fixed latency or by
+the time the original request took, to keep benchmarks realistic.
+
+The archive is one gzip-compressed JSON file keyed by URL with the
+``apikey`` parameter removed, so recordings can be shared without leaking
+keys::
+
+    UPCOM_HTTP_ARCHIVE=fmp.json.gz UPCOM_HTTP_MODE=record python baseFramework.py
+    UPCOM_HTTP_ARCHIVE=fmp.json.gz python baseFramework.py   # offline
+"""
+
+import base64
+import gzip
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+MODES = ("record", "replay", "auto")
+ARCHIVE_VERSION = 1
+# Query parameters left out of archive keys
+SECRET_PARAMS = {"apikey"}
+
+
+class ArchiveMiss(LookupError):
+    """Raised in ``replay`` mode for a URL that was never recorded."""
+
+
+def archive_key(url: str) -> str:
+    """Return ``url`` with secret parameters removed and the query sorted."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+class RecordedResponse:
+    """The parts of a ``requests.Response`` the backend reads."""
+
+    def __init__(self, status_code: int, content: bytes, headers: dict | None = None,
+                 elapsed: float = 0.0):
+        self.status_code = status_code
+        self.content = content
+        self.headers = dict(headers or {})
+        self.elapsed = elapsed
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status_code,
+            "headers": self.headers,
+            "body": base64.b64encode(self.content).decode("ascii"),
+            "elapsed": self.elapsed,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RecordedResponse":
+        return cls(data["status"], base64.b64decode(data["body"]), data.get("headers"),
+                   data.get("elapsed", 0.0))
+
+
+class ArchiveTransport:
+    """``get(url, **kwargs)`` backed by a compressed archive of responses.
+
+    ``fetch`` performs real requests in ``record`` and ``auto`` modes
+    (``requests.get`` by default).  ``latency`` is the delay in seconds added
+    to every replayed response, or ``None`` to replay each response's
+    recorded duration.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", latency: float | None = 0.0, fetch=None):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries: dict[str, RecordedResponse] = {}
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as fh:
+                data = json.load(fh)
+            if data.get("version") == ARCHIVE_VERSION:
+                self.entries = {k: RecordedResponse.from_dict(v) for k, v in data["entries"].items()}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, url: str, **kwargs):
+        key = archive_key(url)
+        if self.mode != "record":
+            recorded = self.entries.get(key)
+            if recorded is not None:
+                delay = recorded.elapsed if self.latency is None else self.latency
+                if delay > 0:
+                    time.sleep(delay)
+                return recorded
+            if self.mode == "replay":
+                raise ArchiveMiss(key)
+        return self._record(key, url, **kwargs)
+
+    def _record(self, key: str, url: str, **kwargs) -> RecordedResponse:
+        fetch = self._fetch
+        if fetch is None:
+            import requests
+
+            fetch = requests.get
+        start = time.perf_counter()
+        response = fetch(url, **kwargs)
+        content = getattr(response, "content", b"")
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        recorded = RecordedResponse(
+            getattr(response, "status_code", 200),
+            content,
+            dict(getattr(response, "headers", None) or {}),
+            time.perf_counter() - start,
+        )
+        if recorded.status_code == 304:
+            # Only meaningful to the conditional request that asked for it
+            return recorded
+        with self._lock:
+            self.entries[key] = recorded
+            self._dirty = True
+        return recorded
+
+    def save(self):
+        """Write the archive if anything was recorded since it was loaded."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": ARCHIVE_VERSION,
+                "entries": {k: v.to_dict() for k, v in self.entries.items()},
+            }
+            self._dirty = False
+        tmp = f"{self.path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, self.path)
+
+    def close(self):
+        self.save()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
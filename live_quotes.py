@@ -0,0 +1,107 @@
+"""Background refresh of live prices for the result tiles on screen.
+
+:class:`QuoteRefresher` runs on the Tk event loop.  Every ``interval_ms`` it
+asks which symbols are visible, fetches their quotes in batches on a worker
+thread and hands the results back to the UI thread to update tiles in place.
+While the window is unmapped (minimised) the interval doubles up to
+``max_interval_ms`` and no requests are made.
+"""
+
+import concurrent.futures
+
+DEFAULT_INTERVAL_MS = 15_000
+DEFAULT_MAX_INTERVAL_MS = 5 * 60 * 1000
+DEFAULT_BATCH_SIZE = 50
+# How often the UI thread checks whether a background fetch has finished
+POLL_MS = 50
+
+
+class QuoteRefresher:
+    """Poll quotes for visible symbols without blocking the event loop.
+
+    ``fetch_quotes(symbols)`` returns a list of quote dicts,
+    ``visible_symbols()`` the symbols currently on screen and
+    ``apply_quotes(quotes)`` receives a ``symbol -> quote`` mapping on the
+    UI thread.
+    """
+
+    def __init__(self, root, fetch_quotes, visible_symbols, apply_quotes,
+                 interval_ms: int = DEFAULT_INTERVAL_MS,
+                 max_interval_ms: int = DEFAULT_MAX_INTERVAL_MS,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        self.root = root
+        self.fetch_quotes = fetch_quotes
+        self.visible_symbols = visible_symbols
+        self.apply_quotes = apply_quotes
+        self.interval_ms = interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.batch_size = batch_size
+        self.delay_ms = interval_ms
+        self._after_id = None
+        self._future = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="quotes")
+
+    @property
+    def running(self) -> bool:
+        return self._after_id is not None or self._future is not None
+
+    def start(self):
+        if not self.running:
+            self.delay_ms = self.interval_ms
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._future = None
+
+    def close(self):
+        self.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule(self, delay_ms: int, callback):
+        self._after_id = self.root.after(delay_ms, callback)
+
+    def _back_off(self):
+        self.delay_ms = min(self.delay_ms * 2, self.max_interval_ms)
+        self._schedule(self.delay_ms, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        if not self.root.winfo_ismapped():
+            self._back_off()
+            return
+        self.delay_ms = self.interval_ms
+        symbols = list(dict.fromkeys(self.visible_symbols()))
+        if not symbols:
+            self._schedule(self.interval_ms, self._tick)
+            return
+        self._future = self._executor.submit(self._fetch, symbols)
+        self._schedule(POLL_MS, self._poll)
+
+    def _fetch(self, symbols: list[str]) -> dict[str, dict]:
+        quotes = {}
+        for i in range(0, len(symbols), self.batch_size):
+            for quote in self.fetch_quotes(symbols[i:i + self.batch_size]) or []:
+                if isinstance(quote, dict) and "symbol" in quote:
+                    quotes[quote["symbol"]] = quote
+        return quotes
+
+    def _poll(self):
+        self._after_id = None
+        future = self._future
+        if future is None:
+            return
+        if not future.done():
+            self._schedule(POLL_MS, self._poll)
+            return
+        self._future = None
+        try:
+            quotes = future.result()
+        except Exception:
+            self._back_off()
+            return
+        if quotes:
+            self.apply_quotes(quotes)
+        self._schedule(self.interval_ms, self._tick)
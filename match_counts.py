@@ -0,0 +1,70 @@
+"""Instant "≈N matches" estimates for MVP slider filters.
+
+Each supported filter key maps to one number per symbol.  The values for the
+cached universe are kept sorted, so the number of symbols passing a single
+threshold is one ``bisect`` away and can be updated on every slider move.
+Each estimate covers its own filter alone, not the combined search.
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+def _latest(name):
+    return lambda metrics: metrics.get(name)
+
+
+def _best_yoy_growth(metrics):
+    # With the default count of one quarter, a symbol passes when its best
+    # recent quarter reaches the threshold
+    values = [x for x in (metrics.get("yoy_rev_growth_pct_array") or [])[:4] if x is not None]
+    return max(values) if values else None
+
+
+def _growth_quarters(metrics):
+    arr = metrics.get("yoy_rev_growth_pct_array") or []
+    return sum(1 for x in arr[:4] if x is not None and x >= 0)
+
+
+# Filter key -> (value extractor, is_lower_bound), mirroring
+# ``StockDataService._passes_mvp_filters``
+ESTIMATED_FILTERS = {
+    "rev_ttm_min": (_latest("rev_ttm"), True),
+    "yoy_rev_growth_pct_min": (_best_yoy_growth, True),
+    "yoy_growth_quarter_count_min": (_growth_quarters, True),
+    "max_qoq_rev_declines_last4": (_latest("max_qoq_rev_declines_last4"), False),
+    "gross_margin_pct_min": (_latest("gross_margin_pct_latest"), True),
+    "delta_gm_pp_yoy_min": (_latest("delta_gm_pp_yoy_latest"), True),
+    "opex_pct_slope_last4_max": (_latest("opex_pct_slope_last4"), False),
+    "ocf_ttm_min": (_latest("ocf_ttm"), True),
+    "delta_ocf_ttm_yoy_min": (_latest("delta_ocf_ttm_yoy"), True),
+    "rd_pct_max": (_latest("rd_pct_latest"), False),
+    "delta_rd_pct_pp_yoy_max": (_latest("delta_rd_pct_pp_yoy_latest"), False),
+    "ccc_slope_last4_max": (_latest("ccc_slope_last4"), False),
+    "rule40_op_ttm_min": (_latest("rule40_op_ttm"), True),
+    "capex_pct_max": (_latest("capex_pct"), False),
+}
+
+
+class MatchCounter:
+    """Sorted per-filter values for counting matches in ``O(log n)``."""
+
+    def __init__(self, metrics_by_symbol: dict[str, dict]):
+        self.size = len(metrics_by_symbol)
+        self._values: dict[str, list[float]] = {}
+        for key, (extract, _lower) in ESTIMATED_FILTERS.items():
+            values = []
+            for metrics in metrics_by_symbol.values():
+                value = extract(metrics)
+                if value is not None:
+                    values.append(value)
+            values.sort()
+            self._values[key] = values
+
+    def count(self, key: str, threshold: float) -> int | None:
+        """Return how many symbols pass ``key`` at ``threshold``, or ``None`` if unsupported."""
+        values = self._values.get(key)
+        if values is None:
+            return None
+        if ESTIMATED_FILTERS[key][1]:
+            return len(values) - bisect_left(values, threshold)
+        return bisect_right(values, threshold)
@@ -0,0 +1,83 @@
+"""Opt-in cProfile and tracemalloc capture for screening sessions.
+
+Profiling is enabled by setting ``UPCOM_PROFILE_DIR`` to a directory or by
+calling :meth:`SessionProfiler.enable` (the app exposes this through its
+Developer menu).  Each captured call writes a ``.prof`` file loadable with
+``pstats``/snakeviz and a text report of the top allocation sites.
+"""
+
+import cProfile
+from contextlib import contextmanager
+from datetime import datetime
+import os
+import pstats
+import threading
+import tracemalloc
+
+PROFILE_ENV_VAR = "UPCOM_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = "profiles"
+
+
+class SessionProfiler:
+    """Write per-call profile and allocation reports to ``directory``."""
+
+    def __init__(self, directory: str | None = None, top_allocations: int = 25):
+        self.directory = directory
+        self.top_allocations = top_allocations
+        # cProfile cannot nest, so only the outermost capture is recorded
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def enable(self, directory: str | None = None):
+        self.directory = directory or self.directory or DEFAULT_PROFILE_DIR
+
+    def disable(self):
+        self.directory = None
+
+    @contextmanager
+    def capture(self, name: str):
+        """Profile the enclosed block when enabled and not already capturing."""
+        if not self.enabled or not self._lock.acquire(blocking=False):
+            yield
+            return
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                snapshot = tracemalloc.take_snapshot()
+                if started_tracing:
+                    tracemalloc.stop()
+                self._write(name, profile, snapshot)
+        finally:
+            self._lock.release()
+
+    def _write(self, name: str, profile: cProfile.Profile, snapshot):
+        os.makedirs(self.directory, exist_ok=True)
+        self._counter += 1
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(self.directory, f"{stamp}-{self._counter:04d}-{name}")
+        profile.dump_stats(f"{base}.prof")
+
+        snapshot = snapshot.filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+        with open(f"{base}-alloc.txt", "w", encoding="utf-8") as fh:
+            fh.write(f"Top {self.top_allocations} allocation sites for {name}\n\n")
+            for stat in snapshot.statistics("lineno")[: self.top_allocations]:
+                fh.write(f"{stat}\n")
+            fh.write("\nTop functions by cumulative time\n\n")
+            stats = pstats.Stats(profile, stream=fh)
+            stats.sort_stats("cumulative").print_stats(self.top_allocations)
+
+
+profiler = SessionProfiler(os.environ.get(PROFILE_ENV_VAR) or None)
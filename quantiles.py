@@ -0,0 +1,147 @@
+"""Streaming quantile sketches for universe-relative percentile filters.
+
+:class:`KLLSketch` is a compact KLL-style quantile summary: values enter a
+level-0 buffer and full levels are sorted and halved into the level above,
+each surviving value standing for twice as many inputs.  Rank error is about
+``1.7 / k`` with ``O(k)`` memory regardless of how many values are added, and
+the sketch is exact until it first compacts.
+
+:class:`SectorQuantiles` keeps one sketch per ``(metric, sector)`` plus one
+per metric for the whole universe, and memoises percentile cutoffs so each
+lookup during a search is a dictionary hit.
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+import math
+import random
+import threading
+
+DEFAULT_K = 200
+# Below this many values a sector falls back to the universe-wide sketch
+MIN_SECTOR_SAMPLE = 20
+
+
+class KLLSketch:
+    """Approximate quantiles of a stream of numbers."""
+
+    def __init__(self, k: int = DEFAULT_K, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self._levels: list[list[float]] = [[]]
+        self._rng = random.Random(seed)
+        self._summary = None
+        self._cutoffs: dict[tuple[float, bool], float] = {}
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def add(self, value: float):
+        self._levels[0].append(value)
+        self.n += 1
+        self._summary = None
+        self._cutoffs.clear()
+        if sum(len(level) for level in self._levels) > sum(
+            self._capacity(h) for h in range(len(self._levels))
+        ):
+            self._compact()
+
+    def _compact(self):
+        for h, level in enumerate(self._levels):
+            if len(level) >= self._capacity(h):
+                if h + 1 == len(self._levels):
+                    self._levels.append([])
+                level.sort()
+                # An odd value out stays behind so no weight is lost
+                leftover = [level.pop()] if len(level) % 2 else []
+                offset = self._rng.getrandbits(1)
+                self._levels[h + 1].extend(level[offset::2])
+                self._levels[h] = leftover
+                return
+
+    def _weighted(self) -> tuple[list[float], list[float]]:
+        """Return sorted values and their cumulative weights."""
+        if self._summary is None:
+            pairs = sorted(
+                (value, 2 ** h) for h, level in enumerate(self._levels) for value in level
+            )
+            values = [v for v, _w in pairs]
+            self._summary = (values, list(accumulate(w for _v, w in pairs)))
+        return self._summary
+
+    def cutoff(self, q: float, upper: bool = False) -> float:
+        """Return the value splitting off the requested share of the stream.
+
+        With ``upper=False`` this is the smallest value with at least a ``q``
+        share of the stream below it, so ``value >= cutoff`` keeps the top
+        ``1 - q``.  With ``upper=True`` it is the largest value with at most
+        a ``q`` share at or below it, so ``value <= cutoff`` keeps the bottom
+        ``q``.  Results are memoised until the next :meth:`add`.
+        """
+        key = (q, upper)
+        if key not in self._cutoffs:
+            values, cumulative = self._weighted()
+            if not values:
+                return math.nan
+            total = cumulative[-1]
+            target = q * total
+            if upper:
+                index = bisect_right(cumulative, target + 1e-9) - 1
+                result = values[index] if index >= 0 else -math.inf
+            else:
+                # First item after those making up the bottom ``q`` share
+                index = bisect_left(cumulative, target - 1e-9) + 1 if target > 1e-9 else 0
+                result = values[index] if index < len(values) else math.inf
+            self._cutoffs[key] = result
+        return self._cutoffs[key]
+
+
+class SectorQuantiles:
+    """Per-metric, per-sector sketches fed as metrics enter the cache."""
+
+    def __init__(self, metrics, k: int = DEFAULT_K):
+        self.metrics = tuple(metrics)
+        self.k = k
+        self._sketches: dict[tuple[str, str | None], KLLSketch] = {}
+        # Metrics are computed on worker threads by ``search_many``
+        self._lock = threading.Lock()
+        # Each symbol's metric is counted once per sketch even if it is
+        # recomputed later; a sector learned after the first observation
+        # still adds the value to that sector's sketch
+        self._seen: set[tuple[str, str, str | None]] = set()
+
+    def _sketch(self, metric: str, sector: str | None) -> KLLSketch:
+        sketch = self._sketches.get((metric, sector))
+        if sketch is None:
+            sketch = self._sketches[(metric, sector)] = KLLSketch(self.k)
+        return sketch
+
+    def observe(self, symbol: str, sector: str | None, metrics: dict):
+        with self._lock:
+            for metric in self.metrics:
+                value = metrics.get(metric)
+                if value is None:
+                    continue
+                for key in (None, sector) if sector else (None,):
+                    if (symbol, metric, key) not in self._seen:
+                        self._seen.add((symbol, metric, key))
+                        self._sketch(metric, key).add(value)
+
+    def count(self, metric: str, sector: str | None = None) -> int:
+        sketch = self._sketches.get((metric, sector))
+        return sketch.n if sketch is not None else 0
+
+    def cutoff(self, metric: str, sector: str | None, percentile: float, upper: bool = False) -> float:
+        """Return the ``percentile`` (0-100) cutoff of ``metric`` within ``sector``.
+
+        Sectors with fewer than ``MIN_SECTOR_SAMPLE`` values use the whole
+        universe instead.  Returns ``NaN`` when nothing has been observed.
+        """
+        if not sector or self.count(metric, sector) < MIN_SECTOR_SAMPLE:
+            sector = None
+        with self._lock:
+            sketch = self._sketches.get((metric, sector))
+            if sketch is None:
+                return math.nan
+            return sketch.cutoff(percentile / 100, upper)
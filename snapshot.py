@@ -0,0 +1,199 @@
+"""Precomputed MVP metrics snapshot for network-free screening.
+
+A snapshot is a single columnar file: a small JSON header (timestamp,
+symbol index and column layout) followed by one array of doubles per
+metric, with ``NaN`` marking missing values.  :class:`MetricsSnapshot`
+memory-maps the file so loading is instant and only touched pages are read.
+
+Build one nightly with::
+
+    python snapshot.py metrics.snapshot --api-key KEY --symbols-file universe.txt
+"""
+
+from array import array
+from datetime import datetime, timezone
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"UPSNAP1\n"
+# ``yoy_rev_growth_pct_array`` is stored as its first four quarters, which is
+# all the MVP filters look at.
+YOY_ARRAY_LENGTH = 4
+INT_METRICS = {"yoy_growth_quarter_count", "max_qoq_rev_declines_last4"}
+BOOL_METRICS = {"rd_growth_lte_rev_growth_boolean", "deferred_rev_yoy_increase"}
+
+
+def _column_names(metric_names) -> list[tuple[str, str]]:
+    """Return ``(column, kind)`` pairs for the given metric names."""
+    columns = []
+    for name in metric_names:
+        if name == "yoy_rev_growth_pct_array":
+            columns.extend((f"{name}[{i}]", "array") for i in range(YOY_ARRAY_LENGTH))
+        elif name in INT_METRICS:
+            columns.append((name, "int"))
+        elif name in BOOL_METRICS:
+            columns.append((name, "bool"))
+        else:
+            columns.append((name, "float"))
+    return columns
+
+
+def _encode(value) -> float:
+    if value is None:
+        return math.nan
+    return float(value)
+
+
+def write_snapshot(path: str, metrics_by_symbol: dict[str, dict], metric_names,
+                   timestamp: str | None = None):
+    """Write ``metrics_by_symbol`` to ``path`` atomically."""
+    symbols = sorted(metrics_by_symbol)
+    columns = _column_names(metric_names)
+    timestamp = timestamp or datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    arrays = []
+    for column, kind in columns:
+        if kind == "array":
+            name, index = column[:-3], int(column[-2])
+            values = []
+            for symbol in symbols:
+                arr = metrics_by_symbol[symbol].get(name) or []
+                values.append(_encode(arr[index] if index < len(arr) else None))
+        else:
+            values = [_encode(metrics_by_symbol[symbol].get(column)) for symbol in symbols]
+        arrays.append(array("d", values))
+
+    header = {
+        "timestamp": timestamp,
+        "byteorder": sys.byteorder,
+        "rows": len(symbols),
+        "symbols": symbols,
+        "columns": [{"name": c, "kind": k} for c, k in columns],
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    # Pad so the first array starts on an 8-byte boundary
+    prefix = len(MAGIC) + 8 + len(header_bytes)
+    header_bytes += b" " * (-prefix % 8)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(struct.pack("<Q", len(header_bytes)))
+        fh.write(header_bytes)
+        for values in arrays:
+            values.tofile(fh)
+    os.replace(tmp, path)
+
+
+class MetricsSnapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a metrics snapshot")
+        (header_len,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(self._mmap[start:start + header_len])
+        if header["byteorder"] != sys.byteorder:
+            self._mmap.close()
+            raise ValueError(f"{path} was written on a {header['byteorder']}-endian machine")
+
+        self.timestamp: str = header["timestamp"]
+        self.symbols: list[str] = header["symbols"]
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        rows = header["rows"]
+        self._view = memoryview(self._mmap)
+        offset = start + header_len
+        self._columns = []
+        for column in header["columns"]:
+            data = self._view[offset:offset + rows * 8].cast("d")
+            self._columns.append((column["name"], column["kind"], data))
+            offset += rows * 8
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._index
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def column(self, name: str):
+        """Return the raw ``NaN``-padded values of a stored column."""
+        for column, _kind, data in self._columns:
+            if column == name:
+                return data
+        raise KeyError(name)
+
+    def get(self, symbol: str) -> dict | None:
+        """Return the metrics dict for ``symbol`` in ``compute_mvp_metrics`` form."""
+        row = self._index.get(symbol)
+        if row is None:
+            return None
+        metrics: dict = {}
+        for name, kind, data in self._columns:
+            value = data[row]
+            value = None if math.isnan(value) else value
+            if kind == "array":
+                metrics.setdefault(name[:-3], []).append(value)
+            elif kind == "int":
+                metrics[name] = None if value is None else int(value)
+            elif kind == "bool":
+                metrics[name] = None if value is None else bool(value)
+            else:
+                metrics[name] = value
+        return metrics
+
+    def close(self):
+        for _name, _kind, data in self._columns:
+            data.release()
+        self._columns = []
+        self._view.release()
+        self._mmap.close()
+
+
+def build_snapshot(path: str, symbols, api_key: str) -> int:
+    """Compute every metric for ``symbols`` and write a snapshot to ``path``.
+
+    Returns the number of symbols written.  Symbols whose statements failed
+    to load or came back empty are skipped so screens fall back to live
+    fetches for them instead of trusting placeholder zeros.
+    """
+    from backend import (
+        METRIC_DEPENDENCIES,
+        CacheEntry,
+        compute_mvp_metrics,
+        statement_status,
+        statements_for_metrics,
+    )
+
+    statements = statements_for_metrics(METRIC_DEPENDENCIES)
+    results = {}
+    for symbol in symbols:
+        metrics = compute_mvp_metrics(symbol, api_key)
+        status, _expires = statement_status(symbol, statements)
+        if metrics is not None and status == CacheEntry.VALID:
+            results[symbol] = metrics
+    write_snapshot(path, results, list(METRIC_DEPENDENCIES))
+    return len(results)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a precomputed MVP metrics snapshot.")
+    parser.add_argument("output")
+    parser.add_argument("--api-key", required=True)
+    parser.add_argument("--symbols-file", required=True, help="file with one ticker per line")
+    args = parser.parse_args()
+
+    with open(args.symbols_file, encoding="utf-8") as fh:
+        universe = [line.strip() for line in fh if line.strip()]
+    count = build_snapshot(args.output, universe, args.api_key)
+    print(f"Wrote {count} symbols to {args.output}")
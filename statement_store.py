@@ -0,0 +1,81 @@
+"""On-disk store of projected quarterly statements.
+
+Statements are kept in a SQLite file as the JSON-encoded columns produced by
+``backend.project_statement`` so that other processes (bulk metric workers,
+batch jobs) can read them without re-fetching or pickling payloads.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+
+class StatementStore:
+    """Thread-safe SQLite-backed mapping of ``(symbol, statement)`` to columns."""
+
+    def __init__(self, path: str, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        uri = f"file:{path}?mode=ro" if readonly else f"file:{path}"
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        if not readonly:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS statements ("
+                    " symbol TEXT NOT NULL,"
+                    " statement TEXT NOT NULL,"
+                    " columns TEXT NOT NULL,"
+                    " fetched_at REAL NOT NULL,"
+                    " PRIMARY KEY (symbol, statement))"
+                )
+
+    def put(self, symbol: str, statement: str, columns: dict, fetched_at: float | None = None):
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO statements VALUES (?, ?, ?, ?)",
+                (symbol, statement, json.dumps(columns), fetched_at),
+            )
+
+    def get(self, symbol: str, statement: str, max_age: float | None = None) -> dict | None:
+        """Return stored columns, or ``None`` if missing or older than ``max_age`` seconds."""
+        stored = self.get_entry(symbol, statement)
+        if stored is None:
+            return None
+        columns, fetched_at = stored
+        if max_age is not None and time.time() - fetched_at > max_age:
+            return None
+        return columns
+
+    def get_entry(self, symbol: str, statement: str) -> tuple[dict, float] | None:
+        """Return ``(columns, fetched_at)`` for a stored statement, or ``None``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT columns, fetched_at FROM statements WHERE symbol = ? AND statement = ?",
+                (symbol, statement),
+            ).fetchone()
+        if row is None:
+            return None
+        columns = json.loads(row[0])
+        # JSON has no tuples; restore the immutable column layout
+        return {key: tuple(values) for key, values in columns.items()}, row[1]
+
+    def touch(self, symbol: str, statement: str, fetched_at: float | None = None):
+        """Mark a stored statement as confirmed current without rewriting it."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE statements SET fetched_at = ? WHERE symbol = ? AND statement = ?",
+                (fetched_at, symbol, statement),
+            )
+
+    def symbols(self) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT symbol FROM statements ORDER BY symbol").fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,122 @@
+"""Local symbol/name directory for instant Stock Search typeahead.
+
+The full list of actively traded symbols is fetched once, cached on disk and
+refreshed when older than a day.  Lookups use a sorted index of tickers,
+company names and name words with ``bisect`` prefix scans, falling back to
+fuzzy matching for typos, so results come back without a network round trip.
+"""
+
+from bisect import bisect_left
+import difflib
+import heapq
+import json
+import os
+import time
+
+REFRESH_SECONDS = 24 * 60 * 60
+RETRY_SECONDS = 60 * 60
+# Distinct keys on each side of the query considered for fuzzy matches
+FUZZY_WINDOW = 64
+
+
+class SymbolDirectory:
+    """Prefix and fuzzy search over ticker symbols and company names."""
+
+    def __init__(self, entries: list[dict], loaded_at: float | None = None):
+        self.entries = [e for e in entries if isinstance(e, dict) and e.get("symbol")]
+        self.loaded_at = time.time() if loaded_at is None else loaded_at
+        self._symbols = {e["symbol"].upper(): i for i, e in enumerate(self.entries)}
+        # One sorted ``(key, symbol, entry index)`` index per match rank:
+        # tickers, full names, then later name words
+        index = [[], [], []]
+        for i, entry in enumerate(self.entries):
+            symbol = entry["symbol"]
+            index[0].append((symbol.lower(), symbol, i))
+            words = (entry.get("name") or "").lower().split()
+            for w in range(len(words)):
+                index[1 + min(w, 1)].append((" ".join(words[w:]), symbol, i))
+        for rows in index:
+            rows.sort()
+        self._index = index
+        self._keys = [[key for key, _symbol, _i in rows] for rows in index]
+        self._all_keys = sorted(set().union(*self._keys))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def is_stale(self, max_age: float = REFRESH_SECONDS) -> bool:
+        return time.time() - self.loaded_at > max_age
+
+    def _range(self, rank: int, prefix: str) -> tuple[int, int]:
+        """Return the slice of rank ``rank``'s index whose keys start with ``prefix``."""
+        keys = self._keys[rank]
+        return bisect_left(keys, prefix), bisect_left(keys, prefix + "\U0010ffff")
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """Return up to ``limit`` entries matching ``query``.
+
+        Exact tickers come first, then ticker prefixes (in ticker order),
+        company-name prefixes and name-word prefixes (each in ticker order);
+        fuzzy matches fill any remaining slots.  Lower ranks are only scanned
+        while slots remain, so short queries stop after ``limit`` tickers.
+        """
+        query = (query or "").strip().lower()
+        if not query or limit <= 0:
+            return []
+        ranked: dict[int, tuple] = {}
+        exact = self._symbols.get(query.upper())
+        if exact is not None:
+            ranked[exact] = (-1, "")
+        for rank, rows in enumerate(self._index):
+            if len(ranked) >= limit:
+                break
+            lo, hi = self._range(rank, query)
+            if rank == 0:
+                # Ticker keys sort like the tickers themselves
+                best = [(symbol, i) for _key, symbol, i in rows[lo:min(hi, lo + limit + 1)]]
+            else:
+                best = heapq.nsmallest(limit + 1, ((symbol, i) for _key, symbol, i in rows[lo:hi]))
+            for symbol, i in best:
+                ranked.setdefault(i, (rank, symbol))
+        if len(ranked) < limit:
+            # Compare against same-length prefixes of nearby keys sharing the
+            # first character, so a typo in a partial word still matches
+            pos = bisect_left(self._all_keys, query)
+            window = self._all_keys[max(pos - FUZZY_WINDOW, 0):pos + FUZZY_WINDOW]
+            pool = {key[:len(query)] for key in window if key[0] == query[0]}
+            for match in difflib.get_close_matches(query, pool, n=limit, cutoff=0.75):
+                for rank in range(len(self._index)):
+                    lo, hi = self._range(rank, match)
+                    for _key, symbol, i in self._index[rank][lo:min(hi, lo + limit)]:
+                        ranked.setdefault(i, (3 + rank, symbol))
+        best = sorted(ranked, key=ranked.get)[:limit]
+        return [dict(self.entries[i]) for i in best]
+
+    @classmethod
+    def load(cls, path: str, fetch, max_age: float = REFRESH_SECONDS) -> "SymbolDirectory":
+        """Return the directory cached at ``path``, refreshing it via ``fetch()`` when stale.
+
+        ``fetch`` returns a list of ``{"symbol", "name", ...}`` dicts.  If the
+        refresh fails a stale cache is still used.
+        """
+        cached = None
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                cached = json.load(fh)
+            if time.time() - cached.get("fetched_at", 0) <= max_age:
+                return cls(cached["entries"], cached["fetched_at"])
+        try:
+            entries = fetch()
+            if not isinstance(entries, list) or not entries:
+                raise ValueError("empty symbol list")
+        except Exception:
+            if cached is None:
+                raise
+            # Keep serving the stale list and try again in an hour
+            return cls(cached["entries"], time.time() - max_age + RETRY_SECONDS)
+        fetched_at = time.time()
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"fetched_at": fetched_at, "entries": entries}, fh)
+        os.replace(tmp, path)
+        return cls(entries, fetched_at)
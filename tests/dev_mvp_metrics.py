@@ -3,18 +3,28 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from backend import compute_mvp_metrics
+from backend import compute_mvp_metrics, set_transport
+from http_archive import ArchiveTransport
 
 API_KEY = 'ilp96LS93HjMQOCCyXwbt5UmOKf5da16'
 
 
-def run_dev_checks(symbols=None):
+def run_dev_checks(symbols=None, archive=None, mode='auto'):
+    """Print metrics for ``symbols``; with ``archive`` responses are recorded or replayed."""
     if symbols is None:
         symbols = ['CRM', 'DELL']
-    for sym in symbols:
-        metrics = compute_mvp_metrics(sym, API_KEY)
-        print(sym, metrics)
+    if archive:
+        set_transport(ArchiveTransport(archive, mode=mode))
+    try:
+        for sym in symbols:
+            metrics = compute_mvp_metrics(sym, API_KEY)
+            print(sym, metrics)
+    finally:
+        if archive:
+            set_transport(None)
 
 
 if __name__ == '__main__':
-    run_dev_checks()
+    # python tests/dev_mvp_metrics.py [archive.json.gz [record|replay|auto]]
+    run_dev_checks(archive=sys.argv[1] if len(sys.argv) > 1 else None,
+                   mode=sys.argv[2] if len(sys.argv) > 2 else 'auto')
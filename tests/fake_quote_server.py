@@ -0,0 +1,94 @@
+"""Local stand-in for the FMP ``/quote/`` endpoint.
+
+Each request moves every requested price by a small deterministic step so
+live refresh can be watched and tested without an API key::
+
+    python tests/fake_quote_server.py --port 8765
+    UPCOM_QUOTE_URL=http://127.0.0.1:8765/quote/ python baseFramework.py
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+from urllib.parse import unquote, urlsplit
+
+
+class FakeQuoteServer:
+    """Serve ``GET /quote/AAA,BBB`` with moving prices on a background thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, step: float = 0.5):
+        self.step = step
+        self.prices: dict[str, float] = {}
+        self.requests: list[list[str]] = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                if not path.startswith("/quote/"):
+                    self.send_error(404)
+                    return
+                symbols = [s for s in unquote(path[len("/quote/"):]).split(",") if s]
+                body = json.dumps(server.quote(symbols)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def quote_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/quote/"
+
+    def quote(self, symbols: list[str]) -> list[dict]:
+        with self._lock:
+            self.requests.append(list(symbols))
+            quotes = []
+            for symbol in symbols:
+                previous = self.prices.get(symbol, 100.0)
+                # Alternate direction so both price colours are exercised
+                price = previous + (self.step if len(self.requests) % 2 else -self.step)
+                self.prices[symbol] = price
+                quotes.append({
+                    "symbol": symbol,
+                    "price": price,
+                    "changesPercentage": (price - 100.0),
+                    "previousClose": 100.0,
+                })
+            return quotes
+
+    def start(self) -> "FakeQuoteServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a fake FMP quote endpoint.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    fake = FakeQuoteServer(port=args.port)
+    print(f"Serving quotes at {fake.quote_url}")
+    try:
+        fake._httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
@@ -0,0 +1,84 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+from backend import StockDataService
+from statement_store import StatementStore
+
+
+def _income(scale):
+    return [
+        {"date": f"20{20 + i // 4}-{(i % 4) * 3 + 3:02d}-30", "revenue": scale * (10 + i),
+         "costOfRevenue": scale * 4, "operatingIncome": scale}
+        for i in range(8)
+    ]
+
+
+def test_bulk_refresh_computes_from_store_in_worker_processes(tmp_path, monkeypatch):
+    path = str(tmp_path / "statements.db")
+    store = StatementStore(path)
+    for symbol, scale in (("AAA", 1), ("BBB", 3)):
+        store.put(symbol, "income", backend.project_statement("income", _income(scale)))
+    store.close()
+
+    def no_network(*a, **k):
+        raise AssertionError("bulk refresh must not hit the network")
+
+    monkeypatch.setattr(backend.requests, "get", no_network)
+    backend.set_statement_store(path)
+    try:
+        service = StockDataService("key", "base", "quote")
+        assert service.bulk_refresh_metrics(workers=2) == 2
+    finally:
+        backend.set_statement_store(None)
+
+    for symbol, scale in (("AAA", 1), ("BBB", 3)):
+        expected = backend.metrics_from_columns(
+            {"income": backend.project_statement("income", _income(scale))}
+        )
+        assert service._metrics_cache[symbol].value == expected
+    assert service._metrics_cache["AAA"].value["gross_margin_pct_latest"] is not None
+
+
+def test_fetched_statements_are_written_through_to_store(tmp_path, monkeypatch):
+    def fake_get(url, **kwargs):
+        class Resp:
+            def json(self):
+                return _income(2)
+
+        return Resp()
+
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+    monkeypatch.setattr(backend, "_rate_limit_sleep", lambda s: None)
+    backend._income_cache.pop("WTS", None)
+    store = backend.set_statement_store(str(tmp_path / "statements.db"))
+    try:
+        first = backend.compute_mvp_metrics("WTS", "key", {"rev_ttm"})
+        assert store.get("WTS", "income")["revenue"][0] == 34.0
+
+        # A fresh process-level cache is served from the store, not the network
+        backend._income_cache.pop("WTS", None)
+        monkeypatch.setattr(backend.requests, "get", lambda *a, **k: 1 / 0)
+        assert backend.compute_mvp_metrics("WTS", "key", {"rev_ttm"}) == first
+    finally:
+        backend.set_statement_store(None)
+        backend._income_cache.pop("WTS", None)
+
+
+def test_bulk_refresh_survives_symbol_without_latest_revenue(tmp_path):
+    path = str(tmp_path / "statements.db")
+    bad = _income(1)
+    bad[-1]["revenue"] = 0  # the latest quarter
+    store = StatementStore(path)
+    store.put("GOOD", "income", backend.project_statement("income", _income(1)))
+    store.put("BAD", "income", backend.project_statement("income", bad))
+    store.close()
+
+    results = backend.compute_metrics_bulk(["GOOD", "BAD"], path, workers=1)
+    assert set(results) == {"GOOD", "BAD"}
+    assert results["BAD"]["gross_margin_pct_latest"] is None
+    assert results["GOOD"] == backend.metrics_from_columns(
+        {"income": backend.project_statement("income", _income(1))}
+    )
@@ -0,0 +1,156 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+from backend import StockDataService
+
+PAYLOAD = [{"date": "2024-03-31", "revenue": 100.0, "costOfRevenue": 40.0}]
+
+
+class Resp:
+    def __init__(self, payload=None, status_code=200, headers=None):
+        self.content = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.parsed = 0
+
+    def json(self):
+        self.parsed += 1
+        return json.loads(self.content)
+
+
+def _install(monkeypatch, respond):
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(kwargs.get("headers") or {})
+        return respond(len(calls), kwargs.get("headers") or {})
+
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+    monkeypatch.setattr(backend, "_rate_limit_sleep", lambda s: None)
+    backend._income_cache.pop("CND", None)
+    backend.stats.reset()
+    return calls
+
+
+def test_statement_refresh_sends_etag_and_keeps_value_on_304(monkeypatch):
+    def respond(n, headers):
+        if headers.get("If-None-Match") == '"v1"':
+            return Resp(status_code=304)
+        return Resp(PAYLOAD, headers={"ETag": '"v1"'})
+
+    calls = _install(monkeypatch, respond)
+    first = backend._load_statement("income", "CND", "key")
+    first.expires = 0
+
+    second = backend._load_statement("income", "CND", "key")
+    assert calls == [{}, {"If-None-Match": '"v1"'}]
+    assert second.value is first.value and second.fresh()
+    assert backend.stats.snapshot()["not_modified"] == {"income-statement": 1}
+    backend._income_cache.pop("CND", None)
+
+
+def test_unchanged_body_without_validators_is_not_parsed(monkeypatch):
+    responses = []
+
+    def respond(n, headers):
+        body = PAYLOAD if n < 3 else [dict(PAYLOAD[0], revenue=120.0)]
+        responses.append(Resp(body))
+        return responses[-1]
+
+    calls = _install(monkeypatch, respond)
+    first = backend._load_statement("income", "CND", "key")
+    first.expires = 0
+    second = backend._load_statement("income", "CND", "key")
+    assert second.value is first.value and responses[1].parsed == 0
+
+    second.expires = 0
+    third = backend._load_statement("income", "CND", "key")
+    assert third.value["revenue"] == (120.0,)
+    assert calls == [{}, {}, {}]
+    backend._income_cache.pop("CND", None)
+
+
+def test_profile_is_cached_and_revalidated(monkeypatch):
+    def respond(n, headers):
+        if headers.get("If-Modified-Since") == "Mon, 01 Jan 2024 00:00:00 GMT":
+            return Resp(status_code=304)
+        return Resp([{"symbol": "CND", "sector": "Tech"}],
+                    headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+    calls = _install(monkeypatch, respond)
+    service = StockDataService("key", "base", "quote")
+    assert service.get_profile("CND") == {"symbol": "CND", "sector": "Tech"}
+    assert service.get_profile("CND")["sector"] == "Tech"
+    assert len(calls) == 1
+
+    service._profile_cache["CND"].expires = 0
+    assert service.get_profile("CND")["sector"] == "Tech"
+    assert calls[1] == {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+
+def test_failed_refresh_keeps_serving_previous_statement(monkeypatch):
+    def respond(n, headers):
+        if n > 1:
+            raise ConnectionError("down")
+        return Resp(PAYLOAD, headers={"ETag": '"v1"'})
+
+    _install(monkeypatch, respond)
+    first = backend._load_statement("income", "CND", "key")
+    first.expires = 0
+
+    second = backend._load_statement("income", "CND", "key")
+    assert second.status == backend.CacheEntry.VALID and second.value is first.value
+    assert second.attempts == 1 and second.fresh()
+    assert backend.statement_status("CND", {"income"})[0] == backend.CacheEntry.VALID
+    backend._income_cache.pop("CND", None)
+
+
+def test_search_metrics_expire_with_their_statements(monkeypatch):
+    def respond(n, headers):
+        if "If-None-Match" in headers:
+            return Resp(status_code=304)
+        if n == 1:
+            return Resp([{"symbol": "CND"}])
+        return Resp(PAYLOAD, headers={"ETag": '"v1"'})
+
+    calls = _install(monkeypatch, respond)
+    service = StockDataService("key", "base", "quote")
+    assert [r["symbol"] for r in service.search({"gross_margin_pct_min": 50})] == ["CND"]
+    entry = service._metrics_cache["CND"]
+    assert entry.expires == backend._income_cache["CND"].expires
+
+    entry.expires = 0
+    backend._income_cache["CND"].expires = 0
+    assert [r["symbol"] for r in service.search({"gross_margin_pct_min": 50})] == ["CND"]
+    assert {"If-None-Match": '"v1"'} in calls
+    assert service._metrics_cache["CND"].fresh()
+    backend._income_cache.pop("CND", None)
+
+
+def test_store_rows_keep_their_age(monkeypatch, tmp_path):
+    import time
+
+    def respond(n, headers):
+        return Resp(PAYLOAD)
+
+    calls = _install(monkeypatch, respond)
+    store = backend.set_statement_store(str(tmp_path / "statements.db"))
+    try:
+        columns = backend.project_statement("income", PAYLOAD)
+        store.put("CND", "income", columns)
+        assert backend._load_statement("income", "CND", "key").value == columns
+        assert calls == []
+
+        backend._income_cache.pop("CND", None)
+        store.put("CND", "income", columns, fetched_at=time.time() - 2 * backend.STATEMENT_TTL)
+        entry = backend._load_statement("income", "CND", "key")
+        assert len(calls) == 1 and entry.fresh()
+        # Revalidating resets the row's age
+        assert time.time() - store.get_entry("CND", "income")[1] < 60
+    finally:
+        backend.set_statement_store(None)
+        backend._income_cache.pop("CND", None)
@@ -0,0 +1,92 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+from backend import StockDataService
+
+
+def _income(n=8):
+    return [
+        {"date": f"2024-{12 - i:02d}-01", "revenue": 100 + i, "costOfRevenue": 40}
+        for i in range(n)
+    ]
+
+
+def test_search_fetches_only_statements_needed_by_filters(monkeypatch):
+    urls = []
+
+    def fake_get(url, **kwargs):
+        urls.append(url)
+
+        class Resp:
+            def json(self):
+                if "income-statement" in url:
+                    return _income()
+                if "cash-flow-statement" in url:
+                    return [{"date": "2024-12-01", "netCashProvidedByOperatingActivities": 5}]
+                return [{"symbol": "AAA"}]
+
+        return Resp()
+
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+    monkeypatch.setattr(backend, "_rate_limit_sleep", lambda s: None)
+    for cache in (backend._income_cache, backend._cash_cache, backend._bs_cache):
+        cache.pop("AAA", None)
+
+    service = StockDataService("key", "base", "quote")
+    results = service.search({"gross_margin_pct_min": 50})
+    assert [r["symbol"] for r in results] == ["AAA"]
+    statement_urls = [u for u in urls if "statement" in u]
+    assert len(statement_urls) == 1 and "income-statement" in statement_urls[0]
+    assert set(service._metrics_cache["AAA"].value) == {"gross_margin_pct_latest"}
+
+    # A later filter needing cash flow only fetches the missing statement
+    service.search({"gross_margin_pct_min": 50, "ocf_ttm_min": 1})
+    statement_urls = [u for u in urls if "statement" in u]
+    assert len(statement_urls) == 2 and "cash-flow-statement" in statement_urls[1]
+    assert set(service._metrics_cache["AAA"].value) == {"gross_margin_pct_latest", "ocf_ttm"}
+
+    for cache in (backend._income_cache, backend._cash_cache, backend._bs_cache):
+        cache.pop("AAA", None)
+
+
+def test_project_statement_keeps_only_metric_columns():
+    payload = [
+        {"date": "2024-03-31", "revenue": "120", "costOfRevenue": None, "eps": 1.2},
+        {"date": "2024-06-30", "revenue": 150, "costOfRevenue": "bad", "netIncome": 9},
+        {"symbol": "AAA"},
+    ]
+    columns = backend.project_statement("income", payload)
+
+    assert columns["dates"] == ("2024-06-30", "2024-03-31")
+    assert columns["revenue"] == (150.0, 120.0)
+    assert columns["cost"] == (None, None)
+    assert set(columns) == {"dates", "revenue", "cost", "op_income", "rd", "sga"}
+
+
+def test_lazy_metrics_match_full_computation_with_mismatched_dates():
+    dates = [f"2024-{12 - i:02d}-01" for i in range(10)]
+    income = backend.project_statement("income", [
+        {"date": d, "revenue": 100 + 10 * i, "costOfRevenue": 40 + i, "operatingIncome": 5 + i,
+         "researchAndDevelopmentExpenses": 9, "sellingGeneralAndAdministrativeExpenses": 7 + i}
+        for i, d in enumerate(dates[1:9])
+    ])
+    # Cash flow reports a newer quarter and balance sheet an older one
+    cash = backend.project_statement("cash", [
+        {"date": d, "netCashProvidedByOperatingActivities": 3 * i, "capitalExpenditure": -2}
+        for i, d in enumerate(dates[:9])
+    ])
+    balance = backend.project_statement("balance", [
+        {"date": d, "deferredRevenue": 50 - i, "netReceivables": 20 + i, "inventory": 9, "accountPayables": 4 + i}
+        for i, d in enumerate(dates[2:])
+    ])
+    columns = {"income": income, "cash": cash, "balance": balance}
+
+    full = backend.metrics_from_columns(columns)
+    assert full["rev_ttm"] == 100 + 110 + 120 + 130
+    for metric in backend.METRIC_DEPENDENCIES:
+        needed = backend.statements_for_metrics({metric})
+        lazy = backend.metrics_from_columns({n: columns[n] for n in needed}, {metric})
+        assert lazy == {metric: full[metric]}, metric
@@ -0,0 +1,110 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+from backend import CacheEntry, StockDataService
+
+
+def _install(monkeypatch, statement_response):
+    urls = []
+
+    def fake_get(url, **kwargs):
+        urls.append(url)
+        if "statement" in url:
+            return statement_response(url)
+
+        class Resp:
+            def json(self):
+                return [{"symbol": "ETF"}]
+
+        return Resp()
+
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+    monkeypatch.setattr(backend, "_rate_limit_sleep", lambda s: None)
+    for cache in (backend._income_cache, backend._cash_cache, backend._bs_cache):
+        cache.pop("ETF", None)
+    return urls
+
+
+def test_symbols_without_fundamentals_are_negative_cached(monkeypatch):
+    class Empty:
+        def json(self):
+            return []
+
+    urls = _install(monkeypatch, lambda url: Empty())
+    service = StockDataService("key", "base", "quote")
+
+    assert service.search({"rev_ttm_min": 1}) == []
+    assert service.search({"rev_ttm_min": 1}) == []
+    assert len([u for u in urls if "statement" in u]) == 1
+    assert service._metrics_cache["ETF"].status == CacheEntry.EMPTY
+
+    # Once the negative TTL lapses the symbol is fetched again
+    service._metrics_cache["ETF"].expires = 0
+    backend._income_cache["ETF"].expires = 0
+    service.search({"rev_ttm_min": 1})
+    assert len([u for u in urls if "statement" in u]) == 2
+    backend._income_cache.pop("ETF", None)
+
+
+def test_transient_errors_are_retried_after_backoff(monkeypatch):
+    calls = {"n": 0}
+
+    def flaky(url):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise ConnectionError("boom")
+
+        class Resp:
+            def json(self):
+                return [{"date": "2024-12-01", "revenue": 10}]
+
+        return Resp()
+
+    _install(monkeypatch, flaky)
+    service = StockDataService("key", "base", "quote")
+
+    assert service.search({"rev_ttm_min": 1}) == []
+    entry = backend._income_cache["ETF"]
+    assert entry.status == CacheEntry.ERROR and entry.attempts == 1
+
+    # Within the backoff window nothing is refetched
+    assert service.search({"rev_ttm_min": 1}) == []
+    assert calls["n"] == 1
+
+    entry.expires = 0
+    service._metrics_cache["ETF"].expires = 0
+    assert [r["symbol"] for r in service.search({"rev_ttm_min": 1})] == ["ETF"]
+    assert calls["n"] == 2
+    assert backend._income_cache["ETF"].status == CacheEntry.VALID
+    backend._income_cache.pop("ETF", None)
+
+
+def test_api_error_messages_are_retried_not_negative_cached(monkeypatch):
+    calls = {"n": 0}
+
+    def limited(url):
+        calls["n"] += 1
+
+        class Resp:
+            def json(self):
+                if calls["n"] == 1:
+                    return {"Error Message": "Limit Reach. Please upgrade your plan."}
+                return [{"date": "2024-12-01", "revenue": 10}]
+
+        return Resp()
+
+    _install(monkeypatch, limited)
+    service = StockDataService("key", "base", "quote")
+
+    assert service.search({"rev_ttm_min": 1}) == []
+    entry = backend._income_cache["ETF"]
+    assert entry.status == CacheEntry.ERROR
+    assert entry.expires - backend.time.monotonic() <= backend.ERROR_BACKOFF_BASE
+
+    entry.expires = 0
+    service._metrics_cache["ETF"].expires = 0
+    assert [r["symbol"] for r in service.search({"rev_ttm_min": 1})] == ["ETF"]
+    backend._income_cache.pop("ETF", None)
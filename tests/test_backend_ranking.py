@@ -0,0 +1,87 @@
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+from backend import CacheEntry, StockDataService
+
+
+def _service(monkeypatch, rows, metrics):
+    computed = []
+
+    class Resp:
+        def json(self):
+            return [dict(row) for row in rows]
+
+    def fake_compute(symbol, api_key, metrics=None):
+        computed.append(symbol)
+        return dict(universe[symbol])
+
+    universe = metrics
+    monkeypatch.setattr(backend, "_get", lambda url, **kw: Resp())
+    monkeypatch.setattr(backend, "compute_mvp_metrics", fake_compute)
+    monkeypatch.setattr(backend, "statement_status", lambda s, st: (CacheEntry.VALID, None))
+    return StockDataService("k", "base?", "quote"), computed
+
+
+def test_ranked_search_matches_full_sort(monkeypatch):
+    rng = random.Random(5)
+    rows = [{"symbol": f"S{i}"} for i in range(60)]
+    universe = {
+        row["symbol"]: {
+            "rule40_op_ttm": rng.uniform(-20, 80),
+            "gross_margin_pct_latest": None if rng.random() < 0.1 else rng.uniform(0, 90),
+            "rev_ttm": rng.uniform(0, 100),
+        }
+        for row in rows
+    }
+    svc, computed = _service(monkeypatch, rows, universe)
+    weights = {"rule40_op_ttm": 1.0, "gross_margin_pct_latest": 0.5}
+
+    ranked = svc.search_ranked({"limit": 5, "rev_ttm_min": 20}, weights)
+
+    expected = sorted(
+        (
+            (m["rule40_op_ttm"] + 0.5 * m["gross_margin_pct_latest"], sym)
+            for sym, m in universe.items()
+            if m["gross_margin_pct_latest"] is not None and m["rev_ttm"] >= 20
+        ),
+        reverse=True,
+    )[:5]
+    assert [item["symbol"] for item in ranked] == [sym for _score, sym in expected]
+    assert [item["score"] for item in ranked] == [score for score, _sym in expected]
+
+
+def test_ranked_search_stops_once_no_candidate_can_enter_top_k(monkeypatch):
+    rows = [{"symbol": s} for s in ("A", "B", "C", "D", "E")]
+    universe = {s: {"max_qoq_rev_declines_last4": n} for s, n in zip("ABCDE", (2, 0, 1, 0, 3))}
+    svc, computed = _service(monkeypatch, rows, universe)
+    svc._metrics_cache["B"] = CacheEntry(CacheEntry.VALID, universe["B"])
+    svc._metrics_cache["D"] = CacheEntry(CacheEntry.VALID, universe["D"])
+
+    # Fewer declines is better and none can have fewer than zero
+    ranked = svc.search_ranked({"limit": 2}, {"max_qoq_rev_declines_last4": -1.0})
+    assert [item["symbol"] for item in ranked] == ["B", "D"]
+    # A and C could still tie B/D and win on screener order; E cannot
+    assert computed == ["A", "C"]
+
+
+def test_ranked_search_with_no_limit_returns_nothing(monkeypatch):
+    rows = [{"symbol": "A"}]
+    svc, computed = _service(monkeypatch, rows, {"A": {"rev_ttm": 1.0}})
+    assert svc.search_ranked({"limit": 0}, {"rev_ttm": 1.0}) == []
+    assert computed == []
+
+
+def test_zero_weight_metrics_do_not_break_bounds(monkeypatch):
+    rows = [{"symbol": s} for s in ("A", "B", "C")]
+    universe = {s: {"rev_ttm": v, "capex_pct": 5.0} for s, v in zip("ABC", (1.0, 3.0, 2.0))}
+    svc, computed = _service(monkeypatch, rows, universe)
+    svc._metrics_cache["B"] = CacheEntry(CacheEntry.VALID, universe["B"])
+
+    assert svc._score_bound("A", {"rev_ttm": 1.0, "capex_pct": 0.0}, {"rev_ttm", "capex_pct"}) == math.inf
+    ranked = svc.search_ranked({"limit": 2}, {"rev_ttm": 1.0, "capex_pct": 0.0})
+    assert [item["symbol"] for item in ranked] == ["B", "C"]
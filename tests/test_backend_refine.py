@@ -0,0 +1,82 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+from backend import StockDataService
+
+ROWS = [
+    {"symbol": "AAA", "price": 5.0, "marketCap": 1e9, "lastAnnualDividend": 0.5},
+    {"symbol": "BBB", "price": 15.0, "marketCap": 2e9, "lastAnnualDividend": 1.0},
+    {"symbol": "CCC", "price": 25.0, "marketCap": 3e9, "lastAnnualDividend": 2.0},
+]
+
+
+def _service(monkeypatch, rows=ROWS):
+    urls = []
+
+    class Resp:
+        def json(self):
+            return [dict(row) for row in rows]
+
+    def fake_get(url, **kw):
+        urls.append(url)
+        return Resp()
+
+    monkeypatch.setattr(backend, "_get", fake_get)
+    return StockDataService("k", "base?", "quote"), urls
+
+
+def _symbols(results):
+    return [r["symbol"] for r in results]
+
+
+def test_tightening_filters_previous_results_locally(monkeypatch):
+    svc, urls = _service(monkeypatch)
+    assert _symbols(svc.search({"priceMoreThan": 1})) == ["AAA", "BBB", "CCC"]
+    assert _symbols(svc.search({"priceMoreThan": 10})) == ["BBB", "CCC"]
+    assert _symbols(svc.search({"priceMoreThan": 10, "priceLowerThan": 20})) == ["BBB"]
+    assert _symbols(svc.search({"priceMoreThan": 1, "dividendMoreThan": 1.5})) == ["CCC"]
+    assert _symbols(svc.search({"priceMoreThan": 1, "limit": 2})) == ["AAA", "BBB"]
+    assert len(urls) == 1
+
+
+def test_loosening_or_changing_filters_refetches(monkeypatch):
+    svc, urls = _service(monkeypatch)
+    svc.search({"priceMoreThan": 10})
+    svc.search({"priceMoreThan": 5})
+    assert len(urls) == 2
+    svc.search({"priceMoreThan": 5, "sector": "Technology"})
+    assert len(urls) == 3
+    svc.search({"priceMoreThan": 5})
+    assert len(urls) == 4
+
+
+def test_truncated_results_are_not_refined(monkeypatch):
+    svc, urls = _service(monkeypatch)
+    svc.search({"priceMoreThan": 1, "limit": 3})
+    svc.search({"priceMoreThan": 10, "limit": 3})
+    assert len(urls) == 2
+
+
+def test_stale_results_are_refetched(monkeypatch):
+    svc, urls = _service(monkeypatch)
+    svc.search({"priceMoreThan": 1})
+    params, data, fetched_at = svc._last_candidates
+    svc._last_candidates = (params, data, fetched_at - backend.REFINE_TTL - 1)
+    svc.search({"priceMoreThan": 10})
+    assert len(urls) == 2
+
+
+def test_search_local_uses_only_cached_data(monkeypatch):
+    svc, urls = _service(monkeypatch)
+    assert svc.search_local({"priceMoreThan": 1}) is None
+    svc.search({"priceMoreThan": 1})
+    assert _symbols(svc.search_local({"priceMoreThan": 10})) == ["BBB", "CCC"]
+    # Metrics that were never computed need the network
+    assert svc.search_local({"priceMoreThan": 10, "rev_ttm_min": 1}) is None
+    svc._metrics_cache["BBB"] = backend.CacheEntry(backend.CacheEntry.VALID, {"rev_ttm": 5.0})
+    svc._metrics_cache["CCC"] = backend.CacheEntry.empty(None)
+    assert _symbols(svc.search_local({"priceMoreThan": 10, "rev_ttm_min": 1})) == ["BBB"]
+    assert len(urls) == 1
@@ -0,0 +1,95 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+from backend import StockDataService
+
+
+def test_search_many_shares_screener_and_metrics(monkeypatch):
+    data = [{"symbol": "AAA"}, {"symbol": "BBB"}]
+    urls = []
+
+    def fake_get(url):
+        urls.append(url)
+
+        class Resp:
+            def json(self):
+                return [dict(item) for item in data]
+
+        return Resp()
+
+    computed = []
+
+    def fake_metrics(symbol, api_key, metrics=None):
+        computed.append(symbol)
+        return {"rev_ttm": 100 if symbol == "AAA" else 10, "gross_margin_pct_latest": 50}
+
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+    monkeypatch.setattr(backend, "compute_mvp_metrics", fake_metrics)
+
+    service = StockDataService("key", "base", "quote")
+    results = service.search_many(
+        {
+            "Big": {"sector": "Technology", "rev_ttm_min": 50},
+            "Margins": {"sector": "Technology", "gross_margin_pct_min": 40},
+            "All": {"sector": "Technology"},
+        }
+    )
+
+    assert [r["symbol"] for r in results["Big"]] == ["AAA"]
+    assert [r["symbol"] for r in results["Margins"]] == ["AAA", "BBB"]
+    assert [r["symbol"] for r in results["All"]] == ["AAA", "BBB"]
+    assert len(urls) == 1
+    assert sorted(computed) == ["AAA", "BBB"]
+
+
+def test_iter_search_yields_before_later_symbols_are_fetched(monkeypatch):
+    def fake_get(url):
+        class Resp:
+            def json(self):
+                return [{"symbol": "AAA"}, {"symbol": "BBB"}]
+
+        return Resp()
+
+    computed = []
+
+    def fake_metrics(symbol, api_key, metrics=None):
+        computed.append(symbol)
+        return {"rev_ttm": 100}
+
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+    monkeypatch.setattr(backend, "compute_mvp_metrics", fake_metrics)
+
+    candidates = []
+    service = StockDataService("key", "base", "quote")
+    stream = service.iter_search({"rev_ttm_min": 50}, on_candidates=candidates.extend)
+
+    assert next(stream)["symbol"] == "AAA"
+    assert computed == ["AAA"]
+    assert [c["symbol"] for c in candidates] == ["AAA", "BBB"]
+    assert [item["symbol"] for item in stream] == ["BBB"]
+
+
+def test_iter_search_stops_fetching_once_abandoned(monkeypatch):
+    def fake_get(url):
+        class Resp:
+            def json(self):
+                return [{"symbol": s} for s in ("AAA", "BBB", "CCC", "DDD")]
+
+        return Resp()
+
+    computed = []
+
+    def fake_metrics(symbol, api_key, metrics=None):
+        computed.append(symbol)
+        return {"rev_ttm": 1}  # nothing passes, so nothing is ever yielded
+
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+    monkeypatch.setattr(backend, "compute_mvp_metrics", fake_metrics)
+
+    service = StockDataService("key", "base", "quote")
+    stream = service.iter_search({"rev_ttm_min": 50}, should_stop=lambda: len(computed) >= 2)
+    assert list(stream) == []
+    assert computed == ["AAA", "BBB"]
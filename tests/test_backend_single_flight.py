@@ -0,0 +1,72 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+from backend import SingleFlight
+
+
+def test_single_flight_shares_in_flight_result():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return "value"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do("k", slow)))
+    leader.start()
+    started.wait(2)
+    followers = [
+        threading.Thread(target=lambda: results.append(flights.do("k", slow)))
+        for _ in range(4)
+    ]
+    for t in followers:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in [leader, *followers]:
+        t.join(2)
+
+    assert len(calls) == 1
+    assert sorted(results) == [("value", False)] + [("value", True)] * 4
+
+
+def test_concurrent_metrics_fetch_statement_once(monkeypatch):
+    urls = []
+    lock = threading.Lock()
+
+    def fake_get(url, **kwargs):
+        with lock:
+            urls.append(url)
+        time.sleep(0.05)
+
+        class Resp:
+            def json(self):
+                return [{"date": "2024-12-01", "revenue": 10}]
+
+        return Resp()
+
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+    monkeypatch.setattr(backend, "_rate_limit_sleep", lambda s: None)
+    backend._income_cache.pop("SFT", None)
+
+    threads = [
+        threading.Thread(target=backend.compute_mvp_metrics, args=("SFT", "key", {"rev_ttm"}))
+        for _ in range(6)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(2)
+
+    assert len(urls) == 1
+    backend._income_cache.pop("SFT", None)
@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+from backend import RequestStats, StockDataService
+
+
+def test_search_records_endpoint_and_cache_stats(monkeypatch):
+    def fake_get(url):
+        class Resp:
+            content = b'[{"symbol": "AAA"}]'
+
+            def json(self):
+                return [{"symbol": "AAA"}]
+
+        return Resp()
+
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+    monkeypatch.setattr(backend, "compute_mvp_metrics", lambda s, k, metrics=None: {"rev_ttm": 10})
+    monkeypatch.setattr(backend, "stats", RequestStats())
+
+    service = StockDataService("key", "https://financialmodelingprep.com/api/v3/stock-screener?", "quote")
+    service.search({"rev_ttm_min": 1, "priceMoreThan": 5})
+    # Dropping a bound loosens the query, so the screener is queried again
+    service.search({"rev_ttm_min": 1})
+
+    snap = backend.stats.snapshot()
+    screener = snap["endpoints"]["stock-screener"]
+    assert screener["latency"]["count"] == 2
+    assert screener["bytes"] == 2 * len(b'[{"symbol": "AAA"}]')
+    assert snap["caches"]["metrics"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+    assert json.loads(backend.stats.to_json())["endpoints"]["stock-screener"]["latency"]["count"] == 2
+    prom = backend.stats.to_prometheus()
+    assert 'upcom_request_latency_seconds_count{endpoint="stock-screener"} 2' in prom
+    assert 'upcom_cache_requests_total{cache="metrics",result="hit"} 1' in prom
+
+
+def test_fetches_after_a_failure_are_counted_as_retries(monkeypatch):
+    responses = iter([ConnectionError("down"), ConnectionError("down"), [{"symbol": "AAA", "sector": "Tech"}]])
+
+    def fake_get(url, **kwargs):
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+
+        class Resp:
+            content = json.dumps(response).encode("utf-8")
+
+            def json(self):
+                return response
+
+        return Resp()
+
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+    monkeypatch.setattr(backend, "stats", RequestStats())
+    service = StockDataService("key", "base", "quote")
+
+    assert service.get_profile("AAA") == {}
+    service._profile_cache["AAA"].expires = 0
+    assert service.get_profile("AAA") == {}
+    service._profile_cache["AAA"].expires = 0
+    assert service.get_profile("AAA")["sector"] == "Tech"
+    assert backend.stats.snapshot()["retries"] == {"profile": 2}
@@ -0,0 +1,86 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend import (
+    METRIC_DEPENDENCIES,
+    STATEMENTS,
+    StockDataService,
+    metric_history_from_columns,
+    metrics_from_columns,
+    project_statement,
+)
+from backtest import MetricHistory, calendar_quarter, run_backtest
+from statement_store import StatementStore
+
+FIELDS = {
+    "income": ["revenue", "costOfRevenue", "operatingIncome",
+               "researchAndDevelopmentExpenses", "sellingGeneralAndAdministrativeExpenses"],
+    "cash": ["netCashProvidedByOperatingActivities", "capitalExpenditure"],
+    "balance": ["deferredRevenue", "netReceivables", "inventory", "accountPayables"],
+}
+
+
+def _columns(rng, quarters, month_offset=0):
+    columns = {}
+    for name in STATEMENTS:
+        rows = []
+        for i in range(quarters):
+            month = (i % 4) * 3 + 3 - month_offset
+            row = {"date": f"{2010 + i // 4}-{month:02d}-28"}
+            for field in FIELDS[name]:
+                row[field] = None if rng.random() < 0.1 else rng.uniform(1, 500)
+            rows.append(row)
+        columns[name] = project_statement(name, rows)
+    return columns
+
+
+def _truncate(columns, date):
+    out = {}
+    for name, column in columns.items():
+        keep = [i for i, d in enumerate(column["dates"]) if d <= date]
+        out[name] = {key: tuple(values[i] for i in keep) for key, values in column.items()}
+    return out
+
+
+def test_history_matches_latest_metrics_on_truncated_statements():
+    rng = random.Random(3)
+    for _ in range(20):
+        columns = _columns(rng, rng.randint(1, 14))
+        dates, history = metric_history_from_columns(columns)
+        for date, row in zip(dates, history):
+            expected = metrics_from_columns(_truncate(columns, date))
+            expected["yoy_rev_growth_pct_array"] = expected["yoy_rev_growth_pct_array"][:4]
+            assert row == expected
+
+
+def test_backtest_matches_per_symbol_filters(tmp_path):
+    rng = random.Random(7)
+    columns = {f"S{i}": _columns(rng, 16, month_offset=i % 2) for i in range(30)}
+    store = StatementStore(str(tmp_path / "statements.db"))
+    for symbol, by_name in columns.items():
+        for name, column in by_name.items():
+            store.put(symbol, name, column)
+    history = MetricHistory.from_store(store)
+    store.close()
+    assert history.quarters[0] == "2010Q1" and history.quarters[-1] == "2013Q4"
+
+    params = {"gross_margin_pct_min": 20, "yoy_rev_growth_pct_min": 0,
+              "yoy_growth_quarter_count_min": 2, "capex_pct_max": 150, "sector": "Technology"}
+    result = run_backtest(params, history, start="2012Q1")
+    assert list(result.passed)[0] == "2012Q1" and result.ignored == ["sector"]
+
+    svc = StockDataService("k", "base", "quote")
+    mvp = {k: v for k, v in params.items() if k != "sector"}
+    for quarter, passed in result.passed.items():
+        expected = []
+        for symbol in history.symbols:
+            dates, rows = metric_history_from_columns(columns[symbol])
+            row = next((r for d, r in zip(dates, rows) if calendar_quarter(d) == quarter), None)
+            if row is not None and svc._passes_mvp_filters(row, mvp):
+                expected.append(symbol)
+        assert passed == expected
+    assert any(result.counts().values())
+    assert set(history.values) == set(METRIC_DEPENDENCIES)
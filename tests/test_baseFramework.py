@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
@@ -394,3 +395,486 @@ def test_toggle_dark_mode_switches_flag_and_updates_widgets():
     app.toggle_dark_mode()
     assert app.dark_mode is False
     assert app.root.configure.call_count == 2
+
+
+def test_streamed_search_renders_tiles_and_reports_timings():
+    app = StockScreenerApp.__new__(StockScreenerApp)
+    app.results_frame = MagicMock()
+    app.results_canvas = MagicMock()
+    app.params = {"rev_ttm_min": 1}
+
+    scheduled = []
+    app.root = MagicMock()
+    app.root.after.side_effect = lambda ms, fn: scheduled.append(fn)
+
+    children = []
+    app.results_frame.winfo_children.side_effect = lambda: list(children)
+
+    def fake_iter_search(params, on_candidates=None, should_stop=None):
+        on_candidates([{"symbol": "AAA"}, {"symbol": "BBB"}])
+        yield {"symbol": "AAA", "name": "Alpha"}
+        yield {"symbol": "BBB"}
+
+    app.backend = MagicMock()
+    app.backend.iter_search.side_effect = fake_iter_search
+    app.backend.get_quotes.return_value = [{"symbol": "AAA", "price": 1.0}]
+
+    rendered = []
+
+    def fake_tile(symbol, quote):
+        rendered.append((symbol, quote))
+        leaf = MagicMock()
+        leaf.winfo_children.return_value = []
+        children.append(leaf)
+
+    app.render_stock_tile = fake_tile
+
+    app.search_stocks()
+    assert rendered == []  # nothing rendered until the event loop runs
+
+    while scheduled:
+        scheduled.pop(0)()
+
+    assert rendered == [("AAA", {"symbol": "AAA", "price": 1.0, "name": "Alpha"}), ("BBB", {})]
+    app.backend.get_quotes.assert_called_once_with(["AAA", "BBB"])
+
+    text = app.format_debug_overlay()
+    assert "backend.search" in text and "first_result" in text and " ms" in text
+    for name in ("tiles", "render_results"):
+        line = next(line for line in text.splitlines() if line.startswith(name))
+        assert line.endswith(" ms"), line
+    assert app.perf_timings["tiles"] <= app.perf_timings["render_results"]
+    widgets_line = next(line for line in text.splitlines() if line.startswith("widgets"))
+    assert widgets_line.endswith("2")
+
+
+def test_streamed_search_runs_backend_off_the_ui_thread():
+    import threading
+
+    app = StockScreenerApp.__new__(StockScreenerApp)
+    app.results_frame = MagicMock()
+    app.results_frame.winfo_children.return_value = []
+    app.results_canvas = MagicMock()
+    scheduled = []
+    app.root = MagicMock()
+    app.root.after.side_effect = lambda ms, fn: scheduled.append(fn)
+
+    gate = threading.Event()
+    threads = []
+
+    def fake_iter_search(params, on_candidates=None, should_stop=None):
+        threads.append(threading.current_thread())
+        yield {"symbol": "AAA"}
+        gate.wait(5)
+        yield {"symbol": "BBB"}
+
+    app.backend = MagicMock()
+    app.backend.iter_search.side_effect = fake_iter_search
+    rendered = []
+    app.render_stock_tile = lambda symbol, quote: rendered.append(symbol)
+
+    app.stream_results({})
+    deadline = time.time() + 5
+    while not rendered and time.time() < deadline:
+        scheduled.pop(0)()
+    # The first tile is drawn while the worker is still blocked on the second
+    assert rendered == ["AAA"] and app._stream_token is not None
+    assert threads and threads[0] is not threading.current_thread()
+
+    gate.set()
+    while scheduled:
+        scheduled.pop(0)()
+    assert rendered == ["AAA", "BBB"] and app._stream_token is None
+
+
+def test_run_all_algorithms_groups_matches_by_algorithm(monkeypatch):
+    app = StockScreenerApp.__new__(StockScreenerApp)
+    app.results_frame = MagicMock()
+    app.results_frame.winfo_children.return_value = []
+    app.results_canvas = MagicMock()
+    scheduled = []
+    app.root = MagicMock()
+    app.root.after.side_effect = lambda ms, fn: scheduled.append(fn)
+    app.saved_algorithms = {"Growth": {"rev_ttm_min": 1}, "Value": {"priceLowerThan": 5}}
+    app.backend = MagicMock()
+    app.backend.search_many.return_value = {
+        "Growth": [{"symbol": "AAA"}, {"symbol": "BBB"}],
+        "Value": [{"symbol": "BBB"}, {"symbol": "CCC"}],
+    }
+    app.backend.get_quotes.return_value = [{"symbol": "AAA", "price": 1.0}]
+    headers = []
+    monkeypatch.setattr("baseFramework.tk.Label", lambda parent, text="", **kw: headers.append(text) or MagicMock())
+    rendered = []
+    app.render_stock_tile = lambda symbol, quote: rendered.append((symbol, quote))
+
+    app.run_all_algorithms()
+    deadline = time.time() + 5
+    while scheduled and time.time() < deadline:
+        scheduled.pop(0)()
+
+    app.backend.search_many.assert_called_once_with(app.saved_algorithms)
+    app.backend.get_quotes.assert_called_once_with(["AAA", "BBB", "CCC"])
+    assert headers == ["Growth (2)", "Value (2)"]
+    assert rendered == [("AAA", {"symbol": "AAA", "price": 1.0}), ("BBB", {}), ("CCC", {})]
+
+
+def test_startup_timing_waits_for_first_paint_of_root():
+    app = StockScreenerApp.__new__(StockScreenerApp)
+    app.root = MagicMock()
+    idle = []
+    app.root.after_idle.side_effect = idle.append
+    app._startup_start = time.perf_counter()
+
+    # Exposes of child widgets do not count
+    app._on_first_expose(MagicMock(widget=MagicMock()))
+    assert idle == []
+
+    app._on_first_expose(MagicMock(widget=app.root))
+    app._on_first_expose(MagicMock(widget=app.root))
+    assert len(idle) == 1
+    idle[0]()
+    assert app.perf_timings["startup"] >= 0
+
+
+def test_preview_blocks_build_in_idle_chunks():
+    app = StockScreenerApp.__new__(StockScreenerApp)
+    app.root = MagicMock()
+    built = []
+    app._build_preview = lambda label, parent: built.append((label, parent))
+
+    from collections import deque
+
+    app._pending_previews = {"tools": deque(["A", "B"]), "mvp": deque(["C", "D", "E"])}
+
+    app._build_pending_previews(chunk_size=3)
+    assert built == [("A", "tools"), ("B", "tools"), ("C", "mvp")]
+    app.root.after_idle.assert_called_once_with(app._build_pending_previews)
+
+    # Expanding a group builds its remaining blocks immediately
+    app._build_preview_group("mvp")
+    assert built[-2:] == [("D", "mvp"), ("E", "mvp")]
+    assert app._pending_previews == {}
+
+
+def test_delayed_search_runs_latest_params_after_in_flight_search():
+    app = StockScreenerApp.__new__(StockScreenerApp)
+    app.backend = MagicMock()
+    scheduled = []
+    app.root = MagicMock()
+    app.root.after.side_effect = lambda ms, fn: scheduled.append((ms, fn)) or len(scheduled)
+    searched = []
+    app.search_stocks = lambda: searched.append(dict(app.params))
+
+    app.params = {"priceMoreThan": 1}
+    app._stream_token = object()  # a search is streaming
+    app.delayed_search()
+    app.params = {"priceMoreThan": 2}
+    app.delayed_search()
+    assert scheduled == [] and app._search_pending
+
+    app._stream_token = None
+    app._search_finished(start=0)
+    assert len(scheduled) == 1
+    scheduled.pop()[1]()
+    assert searched == [{"priceMoreThan": 2}]
+
+    # Match-count estimates are refreshed off the UI thread
+    deadline = time.time() + 5
+    while not app.backend.refresh_match_counter.called and time.time() < deadline:
+        time.sleep(0.01)
+    app.backend.refresh_match_counter.assert_called_once_with()
+
+
+def test_update_display_queues_behind_in_flight_search():
+    app = StockScreenerApp.__new__(StockScreenerApp)
+    app.backend = MagicMock()
+    scheduled = []
+    app.root = MagicMock()
+    app.root.after.side_effect = lambda ms, fn: scheduled.append((ms, fn)) or len(scheduled)
+    searched = []
+    app.search_stocks = lambda: searched.append(dict(app.params))
+    app.params = {"stockSearch": "AA"}
+
+    app._stream_token = object()
+    app.update_display()
+    assert scheduled == [] and searched == [] and app._search_pending
+
+    app._stream_token = None
+    app._search_finished(start=0)
+    app.update_display()
+    # The queued debounce is replaced by an immediate search
+    assert scheduled[-1][0] == 0
+    app.root.after_cancel.assert_called_once_with(1)
+    scheduled[-1][1]()
+    assert searched == [{"stockSearch": "AA"}]
+
+
+def test_search_debounce_adapts_to_latency():
+    from baseFramework import MAX_SEARCH_DEBOUNCE_MS, MIN_SEARCH_DEBOUNCE_MS
+    from collections import deque
+
+    app = StockScreenerApp.__new__(StockScreenerApp)
+    assert app._search_debounce_ms() == MIN_SEARCH_DEBOUNCE_MS
+    app.search_latencies = deque([0.2, 0.3, 0.1])
+    assert app._search_debounce_ms() == 100
+    app.search_latencies = deque([5.0])
+    assert app._search_debounce_ms() == MAX_SEARCH_DEBOUNCE_MS
+
+
+def test_slider_preview_renders_local_results():
+    app = StockScreenerApp.__new__(StockScreenerApp)
+    app.root = MagicMock()
+    app.results_frame = MagicMock()
+    app.results_frame.winfo_children.return_value = []
+    app.params = {"priceMoreThan": 10}
+    app._last_quote_map = {"BBB": {"symbol": "BBB", "price": 15.0}}
+    app.backend = MagicMock()
+    app.backend.search_local.return_value = [{"symbol": "BBB"}]
+    rendered = []
+    app.render_stock_tile = lambda symbol, quote: rendered.append((symbol, quote))
+
+    app.preview_search()
+    app.preview_search()
+    app.root.after_idle.assert_called_once_with(app._run_preview)
+    app._run_preview()
+    assert rendered == [("BBB", {"symbol": "BBB", "price": 15.0})]
+    app.backend.search.assert_not_called()
+
+
+def test_tooltip_window_is_reused_across_hovers(monkeypatch):
+    from baseFramework import ToolTip
+    from types import SimpleNamespace
+
+    window, label = MagicMock(), MagicMock()
+    monkeypatch.setattr(ToolTip, "_window", window)
+    monkeypatch.setattr(ToolTip, "_label", label)
+    monkeypatch.setattr(ToolTip, "_texts", {})
+    monkeypatch.setattr(ToolTip, "_owner", None)
+
+    block_a, block_b = MagicMock(master=None), MagicMock(master=None)
+    child = MagicMock(master=MagicMock(master=block_a))
+    ToolTip.register(block_a, "A tip")
+    ToolTip.register(block_b, "B tip")
+    # Children are found through their masters rather than their own bindings
+    child.bind.assert_not_called()
+
+    ToolTip._on_motion(SimpleNamespace(widget=child, x_root=10, y_root=20))
+    ToolTip._on_motion(SimpleNamespace(widget=block_a, x_root=11, y_root=20))
+    ToolTip._on_motion(SimpleNamespace(widget=block_b, x_root=50, y_root=20))
+    assert [c.kwargs["text"] for c in label.config.call_args_list] == ["A tip", "B tip"]
+    window.deiconify.assert_called_once()
+    window.geometry.assert_called_with("+62+32")
+
+    ToolTip._on_motion(SimpleNamespace(widget=MagicMock(master=None), x_root=0, y_root=0))
+    window.withdraw.assert_called_once()
+    assert ToolTip._owner is None
+
+
+def test_drag_ghost_is_reused_and_motion_coalesced(monkeypatch):
+    from types import SimpleNamespace
+
+    windows = []
+
+    def fake_toplevel(master):
+        window = MagicMock()
+        windows.append(window)
+        return window
+
+    monkeypatch.setattr("baseFramework.tk.Toplevel", fake_toplevel)
+
+    block = DraggableBlock.__new__(DraggableBlock)
+    block.preview_block = MagicMock(_summary_label=None, _param_label="Sector")
+    block.preview_block.winfo_rootx.return_value = 100
+    block.preview_block.winfo_rooty.return_value = 200
+    block.drop_target = MagicMock()
+    block.drop_target.winfo_rootx.return_value = 1000
+    block.drop_target.winfo_width.return_value = 10
+    block.app = SimpleNamespace(saved_algorithms={})
+    block._drag_window = None
+    block._ghost_key = None
+    block._drag_event = None
+    block._drag_after_id = None
+    block.drag_data = {"x": 0, "y": 0}
+    block.clone_preview_block = MagicMock()
+    scheduled = []
+    block.after = lambda ms, fn: scheduled.append(fn) or "id"
+    block.after_cancel = MagicMock()
+
+    for _ in range(2):
+        block.start_drag(SimpleNamespace(x=5, y=5))
+        for dx in range(10):
+            block.do_drag(SimpleNamespace(x=5 + dx, y=5))
+        assert len(scheduled) == 1
+        scheduled.pop()()
+        windows[0].geometry.assert_called_with("+109+200")
+        block.stop_drag(SimpleNamespace(x=9, y=5))
+
+    assert len(windows) == 1
+    block.clone_preview_block.assert_called_once()
+    assert windows[0].withdraw.call_count == 3  # on creation and after each drag
+    windows[0].destroy.assert_not_called()
+
+
+def test_result_tiles_are_pooled_and_memory_stays_flat(monkeypatch):
+    import gc
+    import tracemalloc
+    from types import SimpleNamespace
+
+    created = []
+
+    class FakeWidget:
+        def __init__(self, master=None, **kwargs):
+            self.master = master
+            self.children = []
+            self.destroyed = False
+            self._tags = ("Widget", "all")
+            if master is not None:
+                master.children.append(self)
+            created.append(self)
+
+        def pack(self, *args, **kw):
+            pass
+
+        pack_forget = place = config = bind_class = pack
+
+        def bindtags(self, tags=None):
+            if tags is None:
+                return self._tags
+            self._tags = tags
+
+        def winfo_children(self):
+            return list(self.children)
+
+        def destroy(self):
+            self.destroyed = True
+            if self in self.master.children:
+                self.master.children.remove(self)
+
+    monkeypatch.setattr(
+        "baseFramework.tk", SimpleNamespace(Frame=FakeWidget, Label=FakeWidget, Button=FakeWidget)
+    )
+
+    app = StockScreenerApp.__new__(StockScreenerApp)
+    app.results_frame = FakeWidget()
+    app.result_tiles = {}
+    app._tile_pool = []
+
+    def search(n):
+        app._clear_results()
+        for i in range(20):
+            app.render_stock_tile(f"S{n}-{i}", {"name": f"Co {i}", "price": float(i)})
+        FakeWidget(app.results_frame)  # e.g. a "no results" label that is destroyed next time
+
+    search(0)
+    widgets_after_first = len(created)
+    tracemalloc.start()
+    for n in range(1, 10):
+        search(n)
+    gc.collect()
+    baseline = tracemalloc.take_snapshot()
+    for n in range(10, 200):
+        search(n)
+    gc.collect()
+    growth = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, "filename"))
+    tracemalloc.stop()
+
+    assert len(created) - widgets_after_first == 199  # only the throwaway labels
+    assert len(app.result_tiles) == 20 and app._tile_pool == []
+    assert len(app.results_frame.children) == 21
+    assert growth < 64 * 1024
+
+    tile = app.result_tiles["S199-3"]
+    assert tile.symbol == "S199-3"
+    app.remove_stock_tile = StockScreenerApp.remove_stock_tile.__get__(app)
+    app.results_canvas = MagicMock()
+    app.remove_stock_tile("S199-3")
+    assert "S199-3" not in app.result_tiles and app._tile_pool == [tile]
+
+
+def test_live_quotes_update_visible_tiles_in_place():
+    from baseFramework import StockTile
+
+    app = StockScreenerApp.__new__(StockScreenerApp)
+    app.results_canvas = MagicMock()
+    app.results_canvas.canvasy.return_value = 100
+    app.results_canvas.winfo_height.return_value = 200
+
+    def tile_at(y):
+        tile = StockTile.__new__(StockTile)
+        tile.frame = MagicMock()
+        tile.frame.winfo_y.return_value = y
+        tile.frame.winfo_height.return_value = 50
+        tile.price_label = MagicMock()
+        tile.quote_data = {"name": "Screener Name", "price": 1.0}
+        return tile
+
+    app.result_tiles = {"ABOVE": tile_at(0), "TOP": tile_at(60), "MID": tile_at(200), "BELOW": tile_at(400)}
+    assert app.visible_tile_symbols() == ["TOP", "MID"]
+
+    app.apply_live_quotes({"MID": {"symbol": "MID", "price": 2.5, "changesPercentage": -1.0, "name": "Quote Name"}})
+    mid = app.result_tiles["MID"]
+    mid.price_label.config.assert_called_once_with(text="2.50", fg="red")
+    assert mid.quote_data["name"] == "Screener Name"
+    mid.frame.destroy.assert_not_called()
+
+
+@pytest.mark.parametrize("label, key", [("Gross Margin % ≥", "gross_margin_pct_min"), ("Lower Price", "priceMoreThan")])
+def test_slider_handlers_preview_while_dragging_and_search_on_release(monkeypatch, label, key):
+    app = StockScreenerApp.__new__(StockScreenerApp)
+    app.params = {}
+    app.snap_order = []
+    app.root = MagicMock()
+    app.backend = MagicMock()
+    app.snap_zone = MagicMock()
+    app.snap_zone.create_window.return_value = 1
+    app.snap_zone_placeholder = MagicMock()
+    app.reposition_snap_zone = lambda: None
+    app.preview_search = MagicMock()
+    app.delayed_search = MagicMock()
+    app.update_display = MagicMock()
+
+    class DummyStringVar:
+        def __init__(self, value=""):
+            self.value = value
+
+        def get(self):
+            return self.value
+
+        def set(self, v):
+            self.value = v
+
+    class DummyScale(MagicMock):
+        value = 0
+
+        def get(self):
+            return self.value
+
+    scales, entries = [], []
+    monkeypatch.setattr("baseFramework.tk.StringVar", DummyStringVar)
+    monkeypatch.setattr("baseFramework.tk.Frame", lambda *a, **k: MagicMock())
+    monkeypatch.setattr("baseFramework.tk.Label", lambda *a, **k: MagicMock())
+    monkeypatch.setattr("baseFramework.tk.Button", lambda *a, **k: MagicMock())
+    monkeypatch.setattr("baseFramework.tk.Entry", lambda *a, **k: entries.append(MagicMock(var=k["textvariable"])) or entries[-1])
+    monkeypatch.setattr("baseFramework.tk.Scale", lambda *a, **k: scales.append(DummyScale()) or scales[-1])
+
+    app.add_filter_block(label, 10.0)
+    slider = scales[0]
+    on_move = slider.config.call_args.kwargs["command"]
+    bindings = {c.args[0]: c.args[1] for c in slider.bind.call_args_list}
+
+    for val in ("20", "30", "40"):
+        on_move(val)
+    assert app.params[key] == 40.0
+    assert app.preview_search.call_count == 3
+    app.delayed_search.assert_not_called()
+
+    slider.value = 40.0
+    bindings["<ButtonRelease-1>"](None)
+    app.delayed_search.assert_called_once_with()
+
+    entry = entries[0]
+    entry.var.set("55")
+    {c.args[0]: c.args[1] for c in entry.bind.call_args_list}["<Return>"](None)
+    assert app.params[key] == 55.0
+    assert app.delayed_search.call_count == 2
+    app.update_display.assert_not_called()
@@ -0,0 +1,77 @@
+import gzip
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+import http_archive
+from backend import StockDataService
+from http_archive import ArchiveMiss, ArchiveTransport, archive_key
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.content = json.dumps(payload).encode("utf-8")
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json"}
+
+
+def test_archive_key_drops_api_key_and_sorts_query():
+    assert archive_key("https://x/api?b=2&apikey=SECRET&a=1") == "https://x/api?a=1&b=2"
+
+
+def test_record_then_replay_offline(tmp_path):
+    path = str(tmp_path / "fmp.json.gz")
+    fetched = []
+
+    def fetch(url, **kwargs):
+        fetched.append(url)
+        return FakeResponse([{"symbol": "AAA"}], 200)
+
+    with ArchiveTransport(path, mode="record", fetch=fetch) as recorder:
+        assert recorder.get("https://x/quote/AAA?apikey=SECRET").json() == [{"symbol": "AAA"}]
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        assert "SECRET" not in fh.read()
+
+    replay = ArchiveTransport(path, fetch=lambda url, **kw: pytest.fail("network used"))
+    response = replay.get("https://x/quote/AAA?apikey=OTHER", timeout=10)
+    assert response.status_code == 200 and response.json() == [{"symbol": "AAA"}]
+    with pytest.raises(ArchiveMiss):
+        replay.get("https://x/quote/BBB")
+    assert fetched == ["https://x/quote/AAA?apikey=SECRET"]
+
+
+def test_replay_latency(tmp_path, monkeypatch):
+    path = str(tmp_path / "fmp.json.gz")
+    with ArchiveTransport(path, mode="auto", fetch=lambda url, **kw: FakeResponse({})) as recorder:
+        recorder.get("https://x/a")
+    recorder.entries[archive_key("https://x/a")].elapsed = 0.3
+    recorder._dirty = True
+    recorder.save()
+    sleeps = []
+    monkeypatch.setattr(http_archive.time, "sleep", sleeps.append)
+
+    ArchiveTransport(path, latency=0.05).get("https://x/a")
+    ArchiveTransport(path, latency=None).get("https://x/a")
+    assert sleeps == [0.05, 0.3]
+
+
+def test_service_search_replays_without_network(tmp_path, monkeypatch):
+    path = str(tmp_path / "fmp.json.gz")
+    rows = [{"symbol": "AAA", "lastAnnualDividend": 2.0}, {"symbol": "BBB"}]
+    try:
+        backend.set_transport(ArchiveTransport(path, mode="record", fetch=lambda url, **kw: FakeResponse(rows)))
+        recorded = StockDataService("key", "base?", "quote").search({"dividendMoreThan": 1})
+        # Closing the recorder writes the archive
+        backend.set_transport(None)
+
+        backend.set_transport(ArchiveTransport(path))
+        monkeypatch.setattr(backend.requests, "get", lambda *a, **kw: pytest.fail("network used"))
+        replayed = StockDataService("other-key", "base?", "quote").search({"dividendMoreThan": 1})
+    finally:
+        backend.set_transport(None)
+    assert [r["symbol"] for r in replayed] == [r["symbol"] for r in recorded] == ["AAA"]
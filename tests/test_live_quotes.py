@@ -0,0 +1,82 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from live_quotes import POLL_MS, QuoteRefresher
+from fake_quote_server import FakeQuoteServer
+
+
+class FakeRoot:
+    def __init__(self):
+        self.mapped = True
+        self.scheduled = []
+
+    def after(self, ms, fn):
+        self.scheduled.append((ms, fn))
+        return len(self.scheduled)
+
+    def after_cancel(self, after_id):
+        pass
+
+    def winfo_ismapped(self):
+        return self.mapped
+
+    def run_next(self):
+        ms, fn = self.scheduled.pop(0)
+        fn()
+        return ms
+
+
+def _run_until_applied(root, refresher, applied):
+    count = len(applied)
+    while len(applied) == count:
+        if refresher._future is not None:
+            refresher._future.result(timeout=5)
+        root.run_next()
+
+
+def test_refresher_batches_visible_symbols_and_backs_off_when_hidden():
+    root = FakeRoot()
+    batches, applied = [], []
+
+    def fetch(symbols):
+        batches.append(symbols)
+        return [{"symbol": s, "price": 1.0} for s in symbols]
+
+    refresher = QuoteRefresher(root, fetch, lambda: ["A", "B", "C", "A"], applied.append,
+                               interval_ms=1000, max_interval_ms=4000, batch_size=2)
+    refresher.start()
+    _run_until_applied(root, refresher, applied)
+    assert batches == [["A", "B"], ["C"]]
+    assert set(applied[0]) == {"A", "B", "C"}
+    assert root.scheduled[-1][0] == 1000
+
+    root.mapped = False
+    assert [root.run_next() for _ in range(4)] == [1000, 2000, 4000, 4000]
+    assert len(batches) == 2
+
+    root.mapped = True
+    root.run_next()
+    assert root.scheduled[-1][0] == POLL_MS
+    refresher.close()
+
+
+def test_refresher_against_fake_quote_server(monkeypatch):
+    pytest.importorskip("requests")
+    import backend
+    from backend import StockDataService
+
+    with FakeQuoteServer() as server:
+        service = StockDataService("k", "base", server.quote_url)
+        root, applied = FakeRoot(), []
+        refresher = QuoteRefresher(root, service.get_quotes, lambda: ["AAA", "BBB"], applied.append)
+        refresher.start()
+        _run_until_applied(root, refresher, applied)
+        _run_until_applied(root, refresher, applied)
+        refresher.close()
+
+    assert server.requests == [["AAA", "BBB"], ["AAA", "BBB"]]
+    assert applied[0]["AAA"]["price"] == 100.5 and applied[1]["AAA"]["price"] == 100.0
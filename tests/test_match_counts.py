@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+from backend import CacheEntry, StockDataService
+from match_counts import MatchCounter
+
+UNIVERSE = {
+    "AAA": {"rule40_op_ttm": 10.0, "capex_pct": 5.0, "yoy_rev_growth_pct_array": [5.0, -2.0, None, 1.0]},
+    "BBB": {"rule40_op_ttm": 40.0, "capex_pct": 12.0, "yoy_rev_growth_pct_array": [-1.0, -3.0]},
+    "CCC": {"rule40_op_ttm": 55.0, "capex_pct": None, "yoy_rev_growth_pct_array": [30.0]},
+    "DDD": {"rule40_op_ttm": None, "capex_pct": 8.0},
+}
+
+
+def _brute_force(key, threshold):
+    svc = StockDataService("k", "base", "quote")
+    return sum(1 for m in UNIVERSE.values() if svc._passes_mvp_filters(m, {key: threshold}))
+
+
+def test_counts_match_filter_semantics():
+    counter = MatchCounter(UNIVERSE)
+    for key in ("rule40_op_ttm_min", "capex_pct_max", "yoy_rev_growth_pct_min", "yoy_growth_quarter_count_min"):
+        for threshold in (-5, 0, 5, 8, 10, 12, 40, 41, 60):
+            assert counter.count(key, threshold) == _brute_force(key, threshold), (key, threshold)
+    assert counter.count("sector", 1) is None
+
+
+def test_service_counter_rebuilds_only_on_refresh():
+    svc = StockDataService("k", "base", "quote")
+    empty = svc.match_counter()
+    assert empty.size == 0
+    svc._metrics_cache["AAA"] = CacheEntry(CacheEntry.VALID, UNIVERSE["AAA"])
+    svc._metrics_cache["ZZZ"] = CacheEntry.empty(None)
+    # Reads never rebuild, however much the cache has grown
+    assert svc.match_counter() is empty
+
+    counter = svc.refresh_match_counter()
+    assert counter.size == 1 and counter.count("rule40_op_ttm_min", 5) == 1
+    assert svc.match_counter() is counter
+    assert svc.refresh_match_counter() is counter
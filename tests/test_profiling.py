@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from profiling import SessionProfiler
+
+
+def test_capture_writes_profile_and_allocation_report(tmp_path):
+    profiler = SessionProfiler()
+    with profiler.capture("idle"):
+        pass
+    assert not list(tmp_path.iterdir())
+
+    profiler.enable(str(tmp_path))
+    with profiler.capture("search"):
+        with profiler.capture("nested"):
+            [str(i) for i in range(1000)]
+
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert len(names) == 2
+    assert names[0].endswith("-search-alloc.txt")
+    assert names[1].endswith("-search.prof")
+    report = (tmp_path / names[0]).read_text()
+    assert "allocation sites" in report and "cumulative" in report
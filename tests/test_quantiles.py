@@ -0,0 +1,121 @@
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+from backend import CacheEntry, StockDataService
+from quantiles import KLLSketch, SectorQuantiles
+
+
+def test_sketch_is_exact_before_compacting():
+    sketch = KLLSketch()
+    for value in range(10, 0, -1):
+        sketch.add(value)
+    assert sketch.cutoff(0.8) == 9
+    assert sketch.cutoff(0.2, upper=True) == 2
+    assert sketch.cutoff(0) == 1
+    assert sketch.cutoff(1.0) == math.inf
+
+
+def test_sketch_rank_error_stays_small():
+    rng = random.Random(3)
+    values = [rng.uniform(0, 1000) for _ in range(50_000)]
+    sketch = KLLSketch(k=200)
+    for value in values:
+        sketch.add(value)
+    values.sort()
+    for q in (0.05, 0.2, 0.5, 0.8, 0.95):
+        rank = sum(1 for v in values if v < sketch.cutoff(q)) / len(values)
+        assert abs(rank - q) < 0.02, q
+    assert sum(len(level) for level in sketch._levels) < 1000
+
+
+def test_small_sectors_fall_back_to_universe():
+    quantiles = SectorQuantiles(["gross_margin_pct_latest"])
+    for i in range(30):
+        quantiles.observe(f"T{i}", "Tech", {"gross_margin_pct_latest": 50.0 + i})
+    for i in range(5):
+        quantiles.observe(f"E{i}", "Energy", {"gross_margin_pct_latest": float(i)})
+    # Repeat observations of a symbol are not double counted
+    quantiles.observe("T0", "Tech", {"gross_margin_pct_latest": 50.0})
+
+    assert quantiles.count("gross_margin_pct_latest", "Tech") == 30
+    assert quantiles.count("gross_margin_pct_latest") == 35
+    assert quantiles.cutoff("gross_margin_pct_latest", "Tech", 50) == 65.0
+    assert quantiles.cutoff("gross_margin_pct_latest", "Energy", 0) == 0.0
+    assert math.isnan(quantiles.cutoff("capex_pct", "Tech", 50))
+
+
+def test_search_keeps_top_percentile_within_sector(monkeypatch):
+    rows = [{"symbol": f"T{i}", "sector": "Tech"} for i in range(25)]
+    rows += [{"symbol": f"U{i}", "sector": "Utilities"} for i in range(25)]
+    universe = {row["symbol"]: {"gross_margin_pct_latest": float(i % 25)} for i, row in enumerate(rows)}
+    universe.update({f"U{i}": {"gross_margin_pct_latest": float(i) / 10} for i in range(25)})
+
+    class Resp:
+        def json(self):
+            return [dict(row) for row in rows]
+
+    monkeypatch.setattr(backend, "_get", lambda url, **kw: Resp())
+    monkeypatch.setattr(backend, "compute_mvp_metrics", lambda s, k, metrics=None: dict(universe[s]))
+    monkeypatch.setattr(backend, "statement_status", lambda s, st: (CacheEntry.VALID, None))
+    svc = StockDataService("k", "base?", "quote")
+
+    result = svc.search({"gross_margin_pct_latest_pctl_min": 80})
+
+    # Top 20% of each sector, not of the pooled universe
+    assert [r["symbol"] for r in result] == [f"T{i}" for i in range(20, 25)] + [f"U{i}" for i in range(20, 25)]
+    assert svc.quantiles.count("gross_margin_pct_latest", "Utilities") == 25
+
+
+def test_sector_learned_later_still_enters_sector_sketch():
+    quantiles = SectorQuantiles(["gross_margin_pct_latest"])
+    quantiles.observe("T0", None, {"gross_margin_pct_latest": 50.0})
+    quantiles.observe("T0", "Tech", {"gross_margin_pct_latest": 50.0})
+    quantiles.observe("T0", "Tech", {"gross_margin_pct_latest": 50.0})
+
+    assert quantiles.count("gross_margin_pct_latest") == 1
+    assert quantiles.count("gross_margin_pct_latest", "Tech") == 1
+
+
+def test_ranked_search_judges_percentiles_against_every_candidate(monkeypatch):
+    rows = [{"symbol": f"T{i}", "sector": "Tech"} for i in range(25)]
+    universe = {f"T{i}": {"gross_margin_pct_latest": float(i), "rev_ttm": float(i)} for i in range(25)}
+
+    class Resp:
+        def json(self):
+            return [dict(row) for row in rows]
+
+    monkeypatch.setattr(backend, "_get", lambda url, **kw: Resp())
+    monkeypatch.setattr(backend, "compute_mvp_metrics", lambda s, k, metrics=None: dict(universe[s]))
+    monkeypatch.setattr(backend, "statement_status", lambda s, st: (CacheEntry.VALID, None))
+    svc = StockDataService("k", "base?", "quote")
+
+    # Ranked lowest first, so without observing everyone up front the first
+    # rows visited would look like the top of a tiny distribution
+    ranked = svc.search_ranked({"limit": 3, "gross_margin_pct_latest_pctl_min": 80}, {"rev_ttm": -1.0})
+    assert [r["symbol"] for r in ranked] == ["T20", "T21", "T22"]
+
+
+def test_search_observes_sector_of_metrics_cached_earlier(monkeypatch):
+    rows = [{"symbol": f"T{i}", "sector": "Tech"} for i in range(25)]
+
+    class Resp:
+        def json(self):
+            return [dict(row) for row in rows]
+
+    monkeypatch.setattr(backend, "_get", lambda url, **kw: Resp())
+    svc = StockDataService("k", "base?", "quote")
+    for i in range(25):
+        # e.g. from bulk_refresh_metrics, before any screener row named the sector
+        metrics = {"gross_margin_pct_latest": float(i)}
+        svc._metrics_cache[f"T{i}"] = CacheEntry(CacheEntry.VALID, metrics)
+        svc.quantiles.observe(f"T{i}", None, metrics)
+
+    result = svc.search({"gross_margin_pct_latest_pctl_min": 80})
+    assert svc.quantiles.count("gross_margin_pct_latest", "Tech") == 25
+    assert svc.quantiles.count("gross_margin_pct_latest") == 25
+    assert [r["symbol"] for r in result] == [f"T{i}" for i in range(20, 25)]
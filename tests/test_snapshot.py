@@ -0,0 +1,98 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+from backend import METRIC_DEPENDENCIES, StockDataService
+from snapshot import MetricsSnapshot, write_snapshot
+
+
+def _metrics(rev, margin):
+    metrics = dict.fromkeys(METRIC_DEPENDENCIES)
+    metrics.update(
+        rev_ttm=rev,
+        gross_margin_pct_latest=margin,
+        yoy_rev_growth_pct_array=[25.0, None, 10.0, 5.0, 1.0],
+        yoy_growth_quarter_count=3,
+        deferred_rev_yoy_increase=True,
+    )
+    return metrics
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "metrics.snapshot")
+    write_snapshot(path, {"AAA": _metrics(100.0, 60.0), "BBB": _metrics(None, 10.0)},
+                   list(METRIC_DEPENDENCIES), timestamp="2026-10-19T02:00:00+00:00")
+
+    snap = MetricsSnapshot(path)
+    assert snap.timestamp == "2026-10-19T02:00:00+00:00"
+    assert len(snap) == 2 and "AAA" in snap and "ZZZ" not in snap
+    aaa = snap.get("AAA")
+    assert aaa["rev_ttm"] == 100.0
+    assert aaa["yoy_rev_growth_pct_array"] == [25.0, None, 10.0, 5.0]
+    assert aaa["yoy_growth_quarter_count"] == 3
+    assert aaa["deferred_rev_yoy_increase"] is True
+    assert aaa["rd_pct_latest"] is None
+    assert snap.get("BBB")["rev_ttm"] is None
+    snap.close()
+
+
+def test_search_uses_snapshot_and_falls_back_to_live(tmp_path, monkeypatch):
+    path = str(tmp_path / "metrics.snapshot")
+    write_snapshot(path, {"AAA": _metrics(100.0, 60.0)}, list(METRIC_DEPENDENCIES))
+
+    def fake_get(url):
+        class Resp:
+            def json(self):
+                return [{"symbol": "AAA"}, {"symbol": "NEW"}]
+
+        return Resp()
+
+    live = []
+
+    def fake_metrics(symbol, api_key, metrics=None):
+        live.append(symbol)
+        return {"gross_margin_pct_latest": 70.0}
+
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+    monkeypatch.setattr(backend, "compute_mvp_metrics", fake_metrics)
+
+    service = StockDataService("key", "base", "quote", snapshot_path=path)
+    results = service.search({"gross_margin_pct_min": 50})
+    assert [r["symbol"] for r in results] == ["AAA", "NEW"]
+    assert live == ["NEW"]
+    service.snapshot.close()
+
+
+def test_build_snapshot_skips_symbols_whose_fetches_fail(tmp_path, monkeypatch):
+    from snapshot import build_snapshot
+
+    class Resp:
+        status_code = 200
+
+        def json(self):
+            return [{"date": "2024-03-31", "revenue": 100.0, "costOfRevenue": 40.0,
+                     "operatingCashFlow": 10.0}]
+
+    def fake_get(url, **kwargs):
+        if "/GOOD?" in url:
+            return Resp()
+        raise ConnectionError("down")
+
+    monkeypatch.setattr(backend.requests, "get", fake_get)
+    monkeypatch.setattr(backend, "_rate_limit_sleep", lambda s: None)
+    for cache in (backend._income_cache, backend._cash_cache, backend._bs_cache):
+        for symbol in ("GOOD", "DOWN"):
+            cache.pop(symbol, None)
+
+    path = str(tmp_path / "metrics.snapshot")
+    assert build_snapshot(path, ["GOOD", "DOWN"], "key") == 1
+    snap = MetricsSnapshot(path)
+    try:
+        assert "GOOD" in snap and "DOWN" not in snap
+    finally:
+        snap.close()
+    for cache in (backend._income_cache, backend._cash_cache, backend._bs_cache):
+        for symbol in ("GOOD", "DOWN"):
+            cache.pop(symbol, None)
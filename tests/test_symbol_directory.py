@@ -0,0 +1,113 @@
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import backend
+from backend import StockDataService
+from symbol_directory import SymbolDirectory
+
+ENTRIES = [
+    {"symbol": "AAPL", "name": "Apple Inc.", "exchangeShortName": "NASDAQ"},
+    {"symbol": "AA", "name": "Alcoa Corporation", "exchangeShortName": "NYSE"},
+    {"symbol": "MSFT", "name": "Microsoft Corporation", "exchangeShortName": "NASDAQ"},
+    {"symbol": "APLE", "name": "Apple Hospitality REIT", "exchangeShortName": "NYSE"},
+    {"symbol": "GOOGL", "name": "Alphabet Inc.", "exchangeShortName": "NASDAQ"},
+]
+
+
+def _symbols(results):
+    return [r["symbol"] for r in results]
+
+
+def test_exact_ticker_then_prefixes_then_names():
+    directory = SymbolDirectory(ENTRIES)
+    assert _symbols(directory.search("aa")) == ["AA", "AAPL"]
+    assert _symbols(directory.search("apple")) == ["AAPL", "APLE"]
+    assert _symbols(directory.search("corp")) == ["AA", "MSFT"]
+    assert directory.search("") == []
+
+
+def test_fuzzy_match_fills_remaining_slots():
+    directory = SymbolDirectory(ENTRIES)
+    assert _symbols(directory.search("microsfot")) == ["MSFT"]
+    assert _symbols(directory.search("alphabte")) == ["GOOGL"]
+
+
+def test_load_uses_fresh_cache_and_refreshes_stale(tmp_path):
+    path = str(tmp_path / "symbols.json")
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return ENTRIES
+
+    assert len(SymbolDirectory.load(path, fetch)) == len(ENTRIES)
+    SymbolDirectory.load(path, fetch)
+    assert len(calls) == 1
+
+    with open(path, encoding="utf-8") as fh:
+        cached = json.load(fh)
+    cached["fetched_at"] = time.time() - 2 * 24 * 60 * 60
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(cached, fh)
+
+    def failing():
+        raise RuntimeError("offline")
+
+    stale = SymbolDirectory.load(path, failing)
+    assert len(stale) == len(ENTRIES) and not stale.is_stale()
+    SymbolDirectory.load(path, fetch)
+    assert len(calls) == 2
+
+
+def test_stock_search_uses_directory_without_remote_search(monkeypatch, tmp_path):
+    urls = []
+
+    class Resp:
+        def json(self):
+            return ENTRIES
+
+    def fake_get(url, **kw):
+        urls.append(url)
+        return Resp()
+
+    monkeypatch.setattr(backend, "_get", fake_get)
+    svc = StockDataService("k", "base", "quote", symbol_directory_path=str(tmp_path / "symbols.json"))
+    assert _symbols(svc._fetch_candidates({"stockSearch": "app"})) == ["AAPL", "APLE"]
+    assert _symbols(svc._fetch_candidates({"stockSearch": "ms"})) == ["MSFT"]
+    assert len(urls) == 1 and "available-traded/list" in urls[0]
+
+
+def test_failed_directory_load_is_not_retried_per_keystroke(monkeypatch, tmp_path):
+    urls = []
+
+    class Resp:
+        def json(self):
+            return [{"symbol": "AAPL", "name": "Apple Inc."}]
+
+    def fake_get(url, **kw):
+        urls.append(url)
+        if "available-traded/list" in url:
+            raise ConnectionError("offline")
+        return Resp()
+
+    monkeypatch.setattr(backend, "_get", fake_get)
+    svc = StockDataService("k", "base", "quote", symbol_directory_path=str(tmp_path / "symbols.json"))
+    for query in ("a", "ap", "app"):
+        assert _symbols(svc._fetch_candidates({"stockSearch": query})) == ["AAPL"]
+    assert len([u for u in urls if "available-traded/list" in u]) == 1
+    assert len([u for u in urls if "/search?" in u]) == 3
+
+    svc._symbol_directory_retry_at = 0.0
+    svc.get_symbol_directory()
+    assert len([u for u in urls if "available-traded/list" in u]) == 2
+
+
+def test_search_picks_best_matches_from_large_directory():
+    entries = [{"symbol": f"A{i:05d}", "name": f"Acme {i} Corporation"} for i in range(20000, 0, -1)]
+    directory = SymbolDirectory(entries)
+    assert _symbols(directory.search("a", limit=3)) == ["A00001", "A00002", "A00003"]
+    assert _symbols(directory.search("corp", limit=2)) == ["A00001", "A00002"]